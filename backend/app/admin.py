@@ -0,0 +1,163 @@
+"""
+Organizer-only API routes (require the ADMIN_TOKEN bearer token).
+"""
+
+import asyncio
+from datetime import datetime
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+import logging
+from .auth import require_admin
+from .broadcast import CANCELLED, PAUSED, PENDING, BroadcastError, broadcast_runner, select_recipients, validate_template
+from .executors import sheets_executor
+from .export import InvalidCursorError, decode_cursor, stream_export
+from .google_sheets import sheets_service
+from .models import BroadcastRequest
+from .reconcile import reconcile
+from .seeding import read_registrations
+from .stats import registration_stats
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Create router
+router = APIRouter(prefix="/api", tags=["admin"], dependencies=[Depends(require_admin)])
+
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+
+@router.get("/registrations/export")
+async def export_registrations(
+    format: Literal["csv", "ndjson"] = "csv",
+    cursor: Optional[str] = Query(None, description="Cursor of the last registration already received"),
+    since: Optional[datetime] = Query(None, description="Only registrations at or after this time"),
+    limit: Optional[int] = Query(None, ge=1, description="Maximum number of registrations to return"),
+):
+    """
+    Stream registrations as CSV or NDJSON.
+
+    Every record carries a `cursor`; pass the last one received as
+    `cursor` to continue where a previous (limited or interrupted) export
+    stopped. `since` filters on the Timestamp column for incremental pulls.
+
+    Rows are read from Google Sheets in fixed-size chunks
+    (EXPORT_CHUNK_SIZE) and streamed as they arrive.
+    """
+    if cursor:
+        try:
+            decode_cursor(cursor)
+        except InvalidCursorError as e:
+            raise HTTPException(status_code=400, detail={"message": str(e), "error": "invalid_cursor"})
+
+    # Fail before the 200 is sent if Google Sheets can't be reached at all
+    try:
+        await sheets_executor.run(sheets_service.ensure_connected)
+    except Exception as e:
+        logger.error("Export failed to connect to Google Sheets: %s", e)
+        raise HTTPException(
+            status_code=503,
+            detail={"message": "Google Sheets is unavailable. Please try again later.", "error": "google_sheets_error"}
+        )
+
+    logger.info("Streaming registrations export (%s)", format)
+    filename = f"registrations-{datetime.now().strftime('%Y%m%d-%H%M%S')}.{format}"
+    return StreamingResponse(
+        stream_export(format, after=cursor, since=since, limit=limit),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+@router.get("/stats")
+async def registration_statistics(request: Request):
+    """
+    Registration counts by church, city, institution and first-time attendance.
+
+    Served from counts shared by all workers (no Google Sheets call). Send
+    the returned ETag back as If-None-Match to get a 304 while nothing changed.
+    """
+    body, etag = await registration_stats.snapshot()
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(content=body, headers=headers)
+
+
+@router.post("/reconcile")
+async def reconcile_sheet(apply: bool = Query(False, description="Write the status fixes instead of only reporting them")):
+    """
+    Find duplicate, failed and incomplete rows in the registrations sheet.
+
+    A dry run by default; with `apply=true` the Status cells are rewritten
+    ('Duplicate', 'Success' or 'Incomplete') with batched updates. Rows are
+    never deleted. Same as `python -m app.reconcile`.
+    """
+    try:
+        return await sheets_executor.run(reconcile, apply)
+    except Exception as e:
+        logger.error("Reconciliation failed: %s", e)
+        raise HTTPException(
+            status_code=503,
+            detail={"message": "Google Sheets is unavailable. Please try again later.", "error": "google_sheets_error"}
+        )
+
+
+@router.post("/broadcasts", status_code=202)
+async def create_broadcast(broadcast: BroadcastRequest):
+    """
+    Send an SMS to every registrant with a phone number (or those matching `filter`).
+
+    The template may use {first_name}, {full_name}, {ticket},
+    {conference_name}, {whatsapp_group_link}, {facebook_url} and
+    {youtube_url}. Recipients are read from the sheet once, deduplicated by
+    phone number and sent in chunks in the background; poll
+    GET /api/broadcasts/{id} for progress.
+    """
+    try:
+        validate_template(broadcast.template)
+    except BroadcastError as e:
+        raise HTTPException(status_code=400, detail={"message": str(e), "error": "invalid_template"})
+
+    try:
+        registrations = await sheets_executor.run(read_registrations)
+    except Exception as e:
+        logger.error("Broadcast failed to read registrations: %s", e)
+        raise HTTPException(
+            status_code=503,
+            detail={"message": "Google Sheets is unavailable. Please try again later.", "error": "google_sheets_error"}
+        )
+
+    filters = broadcast.filter.model_dump(exclude_none=True)
+    recipients = select_recipients(registrations, filters)
+    return await asyncio.to_thread(broadcast_runner.create, broadcast.template, filters, recipients)
+
+
+@router.get("/broadcasts")
+async def list_broadcasts():
+    """All broadcasts with their progress, newest first."""
+    return {"broadcasts": await asyncio.to_thread(broadcast_runner.jobs)}
+
+
+@router.get("/broadcasts/{broadcast_id}")
+async def get_broadcast(broadcast_id: int):
+    """Progress of a broadcast and the result of each chunk."""
+    job = await asyncio.to_thread(broadcast_runner.get, broadcast_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail={"message": "Broadcast not found.", "error": "not_found"})
+    return job
+
+
+@router.post("/broadcasts/{broadcast_id}/{action}")
+async def control_broadcast(broadcast_id: int, action: Literal["pause", "resume", "cancel"]):
+    """Pause, resume or cancel a broadcast (takes effect after the chunk being sent)."""
+    status = {"pause": PAUSED, "resume": PENDING, "cancel": CANCELLED}[action]
+    try:
+        return await asyncio.to_thread(broadcast_runner.set_status, broadcast_id, status)
+    except KeyError:
+        raise HTTPException(status_code=404, detail={"message": "Broadcast not found.", "error": "not_found"})
+    except BroadcastError as e:
+        raise HTTPException(status_code=409, detail={"message": str(e), "error": "invalid_state"})
@@ -0,0 +1,126 @@
+"""
+Adaptive admission control for new registrations.
+
+Each worker caps how many registrations it handles at once. The cap is
+adjusted AIMD-style from the latency of the requests it admits: it grows by
+about one per cap's worth of fast responses and is cut by
+ADMISSION_BACKOFF_RATIO when a response is slower than
+ADMISSION_TARGET_LATENCY_MS or ends in a 503 (Google Sheets overloaded).
+Registrations over the cap are answered at once with a 503 and a
+Retry-After computed from the recent latency and how many requests were
+turned away, instead of queueing behind slow Sheets calls until the
+client times out.
+
+Only registration endpoints are governed: health checks, door check-ins
+and everything else are never shed and don't count against the cap.
+"""
+
+import logging
+import math
+import time
+from .config import settings
+from .metrics import ADMISSION_LIMIT
+from .sheets_quota import OPEN, sheets_governor
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Request paths (prefixes) subject to admission control
+GOVERNED_PATHS = ("/api/register",)
+
+# Weight of the newest sample in the latency moving average
+LATENCY_SMOOTHING = 0.2
+
+
+class AdmissionController:
+    """
+    AIMD concurrency limit for one worker (event loop only, no locking).
+    """
+
+    def __init__(self):
+        self.min_limit = max(1, settings.admission_min_limit)
+        self.max_limit = max(self.min_limit, settings.admission_max_limit)
+        self.limit = float(min(max(settings.admission_initial_limit, self.min_limit), self.max_limit))
+        self.target = settings.admission_target_latency_ms / 1000
+        self.in_flight = 0
+        self.latency = self.target / 2  # Moving average of admitted request latency (seconds)
+        self.admitted = 0
+        self.shed = 0
+        self._last_decrease = 0.0
+        # Requests shed in the current and the previous one-second window
+        self._window_start = time.monotonic()
+        self._window_shed = 0
+        self._previous_shed = 0
+        ADMISSION_LIMIT.set(int(self.limit))
+
+    def governs(self, method: str, path: str) -> bool:
+        """Whether a request is subject to the limit."""
+        return settings.admission_enabled and method == "POST" and path.startswith(GOVERNED_PATHS)
+
+    def try_acquire(self) -> bool:
+        """Admit a request if the worker is under its limit (call release() when it finishes)."""
+        if self.in_flight >= int(self.limit):
+            self._count_shed()
+            return False
+        self.in_flight += 1
+        self.admitted += 1
+        return True
+
+    def release(self, seconds: float, overloaded: bool = False):
+        """
+        Record how an admitted request went and adjust the limit.
+
+        Args:
+            seconds: Time from admission to the response
+            overloaded: The request failed because a dependency was overloaded
+        """
+        self.in_flight -= 1
+        self.latency += LATENCY_SMOOTHING * (seconds - self.latency)
+        previous = int(self.limit)
+        if overloaded or seconds > self.target:
+            now = time.monotonic()
+            # Cut once per congestion episode, not once per request that saw it
+            if now - self._last_decrease >= self.target:
+                self._last_decrease = now
+                self.limit = max(self.min_limit, self.limit * settings.admission_backoff_ratio)
+                logger.info("Admission limit lowered to %s (latency %.2fs)", int(self.limit), seconds)
+        elif self.in_flight + 1 >= self.limit / 2:
+            # Only grow while the limit is actually being used
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+        if int(self.limit) != previous:
+            ADMISSION_LIMIT.set(int(self.limit))
+
+    def _count_shed(self):
+        self.shed += 1
+        now = time.monotonic()
+        if now - self._window_start >= 1.0:
+            self._previous_shed = self._window_shed if now - self._window_start < 2.0 else 0
+            self._window_start, self._window_shed = now, 0
+        self._window_shed += 1
+
+    def retry_after(self) -> int:
+        """
+        Seconds a shed client should wait: the recent latency, scaled up by
+        how many requests per admitted slot were turned away in the last
+        second, and at least the Sheets circuit breaker's remaining open time.
+        """
+        pressure = 1 + max(self._window_shed, self._previous_shed) / max(self.limit, 1)
+        seconds = self.latency * pressure
+        if sheets_governor.breaker.state == OPEN:
+            seconds = max(seconds, sheets_governor.breaker.retry_after())
+        return min(settings.admission_max_retry_after_seconds, max(1, math.ceil(seconds)))
+
+    def status(self) -> dict:
+        """Current limit and load, for /api/health."""
+        return {
+            "enabled": settings.admission_enabled,
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "latency_ms": round(self.latency * 1000),
+            "admitted": self.admitted,
+            "shed": self.shed,
+        }
+
+
+# Global instance
+admission_controller = AdmissionController()
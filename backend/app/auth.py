@@ -0,0 +1,63 @@
+"""
+Authentication for organizer-only endpoints.
+Requests must send `Authorization: Bearer <ADMIN_TOKEN>`. /metrics also
+accepts METRICS_TOKEN, so the scraper doesn't need the admin token.
+"""
+
+import hmac
+from typing import Optional
+from fastapi import Depends, HTTPException
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from .config import settings
+
+bearer_scheme = HTTPBearer(auto_error=False)
+
+
+async def require_admin(credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme)):
+    """
+    FastAPI dependency that rejects requests without the admin token.
+
+    Raises:
+        HTTPException: 503 if ADMIN_TOKEN is not configured, 401 if the token is missing or wrong
+    """
+    if not settings.admin_token:
+        raise HTTPException(
+            status_code=503,
+            detail={
+                "message": "Organizer endpoints are disabled. Set ADMIN_TOKEN to enable them.",
+                "error": "admin_disabled"
+            }
+        )
+    # Constant-time comparison so the token can't be guessed byte by byte
+    if credentials is None or not hmac.compare_digest(credentials.credentials.encode(), settings.admin_token.encode()):
+        raise HTTPException(
+            status_code=401,
+            detail={"message": "Invalid or missing admin token.", "error": "unauthorized"},
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+
+
+async def require_metrics_access(credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme)):
+    """
+    FastAPI dependency for /metrics: the scrape token (METRICS_TOKEN) or the admin token.
+
+    Raises:
+        HTTPException: 503 if neither token is configured, 401 if the token is missing or wrong
+    """
+    token = credentials.credentials.encode() if credentials else b""
+    if settings.metrics_token and hmac.compare_digest(token, settings.metrics_token.encode()):
+        return
+    if not settings.admin_token and not settings.metrics_token:
+        raise HTTPException(
+            status_code=503,
+            detail={
+                "message": "Metrics are disabled. Set METRICS_TOKEN or ADMIN_TOKEN to enable them.",
+                "error": "metrics_disabled"
+            }
+        )
+    if not settings.admin_token or not hmac.compare_digest(token, settings.admin_token.encode()):
+        raise HTTPException(
+            status_code=401,
+            detail={"message": "Invalid or missing metrics token.", "error": "unauthorized"},
+            headers={"WWW-Authenticate": "Bearer"}
+        )
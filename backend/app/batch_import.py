@@ -0,0 +1,133 @@
+"""
+Parsing and validation of batch registrations (JSON arrays or CSV uploads).
+Used by /api/register/batch for kiosk and group sign-ups.
+"""
+
+import csv
+import io
+import json
+from typing import Iterator
+from fastapi import Request
+from pydantic import ValidationError
+from .models import RegistrationRequest
+
+# Accepted spellings of a "yes" in CSV consent / boolean columns
+TRUTHY = {"true", "yes", "y", "1", "on", "agreed"}
+
+
+class BatchFormatError(Exception):
+    """Raised when the uploaded batch cannot be parsed at all."""
+
+
+class BatchTooLargeError(BatchFormatError):
+    """Raised when a batch has more records (or bytes) than allowed."""
+
+
+def _clean_csv_record(record: dict) -> dict:
+    """Drop empty cells and convert the consent column to a boolean."""
+    cleaned = {
+        key.strip(): value.strip()
+        for key, value in record.items()
+        if key and isinstance(value, str) and value.strip()
+    }
+    cleaned["privacy_consent"] = cleaned.get("privacy_consent", "").lower() in TRUTHY
+    return cleaned
+
+
+def iter_csv_records(stream) -> Iterator[dict]:
+    """
+    Yield records from a CSV file one row at a time.
+
+    The header row must use the RegistrationRequest field names
+    (full_name, phone, church, city, ..., privacy_consent).
+    """
+    reader = csv.DictReader(io.TextIOWrapper(stream, encoding="utf-8-sig", newline=""))
+    if not reader.fieldnames or "full_name" not in [name.strip() for name in reader.fieldnames]:
+        raise BatchFormatError("CSV header row must include full_name, church, city and privacy_consent")
+    for record in reader:
+        yield _clean_csv_record(record)
+
+
+async def _read_body(request: Request, max_bytes: int) -> bytes:
+    """Read the request body, giving up as soon as it grows past max_bytes."""
+    chunks = []
+    received = 0
+    async for chunk in request.stream():
+        received += len(chunk)
+        if received > max_bytes:
+            raise BatchTooLargeError(f"A batch may be at most {max_bytes} bytes")
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+async def read_batch(request: Request, max_bytes: int) -> Iterator[dict]:
+    """
+    Return an iterator over the submitted records.
+
+    Accepts either a JSON array (or {"records": [...]}) body, or a
+    multipart upload with the CSV in a field named "file".
+
+    Args:
+        request: The incoming request
+        max_bytes: Largest body accepted (checked against Content-Length,
+            and while reading a JSON body without one)
+
+    Raises:
+        BatchFormatError: If the body is neither a JSON array nor a CSV upload
+        BatchTooLargeError: If the body is larger than max_bytes
+    """
+    content_length = request.headers.get("content-length", "")
+    if content_length.isdigit() and int(content_length) > max_bytes:
+        raise BatchTooLargeError(f"A batch may be at most {max_bytes} bytes")
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("multipart/form-data"):
+        form = await request.form()
+        upload = form.get("file")
+        if upload is None or not hasattr(upload, "file"):
+            raise BatchFormatError("Upload the CSV in a form field named 'file'")
+        return iter_csv_records(upload.file)
+
+    try:
+        body = json.loads(await _read_body(request, max_bytes))
+    except ValueError:
+        raise BatchFormatError("Body must be a JSON array of registrations or a CSV upload")
+    if isinstance(body, dict):
+        body = body.get("records")
+    if not isinstance(body, list):
+        raise BatchFormatError("Body must be a JSON array of registrations or a CSV upload")
+    return iter(body)
+
+
+def validate_records(records: Iterator[dict], max_records: int) -> tuple[list[tuple[int, RegistrationRequest]], list[dict]]:
+    """
+    Validate records one by one, collecting per-record errors.
+
+    Args:
+        records: Raw records in submission order
+        max_records: Maximum number of records accepted in one batch
+
+    Returns:
+        tuple: (valid (index, registration) pairs, error entries)
+
+    Raises:
+        BatchTooLargeError: If the batch has more than max_records records
+    """
+    valid = []
+    errors = []
+    for index, record in enumerate(records):
+        if index >= max_records:
+            raise BatchTooLargeError(f"A batch may contain at most {max_records} registrations")
+        if not isinstance(record, dict):
+            errors.append({"index": index, "errors": [{"field": None, "message": "Record must be an object"}]})
+            continue
+        try:
+            valid.append((index, RegistrationRequest.model_validate(record)))
+        except ValidationError as e:
+            errors.append({
+                "index": index,
+                "errors": [
+                    {"field": ".".join(str(part) for part in error["loc"]) or None, "message": error["msg"]}
+                    for error in e.errors()
+                ],
+            })
+    return valid, errors
@@ -0,0 +1,185 @@
+"""
+Background batching primitive used by the write-behind paths.
+Collects submitted items and flushes them together when a size or time limit is hit.
+"""
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Optional
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+
+class QueueFullError(Exception):
+    """Raised when a batch queue is at capacity and cannot accept more work."""
+
+
+class BatchDispatcher:
+    """
+    Buffers items on a bounded queue and hands them to a flush function in batches.
+
+    A batch is flushed as soon as either `max_batch_size` items are waiting or
+    `max_delay_ms` has passed since the first item of the batch arrived,
+    whichever comes first. Each submitted item gets its own Future which is
+    resolved with the per-item result returned by the flush function, or with
+    the exception it raised. An item whose future is cancelled before its
+    batch is assembled is dropped; after that it can no longer be cancelled.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        flush: Callable[[list], list],
+        max_batch_size: int = 50,
+        max_delay_ms: int = 1000,
+        max_pending: int = 500,
+    ):
+        """
+        Args:
+            name: Name used for the worker thread and log messages
+            flush: Callable taking a list of items and returning one result per item
+            max_batch_size: Maximum number of items passed to a single flush call
+            max_delay_ms: Maximum time an item waits before its batch is flushed
+            max_pending: Capacity of the queue; submissions beyond it are rejected
+        """
+        self.name = name
+        self.flush = flush
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_delay = max(0, max_delay_ms) / 1000
+        self.max_pending = max_pending
+        self._queue: queue.Queue = queue.Queue(maxsize=max_pending)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+
+    def start(self):
+        """Start the background flush thread if it is not already running."""
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+            logger.info("Started batch dispatcher '%s'", self.name)
+
+    def submit(self, item: Any) -> Future:
+        """
+        Queue an item for the next batch.
+
+        Args:
+            item: Item to pass to the flush function
+
+        Returns:
+            Future: Resolved with the item's result once its batch is flushed
+
+        Raises:
+            QueueFullError: If the queue is at capacity (backpressure)
+        """
+        if self._stopping.is_set():
+            raise QueueFullError(f"{self.name} is shutting down")
+
+        self.start()
+        future: Future = Future()
+        try:
+            self._queue.put_nowait((item, future))
+        except queue.Full:
+            raise QueueFullError(f"{self.name} queue is full ({self.max_pending} pending)")
+        return future
+
+    def depth(self) -> int:
+        """Number of items waiting to be flushed."""
+        return self._queue.qsize()
+
+    def stop(self, timeout: float = 30.0):
+        """
+        Stop accepting work, flush everything still queued and wait for the worker.
+
+        Args:
+            timeout: Maximum number of seconds to wait for the final flush
+        """
+        self._stopping.set()
+        thread = self._thread
+        if thread and thread.is_alive():
+            thread.join(timeout)
+            if thread.is_alive():
+                logger.warning("Batch dispatcher '%s' did not finish flushing in %ss", self.name, timeout)
+        else:
+            # Worker never started or already exited - flush inline
+            self._drain()
+        logger.info("Stopped batch dispatcher '%s'", self.name)
+
+    def _run(self):
+        """Worker loop: collect a batch, flush it, repeat until stopped."""
+        while not self._stopping.is_set():
+            batch = self._collect()
+            if batch:
+                self._flush(batch)
+        self._drain()
+
+    def _collect(self) -> list:
+        """Wait for the first item, then gather more until the size or time limit."""
+        try:
+            entry = self._queue.get(timeout=0.5)
+        except queue.Empty:
+            return []
+        batch = [entry] if self._take(entry) else []
+
+        deadline = time.monotonic() + self.max_delay
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or self._stopping.is_set():
+                break
+            try:
+                entry = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if self._take(entry):
+                batch.append(entry)
+        return batch
+
+    def _drain(self):
+        """Flush whatever is left on the queue in full-size batches."""
+        while True:
+            batch = []
+            while len(batch) < self.max_batch_size:
+                try:
+                    entry = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if self._take(entry):
+                    batch.append(entry)
+            if not batch:
+                return
+            self._flush(batch)
+
+    @staticmethod
+    def _take(entry: tuple) -> bool:
+        """
+        Commit a queued item to the batch being built.
+
+        Its future is marked running, so it can no longer be cancelled and
+        is always resolved by _flush. Returns False (and the item is dropped)
+        if it was cancelled while it waited.
+        """
+        _, future = entry
+        return future.set_running_or_notify_cancel()
+
+    def _flush(self, batch: list):
+        """Run the flush function and resolve each item's future."""
+        items = [item for item, _ in batch]
+        try:
+            results = self.flush(items)
+            if len(results) != len(items):
+                raise Exception(f"{self.name} flush returned {len(results)} results for {len(items)} items")
+        except Exception as e:
+            logger.error("Batch flush failed in '%s' (%s items): %s", self.name, len(items), e)
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
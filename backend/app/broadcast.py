@@ -0,0 +1,561 @@
+"""
+Bulk SMS broadcasts (reminders to every registrant, or a filtered group).
+
+A broadcast snapshots its recipients into a local SQLite file, split into
+chunks of BROADCAST_CHUNK_SIZE numbers. A background worker sends one chunk
+per mNotify call (numbers sharing a rendered message go in one `recipient`
+list) at BROADCAST_CHUNKS_PER_MINUTE, recording each chunk's result as it
+goes. A chunk is marked 'sending' before the call is made, so after a crash
+the job resumes at the next unsent chunk; a chunk caught mid-send is marked
+'unknown' instead of being sent twice. For the same reason a call that timed
+out waiting for mNotify's answer is never retried. Recipients of a chunk
+that ended differently (some messages failed, or the worker stopped before
+sending them) are split off into chunks of their own, so nobody is counted
+as sent by mistake and unsent messages go out after a restart.
+"""
+
+import html
+import json
+import logging
+import os
+import sqlite3
+import string
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Optional
+from .config import settings
+from .export import since_key
+from .phone import parse_phone
+from .sms_service import SMSDeliveryUnknownError, SMSTransientError, sms_service
+from .sms_dispatcher import sms_dispatcher
+from .tickets import format_ticket
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS broadcasts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    template TEXT NOT NULL,
+    filter TEXT NOT NULL,
+    status TEXT NOT NULL,
+    recipients INTEGER NOT NULL,
+    chunks INTEGER NOT NULL,
+    sent INTEGER NOT NULL DEFAULT 0,
+    failed INTEGER NOT NULL DEFAULT 0,
+    owner TEXT,
+    lease_until REAL NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS broadcast_chunks (
+    broadcast_id INTEGER NOT NULL,
+    chunk INTEGER NOT NULL,
+    recipients TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    accepted INTEGER NOT NULL DEFAULT 0,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    sent_at TEXT,
+    PRIMARY KEY (broadcast_id, chunk)
+);
+"""
+
+# Job states; the worker only picks up ACTIVE ones
+PENDING, RUNNING, PAUSED, COMPLETED, CANCELLED = "pending", "running", "paused", "completed", "cancelled"
+ACTIVE = (PENDING, RUNNING)
+
+# Placeholders a template may use
+TEMPLATE_FIELDS = (
+    'first_name', 'full_name', 'ticket', 'conference_name',
+    'whatsapp_group_link', 'facebook_url', 'youtube_url',
+)
+
+# Text filters compared case-insensitively against the saved values
+TEXT_FILTERS = ('church', 'city', 'institution', 'first_time_attendee')
+
+# Renewed before every mNotify call, so it only has to outlast one call
+# (SMS_TIMEOUT_SECONDS) plus one retry delay (SMS_RETRY_MAX_DELAY_SECONDS)
+LEASE_SECONDS = 300.0
+IDLE_POLL_SECONDS = 5.0
+
+
+class BroadcastError(ValueError):
+    """Raised for an unusable template or an invalid job transition."""
+
+
+def validate_template(template: str):
+    """
+    Raises:
+        BroadcastError: If the template uses an unknown placeholder or bad braces
+    """
+    try:
+        fields = [name for _, name, _, _ in string.Formatter().parse(template) if name is not None]
+    except ValueError as e:
+        raise BroadcastError(f"Invalid template: {str(e)}")
+    unknown = sorted({name for name in fields if name not in TEMPLATE_FIELDS})
+    if unknown:
+        raise BroadcastError(
+            f"Unknown placeholder(s) {', '.join(unknown)}; use {', '.join(TEMPLATE_FIELDS)}"
+        )
+
+
+def render_message(template: str, recipient: dict) -> str:
+    """Fill a validated template for one recipient ({'name', 'ticket'})."""
+    name = recipient.get('name', '')
+    return template.format(
+        first_name=name.split()[0] if name else "Guest",
+        full_name=name,
+        ticket=format_ticket(recipient['ticket']) if recipient.get('ticket') else '',
+        conference_name=settings.conference_name,
+        whatsapp_group_link=settings.whatsapp_group_link,
+        facebook_url=settings.facebook_url,
+        youtube_url=settings.youtube_url,
+    )
+
+
+def select_recipients(registrations: list[dict], filters: dict) -> list[dict]:
+    """
+    Registrants matching the filter, one entry per phone number.
+
+    Args:
+        registrations: Saved registrations (see seeding.read_registrations)
+        filters: BroadcastFilter fields that were set
+
+    Returns:
+        list[dict]: {'phone' (0XXXXXXXXX), 'name', 'ticket'} in registration order
+    """
+    wanted = {
+        field: filters[field].strip().casefold()
+        for field in TEXT_FILTERS if filters.get(field)
+    }
+    minimum = since_key(filters.get('registered_since'))
+    recipients = []
+    seen = set()
+    for registration in registrations:
+        if any(html.unescape(registration.get(field, '')).strip().casefold() != value for field, value in wanted.items()):
+            continue
+        # Journal rows not yet synced have no timestamp - they are the newest
+        if minimum and registration.get('timestamp') and registration['timestamp'] < minimum:
+            continue
+        phone = parse_phone(registration.get('phone', ''))
+        if phone is None or phone.national in seen:
+            continue
+        seen.add(phone.national)
+        recipients.append({
+            'phone': phone.local,
+            'name': html.unescape(registration.get('full_name', '')),
+            'ticket': registration.get('ticket', ''),
+        })
+    return recipients
+
+
+class BroadcastRunner:
+    """
+    Stores broadcast jobs and sends them from a background thread.
+
+    Several uvicorn workers can share the same file: a job is leased to one
+    process at a time, like the registration journal's sync cursor.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Location of the SQLite database file
+        """
+        self.path = path
+        self.owner = f"{os.getpid()}-{id(self)}"
+        self._local = threading.local()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._wake = threading.Event()
+        self._opened = False
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=FULL")
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    def open(self):
+        """Create the database file and tables if needed."""
+        if self._opened:
+            return
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        self._connection().executescript(SCHEMA)
+        self._opened = True
+
+    def create(self, template: str, filters: dict, recipients: list[dict]) -> dict:
+        """
+        Store a new broadcast and wake the worker (blocking).
+
+        Args:
+            template: Validated message template
+            filters: Filter the recipients were selected with (kept for reference)
+            recipients: Output of select_recipients()
+
+        Returns:
+            dict: The new job (see get())
+        """
+        self.open()
+        conn = self._connection()
+        now = datetime.now().isoformat(timespec='seconds')
+        size = max(1, settings.broadcast_chunk_size)
+        chunks = [recipients[i:i + size] for i in range(0, len(recipients), size)]
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            cursor = conn.execute(
+                "INSERT INTO broadcasts (created_at, updated_at, template, filter, status, recipients, chunks) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (now, now, template, json.dumps(filters, default=str),
+                 PENDING if chunks else COMPLETED, len(recipients), len(chunks)),
+            )
+            broadcast_id = cursor.lastrowid
+            conn.executemany(
+                "INSERT INTO broadcast_chunks (broadcast_id, chunk, recipients) VALUES (?, ?, ?)",
+                [(broadcast_id, index, json.dumps(chunk)) for index, chunk in enumerate(chunks)],
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        logger.info("Broadcast %s created for %s recipient(s) in %s chunk(s)", broadcast_id, len(recipients), len(chunks))
+        self.start()
+        self._wake.set()
+        return self.get(broadcast_id)
+
+    def get(self, broadcast_id: int) -> Optional[dict]:
+        """
+        Progress of one broadcast with the result of every chunk.
+
+        Returns:
+            dict: Job fields plus 'chunk_results', or None if there is no such job
+        """
+        job = self._job(broadcast_id)
+        if job is None:
+            return None
+        job['chunk_results'] = [
+            dict(row) for row in self._connection().execute(
+                "SELECT chunk, status, json_array_length(recipients) AS recipients, accepted, attempts, error, sent_at "
+                "FROM broadcast_chunks WHERE broadcast_id = ? ORDER BY chunk",
+                (broadcast_id,),
+            )
+        ]
+        return job
+
+    def jobs(self) -> list[dict]:
+        """All broadcasts, newest first (without chunk results)."""
+        if not os.path.exists(self.path):
+            return []
+        self.open()
+        return [self._summary(row) for row in self._connection().execute("SELECT * FROM broadcasts ORDER BY id DESC")]
+
+    def _job(self, broadcast_id: int) -> Optional[dict]:
+        self.open()
+        row = self._connection().execute("SELECT * FROM broadcasts WHERE id = ?", (broadcast_id,)).fetchone()
+        return self._summary(row) if row else None
+
+    @staticmethod
+    def _summary(row: sqlite3.Row) -> dict:
+        job = {key: row[key] for key in row.keys() if key not in ('owner', 'lease_until')}
+        job['filter'] = json.loads(job['filter'])
+        job['remaining'] = job['recipients'] - job['sent'] - job['failed']
+        return job
+
+    def set_status(self, broadcast_id: int, status: str) -> dict:
+        """
+        Pause, resume or cancel a broadcast. The worker finishes the chunk it is sending first.
+
+        Raises:
+            KeyError: If there is no such broadcast
+            BroadcastError: If the job is already completed or cancelled
+        """
+        job = self._job(broadcast_id)
+        if job is None:
+            raise KeyError(broadcast_id)
+        if job['status'] in (COMPLETED, CANCELLED):
+            raise BroadcastError(f"Broadcast {broadcast_id} is already {job['status']}")
+        self._connection().execute(
+            "UPDATE broadcasts SET status = ?, updated_at = ? WHERE id = ?",
+            (status, datetime.now().isoformat(timespec='seconds'), broadcast_id),
+        )
+        logger.info("Broadcast %s %s", broadcast_id, status)
+        if status == PENDING:
+            self.start()
+            self._wake.set()
+        return self.get(broadcast_id)
+
+    def _claim_job(self, conn: sqlite3.Connection) -> Optional[int]:
+        """
+        Lease the oldest active broadcast to this process.
+
+        Chunks left 'sending' by a previous owner may or may not have gone
+        out; they are marked 'unknown' rather than sent again.
+
+        Returns:
+            int: Broadcast id, or None if there is nothing to send
+        """
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                f"SELECT id, owner FROM broadcasts WHERE status IN ({', '.join('?' * len(ACTIVE))}) "
+                "AND (owner IS NULL OR owner = ? OR lease_until < ?) ORDER BY id LIMIT 1",
+                (*ACTIVE, self.owner, now),
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            broadcast_id, owner = row['id'], row['owner']
+            if owner != self.owner:
+                conn.execute(
+                    "UPDATE broadcast_chunks SET status = 'unknown', "
+                    "error = 'Interrupted while sending; not resent to avoid duplicates' "
+                    "WHERE broadcast_id = ? AND status = 'sending'",
+                    (broadcast_id,),
+                )
+            conn.execute(
+                "UPDATE broadcasts SET status = ?, owner = ?, lease_until = ? WHERE id = ?",
+                (RUNNING, self.owner, now + LEASE_SECONDS, broadcast_id),
+            )
+            conn.execute("COMMIT")
+            return broadcast_id
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _renew_lease(self, conn: sqlite3.Connection, broadcast_id: int) -> bool:
+        """
+        Extend this process's lease on a broadcast.
+
+        Returns:
+            bool: False if another worker has taken the job over
+        """
+        cursor = conn.execute(
+            "UPDATE broadcasts SET lease_until = ? WHERE id = ? AND owner = ?",
+            (time.time() + LEASE_SECONDS, broadcast_id, self.owner),
+        )
+        return cursor.rowcount == 1
+
+    def send_next_chunk(self) -> bool:
+        """
+        Send the next chunk of the oldest active broadcast (blocking).
+
+        Returns:
+            bool: True if a chunk was sent (or attempted), False if nothing was waiting
+        """
+        self.open()
+        conn = self._connection()
+        broadcast_id = self._claim_job(conn)
+        if broadcast_id is None:
+            return False
+
+        chunk = conn.execute(
+            "SELECT chunk, recipients FROM broadcast_chunks WHERE broadcast_id = ? AND status = 'pending' "
+            "ORDER BY chunk LIMIT 1",
+            (broadcast_id,),
+        ).fetchone()
+        if chunk is None:
+            conn.execute(
+                "UPDATE broadcasts SET status = ?, owner = NULL, lease_until = 0, updated_at = ? WHERE id = ? AND owner = ?",
+                (COMPLETED, datetime.now().isoformat(timespec='seconds'), broadcast_id, self.owner),
+            )
+            logger.info("Broadcast %s completed", broadcast_id)
+            return True
+
+        # Committed before the call: a crash from here on leaves the chunk 'sending', never resent
+        conn.execute(
+            "UPDATE broadcast_chunks SET status = 'sending' WHERE broadcast_id = ? AND chunk = ?",
+            (broadcast_id, chunk['chunk']),
+        )
+        (template,) = conn.execute("SELECT template FROM broadcasts WHERE id = ?", (broadcast_id,)).fetchone()
+        recipients = json.loads(chunk['recipients'])
+        outcomes, attempts = self._send(template, recipients, lambda: self._renew_lease(conn, broadcast_id))
+        accepted = sum(len(group) for group, status, _ in outcomes if status == 'sent')
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # A worker that took the job over has already marked this chunk 'unknown'; leave its record alone
+            if not self._renew_lease(conn, broadcast_id):
+                conn.execute("COMMIT")
+                logger.warning(
+                    "Broadcast %s chunk %s: lease lost while sending (%s/%s accepted); result not recorded",
+                    broadcast_id, chunk['chunk'], accepted, len(recipients)
+                )
+                return True
+            self._record_chunk(conn, broadcast_id, chunk['chunk'], outcomes, attempts)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        logger.info("Broadcast %s chunk %s: %s/%s accepted", broadcast_id, chunk['chunk'], accepted, len(recipients))
+        return True
+
+    @staticmethod
+    def _record_chunk(conn: sqlite3.Connection, broadcast_id: int, chunk: int,
+                      outcomes: list[tuple[list[dict], str, Optional[str]]], attempts: int):
+        """
+        Store the result of a chunk (inside the caller's transaction).
+
+        Recipients whose outcome differs from the first are split off into
+        chunks of their own at the end of the job, so every chunk has one
+        status: 'sent', 'failed', 'unknown' (may have been sent; never
+        resent) or 'pending' (not attempted; sent later).
+        """
+        now = datetime.now().isoformat(timespec='seconds')
+        parts = []
+        for status in ('sent', 'failed', 'unknown', 'pending'):
+            recipients = [recipient for group, outcome, _ in outcomes if outcome == status for recipient in group]
+            if recipients:
+                errors = [error for _, outcome, error in outcomes if outcome == status and error]
+                parts.append((status, recipients, "; ".join(dict.fromkeys(errors)) or None))
+
+        (next_chunk,) = conn.execute(
+            "SELECT MAX(chunk) + 1 FROM broadcast_chunks WHERE broadcast_id = ?", (broadcast_id,)
+        ).fetchone()
+        for index, (status, recipients, error) in enumerate(parts):
+            attempted = status != 'pending'
+            values = (
+                status, json.dumps(recipients), len(recipients) if status == 'sent' else 0,
+                attempts if attempted else 0, error, now if attempted else None,
+            )
+            if index == 0:
+                conn.execute(
+                    "UPDATE broadcast_chunks SET status = ?, recipients = ?, accepted = ?, attempts = ?, error = ?, "
+                    "sent_at = ? WHERE broadcast_id = ? AND chunk = ?",
+                    (*values, broadcast_id, chunk),
+                )
+            else:
+                conn.execute(
+                    "INSERT INTO broadcast_chunks (status, recipients, accepted, attempts, error, sent_at, broadcast_id, chunk) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (*values, broadcast_id, next_chunk),
+                )
+                next_chunk += 1
+
+        counts = {status: len(recipients) for status, recipients, _ in parts}
+        conn.execute(
+            "UPDATE broadcasts SET chunks = chunks + ?, sent = sent + ?, failed = failed + ?, updated_at = ? WHERE id = ?",
+            (max(0, len(parts) - 1), counts.get('sent', 0), counts.get('failed', 0), now, broadcast_id),
+        )
+
+    def _send(self, template: str, recipients: list[dict],
+              renew_lease: Callable[[], bool]) -> tuple[list[tuple[list[dict], str, Optional[str]]], int]:
+        """
+        Send one chunk: one mNotify call per distinct rendered message.
+
+        A call that timed out waiting for mNotify's answer is not retried (the
+        100 numbers may already have been accepted); its recipients are
+        reported 'unknown'. Stopping the worker, or losing the lease, ends
+        the chunk early and reports the messages not yet sent as 'pending'.
+
+        Args:
+            template: Message template
+            recipients: The chunk's recipients
+            renew_lease: Called before every mNotify call; returns False once
+                the job belongs to another worker, which stops the chunk
+
+        Returns:
+            tuple: ([(recipients, 'sent' | 'failed' | 'unknown' | 'pending', error or None)], attempts used)
+        """
+        groups: dict[str, list[dict]] = {}
+        for recipient in recipients:
+            groups.setdefault(render_message(template, recipient), []).append(recipient)
+
+        outcomes = []
+        attempts = 0
+        lease_lost = False
+        for message, group in groups.items():
+            if lease_lost or self._stopping.is_set():
+                outcomes.append((group, 'pending', None))
+                continue
+            numbers = [recipient['phone'] for recipient in group]
+            outcome = None
+            for attempt in range(1, sms_dispatcher.max_attempts + 1):
+                if not renew_lease():
+                    # The worker that took the job over decides about the rest
+                    lease_lost = True
+                    outcome = (group, 'pending', None)
+                    break
+                attempts = max(attempts, attempt)
+                try:
+                    response_data = sms_service.post_sms(numbers, message)
+                except SMSDeliveryUnknownError as e:
+                    outcome = (group, 'unknown', f"{str(e)}; not resent to avoid duplicates")
+                    break
+                except SMSTransientError as e:
+                    if attempt == sms_dispatcher.max_attempts:
+                        outcome = (group, 'failed', str(e))
+                    elif self._stopping.wait(sms_dispatcher.backoff_delay(attempt)):
+                        # Shutting down: leave it for the next start instead of giving up on it
+                        outcome = (group, 'pending', None)
+                    else:
+                        continue
+                    break
+                except Exception as e:
+                    outcome = (group, 'failed', f"Failed to send SMS: {str(e)}")
+                    break
+                if sms_service.is_success(response_data):
+                    sent = sms_service.accepted_recipients(response_data, numbers)
+                    outcomes.append(([recipient for recipient in group if recipient['phone'] in sent], 'sent', None))
+                    rejected = [recipient for recipient in group if recipient['phone'] not in sent]
+                    outcome = (rejected, 'failed', "Not accepted by mNotify") if rejected else None
+                else:
+                    outcome = (group, 'failed', f"mNotify error: {response_data.get('message')}")
+                break
+            if outcome is not None:
+                outcomes.append(outcome)
+        return outcomes, attempts
+
+    def _run(self):
+        """Worker loop: send chunks at the configured rate until stopped."""
+        interval = 60.0 / max(settings.broadcast_chunks_per_minute, 0.001)
+        while not self._stopping.is_set():
+            try:
+                if self.send_next_chunk():
+                    self._stopping.wait(interval)
+                    continue
+            except Exception as e:
+                logger.error("Broadcast worker error: %s", e)
+            # Nothing to send (or an error) - sleep until a job is created or resumed
+            self._wake.wait(IDLE_POLL_SECONDS)
+            self._wake.clear()
+
+    def start(self):
+        """Start the background worker if it is not already running."""
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name="sms-broadcast", daemon=True)
+            self._thread.start()
+            logger.info("Broadcast worker started")
+
+    def resume(self):
+        """Start the worker if an earlier run left broadcasts in the database."""
+        if os.path.exists(self.path):
+            self.start()
+
+    def stop(self, timeout: float = 30.0):
+        """Finish the mNotify call in flight and stop; unsent messages resume on next start."""
+        self._stopping.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout)
+        # Release leases so another worker can continue straight away
+        if self._opened:
+            self._connection().execute(
+                "UPDATE broadcasts SET owner = NULL, lease_until = 0 WHERE owner = ?", (self.owner,)
+            )
+
+
+# Global instance
+broadcast_runner = BroadcastRunner(settings.broadcast_db_path)
@@ -4,7 +4,7 @@ Uses Pydantic Settings to load and validate environment variables.
 """
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import Optional
+from typing import Literal, Optional
 
 
 class Settings(BaseSettings):
@@ -19,6 +19,7 @@ class Settings(BaseSettings):
     
     # mNotify SMS Configuration (Ghana-based SMS service)
     mnotify_api_key: str
+    mnotify_api_url: str = "https://api.mnotify.com/api"
     
     # Application Configuration
     secret_key: str
@@ -30,6 +31,172 @@ class Settings(BaseSettings):
     youtube_url: str
     frontend_url: str = "http://localhost:8000"
 
+    # Google Sheets write-behind batching (optional)
+    # When enabled, registrations are buffered and written with one
+    # append_rows call per batch instead of one append_row per request.
+    sheets_batch_enabled: bool = False
+    sheets_batch_size: int = 50  # Flush when this many rows are waiting...
+    sheets_batch_interval_ms: int = 1000  # ...or when the oldest row has waited this long
+    sheets_batch_max_pending: int = 500  # Reject new rows beyond this (backpressure)
+
+    # Local registration journal (optional)
+    # When enabled, registrations are committed to a local SQLite file first
+    # and synced to Google Sheets by a background worker.
+    journal_enabled: bool = False
+    journal_path: str = "registrations.db"
+    journal_commit_interval_ms: int = 10  # Group-commit window for concurrent inserts
+    journal_sync_interval_seconds: float = 2.0
+    journal_sync_batch_size: int = 100
+
+    # Refresh the Google OAuth token this many seconds before it expires
+    sheets_token_refresh_margin_seconds: int = 300
+
+    # Concurrency caps for blocking client calls (threads per dependency)
+    sheets_max_concurrency: int = 4
+    sms_max_concurrency: int = 8
+
+    # SMS dispatch queue
+    # When enabled, /api/register only queues the confirmation SMS and
+    # background workers deliver it with retries.
+    sms_dispatch_enabled: bool = True
+    sms_dispatch_workers: int = 4
+    sms_queue_size: int = 1000
+    sms_max_attempts: int = 5
+    sms_retry_base_delay_seconds: float = 1.0
+    sms_retry_max_delay_seconds: float = 30.0
+    sms_timeout_seconds: float = 10.0  # Per mNotify HTTP call
+
+    # Coalesce queued confirmations with identical text into one mNotify call.
+    # Only works with personalization and SMS_INCLUDE_TICKET both off (the
+    # defaults make every confirmation unique, and coalescing is then skipped).
+    sms_coalesce_enabled: bool = False
+    sms_coalesce_window_ms: int = 500
+    sms_coalesce_max_recipients: int = 100
+    sms_personalize_confirmation: bool = True
+
+    # Authenticate to Google and open the mNotify connection pool in the
+    # background right after startup, so the first registration after a
+    # cold start doesn't pay for it
+    prewarm_enabled: bool = True
+    prewarm_delay_seconds: float = 0.0
+
+    # Background health probing
+    health_probe_interval_seconds: float = 30.0
+    # /api/ready reports not ready once a queue is this full (0-1)
+    health_queue_backpressure_ratio: float = 0.9
+
+    # How often each worker copies its queue depths into the /metrics gauges
+    metrics_refresh_interval_seconds: float = 5.0
+
+    # Only accept MTN, Telecel and AT mobile numbers (rejects landlines and
+    # unknown prefixes at validation time)
+    phone_validate_network: bool = False
+
+    # Per-IP limit on /api/register (slowapi syntax)
+    register_rate_limit: str = "5/minute"
+
+    # Answer repeat submissions (Idempotency-Key header, or same name with the
+    # same phone/email) with the original response instead of saving again
+    dedup_enabled: bool = True
+    # Submissions in progress and accepted registrations are shared by all
+    # workers through this SQLite file (keep it on local disk)
+    dedup_db_path: str = "dedup.db"
+
+    # Batch registration (/api/register/batch): separate per-IP quota and size cap
+    batch_rate_limit: str = "10/hour"
+    batch_max_records: int = 500
+    batch_max_bytes: int = 1_048_576  # Request body cap (500 full records fit in ~750 KB)
+
+    # Rate limit storage shared by all workers. Empty = SQLite file in the temp
+    # directory (one host); use redis://host:6379 when running several nodes.
+    rate_limit_storage_uri: str = ""
+
+    # Bearer token for organizer endpoints (/api/registrations/export, ...).
+    # Leave unset to disable them.
+    admin_token: Optional[str] = None
+    # Bearer token Prometheus sends to scrape /metrics (ADMIN_TOKEN also works)
+    metrics_token: Optional[str] = None
+
+    # Rows per Google Sheets range read when streaming exports
+    export_chunk_size: int = 500
+
+    # /api/stats counts are kept in this SQLite file, shared by all workers,
+    # and rebuilt from the sheet this often by one of them (corrects any missed update)
+    stats_reconcile_interval_seconds: float = 300.0
+    stats_db_path: str = "stats.db"
+
+    # Signed tickets: included in the confirmation SMS (which makes every
+    # message unique, so coalescing needs this off) and buffered door
+    # check-in writes to the "Check-ins" worksheet
+    sms_include_ticket: bool = True
+    checkin_batch_interval_ms: int = 2000
+    # Check-ins and newly issued tickets, shared by all workers on this host
+    checkin_db_path: str = "checkins.db"
+
+    # Typeahead suggestions (/api/suggest) for church, institution and city.
+    # Typed values are only suggested once this many registrations used them;
+    # SUGGEST_SEED_FILE adds curated values ({"church": [...], ...}) to the built-in list.
+    suggest_rate_limit: str = "120/minute"
+    suggest_limit: int = 8
+    suggest_min_count: int = 2
+    suggest_cache_seconds: int = 300
+    suggest_seed_file: Optional[str] = None
+
+    # Bulk SMS broadcasts (/api/broadcasts): progress is kept in this SQLite
+    # file so an interrupted broadcast resumes without double-sending
+    broadcast_db_path: str = "broadcasts.db"
+    broadcast_chunk_size: int = 100  # Numbers per mNotify call
+    broadcast_chunks_per_minute: float = 30.0
+
+    # Google Sheets quota governor: calls are paced to stay under the per-minute
+    # read/write quota (shared by SHEETS_QUOTA_WORKERS processes, default
+    # WEB_CONCURRENCY - the uvicorn worker count) and parked up
+    # to SHEETS_QUOTA_MAX_WAIT_SECONDS for a token. The circuit breaker opens
+    # after this many consecutive 429/5xx responses and fails fast until reset.
+    sheets_read_quota_per_minute: float = 60.0
+    sheets_write_quota_per_minute: float = 60.0
+    sheets_quota_workers: Optional[int] = None
+    web_concurrency: int = 1
+    sheets_quota_burst: int = 10
+    sheets_quota_max_wait_seconds: float = 10.0
+    sheets_breaker_threshold: int = 5
+    sheets_breaker_reset_seconds: float = 30.0
+
+    # Worksheet sharding: "none" keeps every registration on the first
+    # worksheet; "day", "event" (SHEETS_SHARD_EVENT, default CONFERENCE_NAME)
+    # or "rows" (every SHEETS_SHARD_ROWS rows) start new worksheets as the
+    # sheet grows. Readers fan out over the shards listed on the "Shards" worksheet.
+    sheets_shard_policy: Literal["none", "day", "event", "rows"] = "none"
+    sheets_shard_rows: int = 20000
+    sheets_shard_event: str = ""
+    sheets_shard_read_concurrency: int = 4
+
+    # Rows per Google Sheets range read when reconciling the sheet
+    # (python -m app.reconcile, POST /api/reconcile)
+    reconcile_chunk_size: int = 5000
+
+    # Adaptive admission control for /api/register: each worker's concurrency
+    # limit grows while responses are faster than ADMISSION_TARGET_LATENCY_MS
+    # and is cut by ADMISSION_BACKOFF_RATIO when they get slower (AIMD).
+    # Registrations over the limit get an immediate 503 with Retry-After;
+    # health checks and check-ins are never shed.
+    admission_enabled: bool = True
+    admission_initial_limit: int = 20
+    admission_min_limit: int = 2
+    admission_max_limit: int = 200
+    admission_target_latency_ms: float = 2000.0
+    admission_backoff_ratio: float = 0.8
+    admission_max_retry_after_seconds: int = 30
+
+    # Logging: records are queued and written by a background thread as JSON
+    # lines (or "text"); records beyond LOG_QUEUE_SIZE are dropped rather than
+    # blocking. LOG_SAMPLE_RATES keeps a fraction of the INFO events of the
+    # given loggers, e.g. {"uvicorn.access": 0.1, "app.routes": 0.5}.
+    log_level: str = "INFO"
+    log_format: Literal["json", "text"] = "json"
+    log_queue_size: int = 10000
+    log_sample_rates: dict[str, float] = {}
+
     # Frontend Configuration
     frontend_path: str = "../frontend"
 
@@ -0,0 +1,359 @@
+"""
+Duplicate-submission detection for registrations.
+
+A repeat submission is recognised by its Idempotency-Key header or by the
+registrant's normalized name together with their phone number or email,
+and is answered with the original response instead of another sheet row
+and another SMS. Keys are kept in a SQLite file (DEDUP_DB_PATH) so a
+resubmission is caught whichever worker process it reaches.
+"""
+
+import asyncio
+import json
+import logging
+import math
+import os
+import re
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+from .config import settings
+from .phone import parse_phone
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Longest Idempotency-Key header value that is honoured
+MAX_IDEMPOTENCY_KEY_LENGTH = 255
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_name(name: str) -> str:
+    """Case-fold a name and collapse its whitespace."""
+    return _WHITESPACE.sub(" ", (name or "").strip()).casefold()
+
+
+def normalize_email(email: str) -> str:
+    return (email or "").strip().lower()
+
+
+def registration_keys(data: dict, idempotency_key: Optional[str] = None) -> list[str]:
+    """
+    Index keys identifying a registration.
+
+    Args:
+        data: Sanitized registration data
+        idempotency_key: Client-supplied Idempotency-Key header, if any
+
+    Returns:
+        list[str]: Keys to look up / store (empty if the registration can't be matched)
+    """
+    keys = []
+    if idempotency_key:
+        keys.append(f"key:{idempotency_key[:MAX_IDEMPOTENCY_KEY_LENGTH]}")
+    name = normalize_name(data.get('full_name', ''))
+    if name:
+        # The name is part of each key so family members sharing a phone can still register
+        phone = parse_phone(str(data.get('phone') or ''))
+        if phone:
+            keys.append(f"phone:{name}|{phone.national}")
+        email = normalize_email(data.get('email', ''))
+        if email:
+            keys.append(f"email:{name}|{email}")
+    return keys
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS registration_keys (
+    key TEXT PRIMARY KEY,
+    response TEXT,
+    owner TEXT NOT NULL,
+    claimed_at REAL NOT NULL
+);
+"""
+
+# A reservation older than this is abandoned (its worker died mid-save) and may be taken over
+PENDING_TIMEOUT_SECONDS = 120.0
+
+# How often a submission waiting on another worker's pending duplicate checks again
+PENDING_POLL_SECONDS = 0.1
+
+# Allowance for the Google Sheets call of a save, on top of SHEETS_QUOTA_MAX_WAIT_SECONDS
+SAVE_CALL_SECONDS = 10.0
+
+# Outcomes of a reservation attempt
+RESERVED, DONE, PENDING = "reserved", "done", "pending"
+
+
+def pending_wait_seconds() -> float:
+    """How long a duplicate waits for the original to be saved: about one save's budget."""
+    return settings.sheets_quota_max_wait_seconds + SAVE_CALL_SECONDS
+
+
+class RegistrationPendingError(Exception):
+    """Raised when the original of a duplicate is still being saved after pending_wait_seconds()."""
+
+    def __init__(self, retry_after: float):
+        super().__init__("The original registration is still being saved")
+        self.retry_after = retry_after
+
+
+class RegistrationIndex:
+    """
+    Index of accepted registrations, shared by every worker through a SQLite file.
+
+    Every accepted registration is stored under each of its keys with the
+    `data` of the response it received. Submissions still being saved are
+    reserved (a row without a response), so a double-click - or a retry
+    routed to another worker - waits for the first request and gets its
+    response instead of being saved twice.
+
+    Registrations already in the sheet are cached in memory by each worker
+    (filled at startup by the registration seeder) and answered without
+    touching the file. File access runs on one background thread per
+    worker; completions and releases are written in the background in the
+    order they happen.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Location of the SQLite database file
+        """
+        self.path = path
+        self.owner = f"{os.getpid()}-{id(self)}"
+        self._responses: dict[str, dict] = {}  # Known registrations (this worker's cache)
+        self._pending: dict[str, asyncio.Future] = {}  # Keys reserved by this worker
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="dedup")
+        self._conn: Optional[sqlite3.Connection] = None
+        self.loaded = False
+
+    def __len__(self) -> int:
+        return len(self._responses)
+
+    def _connection(self) -> sqlite3.Connection:
+        """The index thread's connection, creating the file and table on first use."""
+        if self._conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def _reserve(self, key_lists: list[list[str]]) -> list[tuple[str, Optional[dict]]]:
+        """
+        Reserve each list of keys in one transaction (blocking; index thread only).
+
+        Returns:
+            list: (RESERVED, None), (DONE, response data) or (PENDING, None) per list
+        """
+        conn = self._connection()
+        now = time.time()
+        results = []
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for keys in key_lists:
+                rows = conn.execute(
+                    f"SELECT response, claimed_at FROM registration_keys WHERE key IN ({', '.join('?' * len(keys))})",
+                    keys,
+                ).fetchall()
+                done = next((json.loads(response) for response, _ in rows if response is not None), None)
+                if done is not None:
+                    results.append((DONE, done))
+                elif any(claimed_at > now - PENDING_TIMEOUT_SECONDS for _, claimed_at in rows):
+                    results.append((PENDING, None))
+                else:
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO registration_keys (key, response, owner, claimed_at) VALUES (?, NULL, ?, ?)",
+                        [(key, self.owner, now) for key in keys],
+                    )
+                    results.append((RESERVED, None))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return results
+
+    def _store(self, items: list[tuple[list[str], dict]]):
+        """Record the responses of saved registrations (blocking; index thread only)."""
+        now = time.time()
+        self._connection().executemany(
+            "INSERT OR REPLACE INTO registration_keys (key, response, owner, claimed_at) VALUES (?, ?, ?, ?)",
+            [(key, json.dumps(response), self.owner, now) for keys, response in items for key in keys],
+        )
+
+    def _unreserve(self, keys: list[str]):
+        """Delete this worker's reservations that were never completed (blocking; index thread only)."""
+        self._connection().executemany(
+            "DELETE FROM registration_keys WHERE key = ? AND response IS NULL AND owner = ?",
+            [(key, self.owner) for key in keys],
+        )
+
+    def _write(self, fn, *args):
+        """Queue a write on the index thread; failures are logged (the reservation times out)."""
+        future = self._executor.submit(fn, *args)
+        future.add_done_callback(self._log_write_failure)
+
+    @staticmethod
+    def _log_write_failure(future):
+        if future.exception() is not None:
+            logger.error("Failed to update the duplicate index: %s", future.exception())
+
+    async def _reserve_async(self, key_lists: list[list[str]]) -> list[tuple[str, Optional[dict]]]:
+        """Run _reserve on the index thread and track the keys reserved for this worker."""
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._executor, self._reserve, key_lists)
+
+        def track(results: list[tuple[str, Optional[dict]]]):
+            for keys, (status, response) in zip(key_lists, results):
+                if status == RESERVED:
+                    pending = loop.create_future()
+                    for key in keys:
+                        self._pending[key] = pending
+                elif status == DONE:
+                    for key in keys:
+                        self._responses[key] = response
+
+        try:
+            results = await asyncio.shield(future)
+        except asyncio.CancelledError:
+            # The caller is gone (client disconnected): give back whatever was reserved for it
+            def give_back(done: asyncio.Future):
+                if not done.cancelled() and done.exception() is None:
+                    track(done.result())
+                    for keys, (status, _) in zip(key_lists, done.result()):
+                        if status == RESERVED:
+                            self.release(keys)
+            future.add_done_callback(give_back)
+            raise
+        track(results)
+        return results
+
+    async def claim(self, keys: list[str]) -> Optional[dict]:
+        """
+        Reserve keys for a new registration, waiting out a pending duplicate.
+
+        Returns:
+            dict: Response data of the original registration, or None if the
+            keys were reserved and the caller should go ahead and save
+            (and later call complete() or release())
+
+        Raises:
+            RegistrationPendingError: If the original is still being saved
+                after pending_wait_seconds() (the caller should answer with
+                Retry-After instead of holding the connection)
+        """
+        if not keys:
+            return None
+        deadline = time.monotonic() + pending_wait_seconds()
+        while True:
+            known = next((self._responses[key] for key in keys if key in self._responses), None)
+            if known is not None:
+                return known
+            remaining = deadline - time.monotonic()
+            local = next((self._pending[key] for key in keys if key in self._pending), None)
+            if local is not None:
+                # Pending on this worker: resolves with its response, or None if it failed (then try again)
+                try:
+                    response = await asyncio.wait_for(asyncio.shield(local), max(remaining, 0))
+                except asyncio.TimeoutError:
+                    raise RegistrationPendingError(self._retry_after())
+                if response is not None:
+                    return response
+                continue
+            [(status, response)] = await self._reserve_async([keys])
+            if status == RESERVED:
+                return None
+            if status == DONE:
+                return response
+            # Pending on another worker
+            if remaining <= 0:
+                raise RegistrationPendingError(self._retry_after())
+            await asyncio.sleep(min(PENDING_POLL_SECONDS, remaining))
+
+    @staticmethod
+    def _retry_after() -> int:
+        """Seconds a duplicate that gave up waiting should wait before trying again."""
+        return max(1, math.ceil(pending_wait_seconds() / 4))
+
+    async def claim_each(self, key_lists: list[list[str]]) -> list[bool]:
+        """
+        Reserve the keys of several registrations without waiting (batch imports).
+
+        Returns:
+            list[bool]: True where the keys were reserved, False for duplicates
+            of a saved, pending or earlier registration in the same call
+        """
+        reserved = [False] * len(key_lists)
+        to_check = []
+        for index, keys in enumerate(key_lists):
+            if not keys:
+                reserved[index] = True
+            elif not any(key in self._responses or key in self._pending for key in keys):
+                to_check.append(index)
+        if to_check:
+            results = await self._reserve_async([key_lists[index] for index in to_check])
+            for index, (status, _) in zip(to_check, results):
+                reserved[index] = status == RESERVED
+        return reserved
+
+    def complete(self, keys: list[str], response: dict):
+        """Record the response of a saved registration and release waiting duplicates."""
+        self.complete_many([(keys, response)])
+
+    def complete_many(self, items: list[tuple[list[str], dict]]):
+        items = [(keys, response) for keys, response in items if keys]
+        if not items:
+            return
+        for keys, response in items:
+            for key in keys:
+                self._responses[key] = response
+            self._resolve(keys, response)
+        self._write(self._store, items)
+
+    def release(self, keys: list[str]):
+        """
+        Drop a reservation whose registration was not saved. Only pass keys
+        the caller reserved; keys already completed are left alone, so it is
+        safe to call in a `finally`.
+        """
+        owned = [key for key in keys if key in self._pending]
+        if not owned:
+            return
+        self._resolve(owned, None)
+        self._write(self._unreserve, owned)
+
+    def _resolve(self, keys: list[str], response: Optional[dict]):
+        futures = {self._pending.pop(key) for key in keys if key in self._pending}
+        for future in futures:
+            if not future.done():
+                future.set_result(response)
+
+    def add(self, data: dict, response: dict):
+        """Index an existing registration (no reservation involved)."""
+        for key in registration_keys(data):
+            self._responses.setdefault(key, response)
+
+    def rebuild(self, registrations: list[dict]):
+        """Cache saved registrations (merged with anything accepted meanwhile)."""
+        for registration in registrations:
+            self.add(registration, {
+                'name': registration.get('full_name', ''),
+                'sms_sent': False,
+                'sms_message': 'Already registered',
+                'ticket': registration.get('ticket', ''),
+            })
+        self.loaded = True
+        logger.info("Indexed %s existing registration(s) for duplicate detection", len(registrations))
+
+    def close(self):
+        """Finish queued writes and release the index thread."""
+        self._executor.shutdown(wait=True)
+
+
+# Global instance
+registration_index = RegistrationIndex(settings.dedup_db_path)
@@ -0,0 +1,77 @@
+"""
+Bounded executors for blocking client libraries (gspread, requests).
+Keeps slow Google / mNotify calls off the event loop, with a separate cap per dependency.
+"""
+
+import asyncio
+import contextvars
+import functools
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+from .config import settings
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+
+class DependencyExecutor:
+    """
+    Thread pool dedicated to one external dependency.
+
+    The pool size is the dependency's concurrency cap: at most
+    `max_concurrency` calls are in flight at once, further calls wait their
+    turn without blocking the event loop or the other dependency's pool.
+    """
+
+    def __init__(self, name: str, max_concurrency: int):
+        """
+        Args:
+            name: Dependency name, used for thread names and logging
+            max_concurrency: Maximum number of simultaneous calls
+        """
+        self.name = name
+        self.max_concurrency = max(1, max_concurrency)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrency,
+            thread_name_prefix=name,
+        )
+        self._lock = threading.Lock()
+        self._in_flight = 0
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """
+        Run a blocking callable in this dependency's pool and await its result.
+
+        Args:
+            fn: Blocking function to call
+            *args, **kwargs: Arguments passed to fn
+
+        Returns:
+            Whatever fn returns (exceptions are re-raised)
+        """
+        loop = asyncio.get_running_loop()
+        # Run in a copy of the caller's context so log lines keep the request's correlation ID
+        call = functools.partial(contextvars.copy_context().run, fn, *args, **kwargs)
+        with self._lock:
+            self._in_flight += 1
+        try:
+            return await loop.run_in_executor(self._executor, call)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def in_flight(self) -> int:
+        """Number of calls currently running or waiting for a thread."""
+        return self._in_flight
+
+    def shutdown(self):
+        """Wait for running calls to finish and release the threads."""
+        self._executor.shutdown(wait=True)
+        logger.info("Executor '%s' shut down", self.name)
+
+
+# Global instances
+sheets_executor = DependencyExecutor("sheets", settings.sheets_max_concurrency)
+sms_executor = DependencyExecutor("sms", settings.sms_max_concurrency)
@@ -0,0 +1,179 @@
+"""
+Streaming export of registrations from Google Sheets.
+
+Rows are read with range reads of EXPORT_CHUNK_SIZE rows and written out
+as they arrive, so memory use stays flat however large the sheet grows.
+When the sheet is sharded, up to SHEETS_SHARD_READ_CONCURRENCY shards are
+read ahead in parallel (one chunk buffered each) while output stays in
+shard order.
+"""
+
+import asyncio
+import base64
+import csv
+import io
+import json
+from collections import deque
+from contextlib import aclosing
+from datetime import datetime
+from typing import AsyncIterator, Optional
+from .config import settings
+from .executors import sheets_executor
+from .google_sheets import FIELDS, HEADERS, sheets_service, row_to_registration
+
+# Sheet row holding the first registration (row 1 is the header)
+FIRST_DATA_ROW = 2
+
+# Timestamp column format written by GoogleSheetsService.build_row
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+def encode_cursor(row_number: int, shard: int = 0) -> str:
+    """Opaque cursor pointing at a row of a shard (position in the shard manifest)."""
+    position = f"row:{row_number}" if shard == 0 else f"row:{row_number}:{shard}"
+    return base64.urlsafe_b64encode(position.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[int, int]:
+    """
+    Returns:
+        tuple: (shard index, sheet row) the cursor points at
+
+    Raises:
+        InvalidCursorError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        prefix, row_number, *shard = base64.urlsafe_b64decode(padded).decode().split(":")
+        shard_index = int(shard[0]) if shard else 0
+        if prefix != "row" or int(row_number) < FIRST_DATA_ROW or shard_index < 0 or len(shard) > 1:
+            raise ValueError(cursor)
+        return shard_index, int(row_number)
+    except Exception:
+        raise InvalidCursorError("Invalid cursor")
+
+
+def since_key(since: Optional[datetime]) -> str:
+    """Format a `since` filter so it compares directly with Timestamp cells."""
+    return since.strftime(TIMESTAMP_FORMAT) if since else ''
+
+
+async def _read_shard(shard: str, start_row: int, queue: asyncio.Queue):
+    """Read one shard chunk by chunk into `queue` (blocks while the consumer is behind)."""
+    chunk_size = settings.export_chunk_size
+    try:
+        while True:
+            rows = await sheets_executor.run(sheets_service.read_rows, start_row, chunk_size, shard)
+            await queue.put((start_row, rows))
+            if len(rows) < chunk_size:
+                return
+            start_row += chunk_size
+    except Exception as e:
+        await queue.put(e)
+
+
+async def iter_chunks(shards: list[str], first_shard: int = 0, first_row: int = FIRST_DATA_ROW) -> AsyncIterator[tuple]:
+    """
+    Yield (shard index, start row, rows) for every chunk of every shard, in order.
+
+    Shards ahead of the one being consumed are read in parallel, at most
+    SHEETS_SHARD_READ_CONCURRENCY at a time.
+    """
+    chunk_size = settings.export_chunk_size
+    concurrency = max(1, settings.sheets_shard_read_concurrency)
+    readers: deque = deque()
+    next_shard = first_shard
+    try:
+        while readers or next_shard < len(shards):
+            while next_shard < len(shards) and len(readers) < concurrency:
+                queue: asyncio.Queue = asyncio.Queue(maxsize=1)
+                start_row = first_row if next_shard == first_shard else FIRST_DATA_ROW
+                task = asyncio.create_task(_read_shard(shards[next_shard], start_row, queue))
+                readers.append((next_shard, queue, task))
+                next_shard += 1
+            index, queue, _ = readers[0]
+            item = await queue.get()
+            if isinstance(item, Exception):
+                raise item
+            start_row, rows = item
+            yield index, start_row, rows
+            if len(rows) < chunk_size:
+                readers.popleft()
+    finally:
+        for _, _, task in readers:
+            task.cancel()
+
+
+async def iter_registrations(
+    after: Optional[str] = None,
+    since: Optional[datetime] = None,
+    limit: Optional[int] = None,
+) -> AsyncIterator[dict]:
+    """
+    Yield registrations in sheet order, reading one chunk at a time.
+
+    Args:
+        after: Cursor of the last registration already received
+        since: Only registrations with a Timestamp at or after this time
+        limit: Stop after this many registrations
+
+    Yields:
+        dict: Registration (see row_to_registration) plus its 'cursor'
+    """
+    first_shard, first_row = 0, FIRST_DATA_ROW
+    if after:
+        first_shard, last_row = decode_cursor(after)
+        first_row = last_row + 1
+    minimum = since_key(since)
+    emitted = 0
+    if limit is not None and limit <= 0:
+        return
+    shards = await sheets_executor.run(sheets_service.list_shards)
+    async with aclosing(iter_chunks(shards, first_shard, first_row)) as chunks:
+        async for shard, start_row, rows in chunks:
+            for offset, row in enumerate(rows):
+                if not any(row):
+                    continue
+                registration = row_to_registration(row)
+                if minimum and registration['timestamp'] < minimum:
+                    continue
+                registration['cursor'] = encode_cursor(start_row + offset, shard)
+                yield registration
+                emitted += 1
+                if limit is not None and emitted >= limit:
+                    return
+
+
+def csv_header() -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(HEADERS + ['Cursor'])
+    return buffer.getvalue()
+
+
+def csv_line(registration: dict) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(
+        [registration['timestamp']]
+        + [registration[field] for field in FIELDS]
+        + [registration['status'], registration['ticket'], registration['cursor']]
+    )
+    return buffer.getvalue()
+
+
+def ndjson_line(registration: dict) -> str:
+    return json.dumps(registration, ensure_ascii=False) + "\n"
+
+
+async def stream_export(export_format: str, **filters) -> AsyncIterator[str]:
+    """Render iter_registrations as CSV (with a header row) or NDJSON text chunks."""
+    if export_format == "csv":
+        yield csv_header()
+        async for registration in iter_registrations(**filters):
+            yield csv_line(registration)
+    else:
+        async for registration in iter_registrations(**filters):
+            yield ndjson_line(registration)
@@ -3,28 +3,138 @@ Google Sheets integration for storing registration data.
 Uses gspread library with service account authentication.
 """
 
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
-from datetime import datetime
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from typing import TYPE_CHECKING, Optional
 import logging
+import re
+import threading
 from .config import settings
+from .batching import BatchDispatcher
+from .sheets_quota import READ, WRITE, SheetsUnavailableError, is_overload_error, sheets_governor
+
+if TYPE_CHECKING:
+    # gspread and oauth2client are imported on first use so they stay off
+    # the cold-start path (together they take a few hundred ms to import)
+    import gspread
+    from oauth2client.service_account import ServiceAccountCredentials
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
+# Column order of the registrations sheet
+HEADERS = [
+    'Timestamp',
+    'Full Name',
+    'Phone',
+    'Church',
+    'Institution',
+    'City/Location',
+    'Leader/Inviter',
+    'Email',
+    'Contact Method',
+    'First-Time Attendee',
+    'Prayer Request',
+    'Status',
+    'Ticket'
+]
+
+STATUS_COLUMN = HEADERS.index('Status')
+TICKET_COLUMN = HEADERS.index('Ticket')
+
+# Statuses of rows that don't count as registrations ('Failed' is the save
+# fallback; the others are set by the reconciliation tool)
+INACTIVE_STATUSES = ('Failed', 'Duplicate', 'Incomplete')
+
+# Door check-ins are appended to their own worksheet
+CHECKIN_WORKSHEET = 'Check-ins'
+CHECKIN_HEADERS = ['Timestamp', 'Ticket', 'Full Name', 'Scanner']
+
+# Worksheet sharding (SHEETS_SHARD_POLICY): registrations go to worksheets
+# named after the policy, listed in write order on the manifest worksheet
+SHARD_PREFIX = 'Registrations'
+MANIFEST_WORKSHEET = 'Shards'
+MANIFEST_HEADERS = ['Worksheet', 'Created', 'Policy']
+
+# Under the "rows" policy the next shard is created in the background once
+# the current one is this full, so the append that rotates doesn't wait for it
+SHARD_PREPARE_RATIO = 0.9
+
+# Characters Google Sheets doesn't allow in worksheet titles
+_INVALID_TITLE_CHARS = re.compile(r"[\[\]:*?/\\]")
+
+# Last row of an append response's updatedRange, e.g. "'Registrations 001'!A2:M51"
+_UPDATED_LAST_ROW = re.compile(r"(\d+)$")
+
+# Registration dict keys stored in the columns between Timestamp and Status
+FIELDS = [
+    'full_name',
+    'phone',
+    'church',
+    'institution',
+    'city',
+    'leader',
+    'email',
+    'contact_method',
+    'first_time_attendee',
+    'prayer_request',
+]
+
+# Bump whenever HEADERS changes so cached header state is re-validated
+SCHEMA_VERSION = 2
+
+
+def row_to_registration(row: list) -> dict:
+    """
+    Map a sheet row back to a registration dict.
+    
+    Returns:
+        dict: FIELDS plus 'timestamp', 'status' and 'ticket' (missing cells are '')
+    """
+    padded = list(row) + [''] * (len(HEADERS) - len(row))
+    registration = dict(zip(FIELDS, (str(value) for value in padded[1:len(FIELDS) + 1])))
+    registration['timestamp'] = padded[0]
+    registration['status'] = padded[STATUS_COLUMN]
+    registration['ticket'] = padded[TICKET_COLUMN]
+    return registration
+
 
 class GoogleSheetsService:
     """
     Service class for interacting with Google Sheets API.
+    
+    Manages the connection lifecycle: it authenticates once, refreshes the
+    OAuth token in the background before it expires, and caches the
+    spreadsheet/worksheet handles and the verified header row. The cache
+    is only re-validated after an API error or a SCHEMA_VERSION change.
+    
+    With SHEETS_SHARD_POLICY set, `worksheet` is the current shard: appends
+    rotate to a new worksheet per day, per event or every SHEETS_SHARD_ROWS
+    rows, so no single tab keeps growing. New shards are created with the
+    header row already in place and added to the "Shards" manifest, which
+    readers use to fan out across every shard.
     """
     
     def __init__(self):
         """Initialize the Google Sheets client with service account credentials."""
         self.credentials_path = settings.google_sheets_credentials_path
         self.sheet_id = settings.google_sheet_id
-        self.client: Optional[gspread.Client] = None
+        self.client: Optional["gspread.Client"] = None
+        self.credentials: Optional["ServiceAccountCredentials"] = None
+        self.spreadsheet = None
         self.worksheet = None
+        self.headers_version: Optional[int] = None
+        self.checkin_worksheet = None
+        self.manifest_worksheet = None
+        self.shard_handles: dict = {}  # worksheet title -> handle
+        self.shard_title: Optional[str] = None
+        self.shard_index = 1  # Number of the current shard under the "rows" policy
+        self.shard_rows: Optional[int] = None  # Last used row of the current shard, when known
+        self.created_shards: set[str] = set()  # Shards this process created (header row known)
+        self._preparing = False
+        self._lock = threading.Lock()
+        self._refresher: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
     
     def authenticate(self):
         """
@@ -39,6 +149,9 @@ class GoogleSheetsService:
         6. Share your Google Sheet with the service account email
         """
         try:
+            import gspread
+            from oauth2client.service_account import ServiceAccountCredentials
+            
             scope = [
                 'https://spreadsheets.google.com/feeds',
                 'https://www.googleapis.com/auth/drive'
@@ -49,26 +162,37 @@ class GoogleSheetsService:
                 scope
             )
             
+            self.credentials = creds
             self.client = gspread.authorize(creds)
             logger.info("Successfully authenticated with Google Sheets API")
+            self._start_token_refresher()
             
         except FileNotFoundError:
             logger.error("Credentials file not found")
             raise Exception(f"Google Sheets credentials file not found. Please check {self.credentials_path}")
         except Exception as e:
-            logger.error(f"Failed to authenticate with Google Sheets: {str(e)}")
+            logger.error("Failed to authenticate with Google Sheets: %s", e)
             raise Exception(f"Google Sheets authentication failed: {str(e)}")
     
     def get_worksheet(self):
         """Open the Google Sheet and get the first worksheet."""
+        import gspread
+        
         try:
             if not self.client:
                 self.authenticate()
             
-            sheet = self.client.open_by_key(self.sheet_id)
-            self.worksheet = sheet.get_worksheet(0)  # Get first sheet
-            logger.info(f"Successfully opened Google Sheet: {sheet.title}")
+            if not self.spreadsheet:
+                self.spreadsheet = sheets_governor.call(READ, self.client.open_by_key, self.sheet_id)
+            sheet = self.spreadsheet
+            if self.sharded:
+                self._open_write_shard()
+            else:
+                self.worksheet = sheets_governor.call(READ, sheet.get_worksheet, 0)  # Get first sheet
+            logger.info("Successfully opened Google Sheet: %s", sheet.title)
             
+        except SheetsUnavailableError:
+            raise
         except gspread.SpreadsheetNotFound:
             logger.error("Spreadsheet not found - check configuration")
             raise Exception(
@@ -77,9 +201,467 @@ class GoogleSheetsService:
                 "2. The sheet is shared with your service account email"
             )
         except Exception as e:
-            logger.error(f"Failed to open Google Sheet: {str(e)}")
+            logger.error("Failed to open Google Sheet: %s", e)
             raise Exception(f"Failed to open Google Sheet: {str(e)}")
     
+    def ensure_connected(self):
+        """Authenticate and open the worksheet unless cached handles are available."""
+        with self._lock:
+            if not self.worksheet:
+                self.get_worksheet()
+    
+    def ping(self):
+        """
+        Check Google Sheets connectivity with one lightweight metadata read.
+        
+        Raises:
+            Exception: If the spreadsheet cannot be reached
+        """
+        import gspread
+        
+        try:
+            self.ensure_connected()
+            sheets_governor.call(READ, self.spreadsheet.fetch_sheet_metadata)
+        except gspread.exceptions.APIError as e:
+            self.invalidate_after(e)
+            raise
+    
+    def invalidate(self):
+        """Drop cached handles and header state so they are re-validated on next use."""
+        with self._lock:
+            self.spreadsheet = None
+            self.worksheet = None
+            self.headers_version = None
+            self.checkin_worksheet = None
+            self.manifest_worksheet = None
+            self.shard_handles = {}
+            self.shard_title = None
+            self.shard_rows = None
+        logger.info("Invalidated cached Google Sheets state")
+    
+    def invalidate_after(self, error: Exception):
+        """
+        Drop cached state after an API error, unless Google was only overloaded
+        (re-opening the sheet would cost more calls against an exhausted quota).
+        """
+        if not is_overload_error(error):
+            self.invalidate()
+    
+    def status(self) -> dict:
+        """
+        Report the cached connection state without calling the API.
+        
+        Returns:
+            dict: authenticated, worksheet_open, headers_verified, token_expires_in (seconds or None)
+        """
+        expires_in = None
+        expiry = getattr(self.credentials, 'token_expiry', None)
+        if expiry:
+            expires_in = int((expiry - datetime.utcnow()).total_seconds())
+        return {
+            'authenticated': self.client is not None,
+            'worksheet_open': self.worksheet is not None,
+            'headers_verified': self.headers_version == SCHEMA_VERSION,
+            'token_expires_in': expires_in,
+            'shard': self.shard_title,
+        }
+    
+    @property
+    def sharded(self) -> bool:
+        return settings.sheets_shard_policy != 'none'
+    
+    def _shard_due(self, incoming: int) -> bool:
+        """Whether the current "rows" shard is too full for `incoming` more rows."""
+        if self.shard_rows is None:
+            return False
+        data_rows = self.shard_rows - 1  # Row 1 is the header
+        return data_rows > 0 and data_rows + incoming > settings.sheets_shard_rows
+    
+    def target_shard(self, incoming: int = 0) -> str:
+        """Title of the worksheet the next `incoming` rows belong in under SHEETS_SHARD_POLICY."""
+        policy = settings.sheets_shard_policy
+        if policy == 'day':
+            return f"{SHARD_PREFIX} {date.today().isoformat()}"
+        if policy == 'event':
+            event = _INVALID_TITLE_CHARS.sub('', settings.sheets_shard_event or settings.conference_name).strip()
+            return f"{SHARD_PREFIX} - {event}"[:100]
+        index = self.shard_index + 1 if self._shard_due(incoming) else self.shard_index
+        return f"{SHARD_PREFIX} {index:03d}"
+    
+    def get_manifest_worksheet(self):
+        """
+        Open (creating it on first use) the worksheet listing the registration shards in order.
+        
+        The first worksheet is listed first: it holds whatever was registered
+        before sharding was turned on.
+        """
+        import gspread
+        
+        if self.manifest_worksheet is None:
+            try:
+                self.manifest_worksheet = sheets_governor.call(READ, self.spreadsheet.worksheet, MANIFEST_WORKSHEET)
+            except gspread.WorksheetNotFound:
+                first = sheets_governor.call(READ, self.spreadsheet.get_worksheet, 0)
+                try:
+                    worksheet = sheets_governor.call(
+                        WRITE, self.spreadsheet.add_worksheet, MANIFEST_WORKSHEET, rows=100, cols=len(MANIFEST_HEADERS)
+                    )
+                except gspread.exceptions.APIError as e:
+                    if is_overload_error(e):
+                        raise
+                    # Another worker created it first
+                    self.manifest_worksheet = sheets_governor.call(READ, self.spreadsheet.worksheet, MANIFEST_WORKSHEET)
+                    return self.manifest_worksheet
+                created = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                sheets_governor.call(WRITE, worksheet.append_rows, [MANIFEST_HEADERS, [first.title, created, 'none']])
+                self.shard_handles[first.title] = first
+                self.manifest_worksheet = worksheet
+                logger.info("Created the shard manifest worksheet")
+        return self.manifest_worksheet
+    
+    def read_manifest(self) -> list[str]:
+        """
+        Titles of every shard in write order (one API call).
+        
+        Returns:
+            list[str]: Worksheet titles, oldest first
+        """
+        values = sheets_governor.call(READ, self.get_manifest_worksheet().get_all_values)
+        titles = [row[0] for row in values if row and row[0] and row[0] != MANIFEST_HEADERS[0]]
+        return list(dict.fromkeys(titles))
+    
+    def _open_shard(self, title: str) -> tuple:
+        """
+        Open a shard, creating it (header row included) and adding it to the manifest if it doesn't exist.
+        
+        Returns:
+            tuple: (worksheet handle, True if this call created it)
+        """
+        import gspread
+        
+        if title in self.shard_handles:
+            return self.shard_handles[title], False
+        manifest = self.get_manifest_worksheet()
+        created = False
+        try:
+            worksheet = sheets_governor.call(READ, self.spreadsheet.worksheet, title)
+        except gspread.WorksheetNotFound:
+            try:
+                worksheet = sheets_governor.call(
+                    WRITE, self.spreadsheet.add_worksheet, title, rows=1000, cols=len(HEADERS)
+                )
+                created = True
+            except gspread.exceptions.APIError as e:
+                if is_overload_error(e):
+                    raise
+                # Another worker rotated to the same shard first
+                worksheet = sheets_governor.call(READ, self.spreadsheet.worksheet, title)
+        if created:
+            sheets_governor.call(WRITE, worksheet.update, range_name='A1', values=[HEADERS])
+            created_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            sheets_governor.call(WRITE, manifest.append_row, [title, created_at, settings.sheets_shard_policy])
+            self.created_shards.add(title)
+            logger.info("Started worksheet shard '%s'", title)
+        self.shard_handles[title] = worksheet
+        return worksheet, created
+    
+    def _prepare_shard(self, title: str):
+        """
+        Create the next shard on a background thread ahead of the rotation.
+        
+        Runs under the lock like rotate_shard(), so the two never both create
+        the worksheet or list it twice in the manifest; appends wait for the
+        few calls it takes.
+        """
+        if title in self.shard_handles or self._preparing:
+            return
+        self._preparing = True
+        
+        def prepare():
+            try:
+                with self._lock:
+                    # Rotation (or an invalidation) may have happened while this thread started
+                    if self.spreadsheet is not None and title not in self.shard_handles:
+                        self._open_shard(title)
+            except Exception as e:
+                logger.warning("Failed to prepare worksheet shard '%s': %s", title, e)
+            finally:
+                self._preparing = False
+        
+        threading.Thread(target=prepare, name="sheets-shard-prepare", daemon=True).start()
+    
+    def _switch_shard(self, title: str):
+        """Make `title` the worksheet appends go to (caller holds the lock)."""
+        worksheet, created = self._open_shard(title)
+        created = created or title in self.created_shards
+        self.worksheet = worksheet
+        self.shard_title = title
+        # A new shard's header row was just written; existing ones are checked once
+        self.headers_version = SCHEMA_VERSION if created else None
+        self.shard_rows = 1 if created else None
+        if settings.sheets_shard_policy == 'rows':
+            self.shard_index = int(title.rsplit(' ', 1)[1])
+    
+    def _open_write_shard(self):
+        """Open the shard appends currently go to (caller holds the lock)."""
+        if settings.sheets_shard_policy == 'rows':
+            numbers = [
+                int(title.rsplit(' ', 1)[1]) for title in self.read_manifest()
+                if re.fullmatch(rf"{SHARD_PREFIX} \d+", title)
+            ]
+            self.shard_index = max(numbers, default=1)
+        self._switch_shard(self.target_shard())
+    
+    def rotate_shard(self, incoming: int):
+        """Move appends to a new shard when the day, event or row budget calls for one."""
+        if not self.sharded:
+            return
+        with self._lock:
+            title = self.target_shard(incoming)
+            if title != self.shard_title:
+                self._switch_shard(title)
+    
+    def _record_append(self, response, count: int):
+        """Track the current shard's size from the append response (no extra read)."""
+        updates = response.get('updates', {}) if isinstance(response, dict) else {}
+        match = _UPDATED_LAST_ROW.search(updates.get('updatedRange', ''))
+        if match:
+            self.shard_rows = max(self.shard_rows or 0, int(match.group(1)))
+        elif self.shard_rows is not None:
+            self.shard_rows += count
+        if settings.sheets_shard_policy == 'rows' and self.shard_rows is not None:
+            if self.shard_rows - 1 >= settings.sheets_shard_rows * SHARD_PREPARE_RATIO:
+                self._prepare_shard(f"{SHARD_PREFIX} {self.shard_index + 1:03d}")
+    
+    def list_shards(self) -> list[str]:
+        """
+        Titles of the worksheets holding registrations, oldest first.
+        
+        Returns:
+            list[str]: The first worksheet only when sharding is off, else the manifest
+        """
+        self.ensure_connected()
+        if not self.sharded:
+            return [self.worksheet.title]
+        return self.read_manifest()
+    
+    def shard_worksheet(self, title: Optional[str] = None):
+        """
+        Handle of a shard by title (the current worksheet when None).
+        
+        Uncached handles are all fetched with one worksheets() call.
+        
+        Raises:
+            KeyError: If no worksheet has that title
+        """
+        self.ensure_connected()
+        if title is None or title == self.worksheet.title:
+            return self.worksheet
+        if title not in self.shard_handles:
+            self._fetch_shard_handles()
+        return self.shard_handles[title]
+    
+    def _fetch_shard_handles(self):
+        for worksheet in sheets_governor.call(READ, self.spreadsheet.worksheets):
+            self.shard_handles.setdefault(worksheet.title, worksheet)
+    
+    def ensure_headers(self):
+        """
+        Write the header row if the sheet is empty (checked once per schema version).
+        
+        The check runs under the lock: appends from several Sheets threads
+        to an empty sheet or a new shard write the header row only once.
+        """
+        if self.headers_version == SCHEMA_VERSION:
+            return
+        with self._lock:
+            if self.headers_version == SCHEMA_VERSION:
+                return
+            worksheet = self.worksheet
+            existing = sheets_governor.call(READ, worksheet.row_values, 1) if worksheet.row_count else []
+            if not existing:
+                sheets_governor.call(WRITE, worksheet.append_row, HEADERS)
+                logger.info("Created headers in Google Sheet")
+            elif len(existing) < len(HEADERS) and existing == HEADERS[:len(existing)]:
+                # Sheet predates newer columns (e.g. Ticket) - extend the header row in place
+                sheets_governor.call(WRITE, worksheet.update, range_name='A1', values=[HEADERS])
+                logger.info("Added new columns to the Google Sheet header row")
+            elif existing[:len(HEADERS)] != HEADERS:
+                logger.warning("Google Sheet header row does not match the expected columns")
+            self.headers_version = SCHEMA_VERSION
+    
+    def refresh_token(self):
+        """Fetch a fresh OAuth access token for the cached credentials."""
+        if not self.credentials:
+            return
+        from oauth2client import transport
+        
+        self.credentials.refresh(transport.get_http_object())
+        logger.info("Refreshed Google Sheets access token")
+    
+    def _start_token_refresher(self):
+        """Start the background thread that refreshes the token ahead of expiry."""
+        if self._refresher and self._refresher.is_alive():
+            return
+        self._stopping.clear()
+        self._refresher = threading.Thread(target=self._refresh_loop, name="sheets-token-refresh", daemon=True)
+        self._refresher.start()
+    
+    def _refresh_loop(self):
+        """Sleep until the token is about to expire, then refresh it."""
+        margin = settings.sheets_token_refresh_margin_seconds
+        while not self._stopping.is_set():
+            expiry = getattr(self.credentials, 'token_expiry', None)
+            if expiry is None:
+                wait = 0
+            else:
+                wait = max(0, (expiry - datetime.utcnow()).total_seconds() - margin)
+            if self._stopping.wait(wait):
+                return
+            try:
+                self.refresh_token()
+            except Exception as e:
+                logger.error("Failed to refresh Google Sheets token: %s", e)
+                self._stopping.wait(30)
+    
+    def stop(self):
+        """Stop the background token refresher."""
+        self._stopping.set()
+
+    def build_row(self, registration_data: dict, status: str = 'Success') -> list:
+        """
+        Build a sheet row from sanitized registration data.
+        
+        Args:
+            registration_data: Dictionary containing registration form data
+            status: Value for the Status column
+            
+        Returns:
+            list: Row values in HEADERS order
+        """
+        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        return [
+            timestamp,
+            registration_data.get('full_name', ''),
+            registration_data.get('phone', ''),
+            registration_data.get('church', ''),
+            registration_data.get('institution', ''),
+            registration_data.get('city', ''),
+            registration_data.get('leader', ''),
+            registration_data.get('email', ''),
+            registration_data.get('contact_method', ''),
+            registration_data.get('first_time_attendee', ''),
+            registration_data.get('prayer_request', ''),
+            status,
+            registration_data.get('ticket', '')
+        ]
+    
+    def _read_shard_rows(self, title: str) -> list[list]:
+        values = sheets_governor.call(READ, self.shard_worksheet(title).get_all_values)
+        if values and values[0][:1] == HEADERS[:1]:
+            values = values[1:]
+        return values
+    
+    def read_all_rows(self) -> list[list]:
+        """
+        Read every registration row with one API call per shard.
+        
+        Shards are read in parallel (SHEETS_SHARD_READ_CONCURRENCY at a time).
+        
+        Returns:
+            list[list]: Data rows of every shard in order (header rows excluded)
+        """
+        shards = self.list_shards()
+        if len(shards) == 1:
+            return self._read_shard_rows(shards[0])
+        if any(title not in self.shard_handles for title in shards):
+            self._fetch_shard_handles()  # One call for all of them, before fanning out
+        workers = max(1, min(len(shards), settings.sheets_shard_read_concurrency))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="sheets-shard-read") as pool:
+            return [row for rows in pool.map(self._read_shard_rows, shards) for row in rows]
+    
+    def read_rows(self, start_row: int, count: int, shard: Optional[str] = None) -> list[list]:
+        """
+        Read a fixed-size block of rows with one range read.
+        
+        Args:
+            start_row: 1-based sheet row to start at (2 is the first registration)
+            count: Number of rows to read
+            shard: Worksheet title from list_shards (default: the current worksheet)
+            
+        Returns:
+            list[list]: Up to `count` rows padded to len(HEADERS); fewer means the end of the sheet
+        """
+        from gspread.utils import rowcol_to_a1
+        
+        worksheet = self.shard_worksheet(shard)
+        end = rowcol_to_a1(start_row + count - 1, len(HEADERS))
+        return list(sheets_governor.call(READ, worksheet.get, f"A{start_row}:{end}", pad_values=True))
+    
+    def update_statuses(self, updates: list[tuple[int, str]], shard: Optional[str] = None):
+        """
+        Overwrite the Status cell of several rows with one batch_update call.
+        
+        Args:
+            updates: (sheet row number, new status) pairs
+            shard: Worksheet title from list_shards (default: the current worksheet)
+        """
+        from gspread.utils import rowcol_to_a1
+        
+        worksheet = self.shard_worksheet(shard)
+        data = [
+            {'range': rowcol_to_a1(row_number, STATUS_COLUMN + 1), 'values': [[status]]}
+            for row_number, status in updates
+        ]
+        sheets_governor.call(WRITE, worksheet.batch_update, data)
+        logger.info("Updated the status of %s row(s) in Google Sheets", len(updates))
+    
+    def get_checkin_worksheet(self):
+        """Open (creating it on first use) the worksheet door check-ins are written to."""
+        import gspread
+        
+        self.ensure_connected()
+        with self._lock:
+            if self.checkin_worksheet is None:
+                try:
+                    self.checkin_worksheet = sheets_governor.call(READ, self.spreadsheet.worksheet, CHECKIN_WORKSHEET)
+                except gspread.WorksheetNotFound:
+                    worksheet = sheets_governor.call(
+                        WRITE, self.spreadsheet.add_worksheet, CHECKIN_WORKSHEET, rows=1000, cols=len(CHECKIN_HEADERS)
+                    )
+                    sheets_governor.call(WRITE, worksheet.append_row, CHECKIN_HEADERS)
+                    self.checkin_worksheet = worksheet
+                    logger.info("Created the check-ins worksheet")
+            return self.checkin_worksheet
+    
+    def read_checkins(self) -> list[list]:
+        """
+        Read every recorded check-in with a single API call.
+        
+        Returns:
+            list[list]: Rows in CHECKIN_HEADERS order (header row excluded)
+        """
+        values = sheets_governor.call(READ, self.get_checkin_worksheet().get_all_values)
+        return values[1:] if values and values[0][:1] == CHECKIN_HEADERS[:1] else values
+    
+    def append_checkins(self, rows: list[list]) -> list[bool]:
+        """
+        Append several check-in rows with a single API call.
+        
+        Returns:
+            list[bool]: One True per row (raises if the append fails)
+        """
+        try:
+            sheets_governor.call(WRITE, self.get_checkin_worksheet().append_rows, rows)
+            logger.info("Recorded %s check-in(s) in Google Sheets", len(rows))
+            return [True] * len(rows)
+        except Exception as e:
+            import gspread
+            
+            if isinstance(e, gspread.exceptions.APIError):
+                self.invalidate_after(e)
+            raise Exception(f"Failed to record check-ins in Google Sheets: {str(e)}")
+    
     def append_registration(self, registration_data: dict) -> bool:
         """
         Append a new registration to the Google Sheet.
@@ -90,62 +672,82 @@ class GoogleSheetsService:
         Returns:
             bool: True if successful, raises exception otherwise
         """
-        try:
-            if not self.worksheet:
-                self.get_worksheet()
+        return self.append_rows([self.build_row(registration_data)])[0]
+    
+    def append_rows(self, rows: list[list], mark_failed: bool = True) -> list[bool]:
+        """
+        Append several prepared rows with a single API call.
+        
+        If the append fails, the rows are written again with a 'Failed'
+        status (best effort, unless mark_failed is False or Google is
+        overloaded) and the error is re-raised.
+        
+        Args:
+            rows: Rows built with build_row
+            mark_failed: Write 'Failed' rows as a fallback when the append fails
             
-            # Create headers if sheet is empty
-            if self.worksheet.row_count == 0 or not self.worksheet.row_values(1):
-                headers = [
-                    'Timestamp',
-                    'Full Name',
-                    'Phone',
-                    'Church',
-                    'Institution',
-                    'City/Location',
-                    'Leader/Inviter',
-                    'Email',
-                    'Contact Method',
-                    'First-Time Attendee',
-                    'Prayer Request',
-                    'Status'
-                ]
-                self.worksheet.append_row(headers)
-                logger.info("Created headers in Google Sheet")
+        Returns:
+            list[bool]: One entry per row, True if it was saved
             
-            # Prepare row data
-            timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            row_data = [
-                timestamp,
-                registration_data.get('full_name', ''),
-                registration_data.get('phone', ''),
-                registration_data.get('church', ''),
-                registration_data.get('institution', ''),
-                registration_data.get('city', ''),
-                registration_data.get('leader', ''),
-                registration_data.get('email', ''),
-                registration_data.get('contact_method', ''),
-                registration_data.get('first_time_attendee', ''),
-                registration_data.get('prayer_request', ''),
-                'Success'
-            ]
+        Raises:
+            SheetsUnavailableError: If Google is overloaded or the quota is exhausted (retry later)
+            Exception: If the append failed for another reason
+        """
+        worksheet = None
+        try:
+            self.ensure_connected()
+            self.rotate_shard(len(rows))
+            worksheet = self.worksheet
+            
+            self.ensure_headers()
             
-            # Append the row
-            self.worksheet.append_row(row_data)
-            logger.info("Successfully added registration to Google Sheets")
+            response = sheets_governor.call(WRITE, worksheet.append_rows, rows)
+            self._record_append(response, len(rows))
+            logger.info("Successfully added %s registration(s) to Google Sheets", len(rows))
             
-            return True
+            return [True] * len(rows)
             
         except Exception as e:
-            logger.error(f"Failed to append registration to Google Sheets: {str(e)}")
-            # Mark as failed in sheet if possible
-            try:
-                row_data[-1] = 'Failed'
-                self.worksheet.append_row(row_data)
-            except:
-                pass
+            logger.error("Failed to append registration to Google Sheets: %s", e)
+            overloaded = isinstance(e, SheetsUnavailableError) or is_overload_error(e)
+            # Mark as failed in sheet if possible - but not under quota pressure,
+            # where a second write only adds to the overload
+            if mark_failed and not overloaded and worksheet is not None:
+                try:
+                    failed_rows = [row[:STATUS_COLUMN] + ['Failed'] + row[STATUS_COLUMN + 1:] for row in rows]
+                    sheets_governor.call(WRITE, worksheet.append_rows, failed_rows, max_wait=0)
+                except:
+                    pass
+            import gspread
+            
+            if isinstance(e, gspread.exceptions.APIError):
+                # Cached handles/header state may be stale
+                self.invalidate_after(e)
+            if overloaded:
+                retry_after = getattr(e, 'retry_after', None) or sheets_governor.breaker.retry_after()
+                raise SheetsUnavailableError(f"Failed to save to Google Sheets: {str(e)}", retry_after)
             raise Exception(f"Failed to save to Google Sheets: {str(e)}")
 
 
 # Global instance
 sheets_service = GoogleSheetsService()
+
+# Write-behind buffer: coalesces rows into one append_rows call per batch
+# (only used when SHEETS_BATCH_ENABLED is set)
+sheets_writer = BatchDispatcher(
+    name="sheets-writer",
+    flush=sheets_service.append_rows,
+    max_batch_size=settings.sheets_batch_size,
+    max_delay_ms=settings.sheets_batch_interval_ms,
+    max_pending=settings.sheets_batch_max_pending,
+)
+
+# Door check-ins are always buffered: scanners get their answer from memory
+# and the rows are written in batches
+checkin_writer = BatchDispatcher(
+    name="checkin-writer",
+    flush=sheets_service.append_checkins,
+    max_batch_size=settings.sheets_batch_size,
+    max_delay_ms=settings.checkin_batch_interval_ms,
+    max_pending=settings.sheets_batch_max_pending,
+)
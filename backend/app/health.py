@@ -0,0 +1,157 @@
+"""
+Background health prober.
+Checks dependencies on an interval and caches the result so health endpoints answer in constant time.
+"""
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import Optional
+from .admission import admission_controller
+from .config import settings
+from .executors import sheets_executor, sms_executor
+from .google_sheets import checkin_writer, sheets_service, sheets_writer
+from .journal import registration_journal
+from .sheets_quota import CLOSED, sheets_governor
+from .sms_dispatcher import sms_dispatcher
+from .sms_service import sms_service
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+
+class HealthProber:
+    """
+    Periodically probes Google Sheets, mNotify and the internal queues.
+
+    Health endpoints only read the cached snapshot, so uptime monitors and
+    platform health checks never trigger Google API calls themselves.
+    """
+
+    def __init__(self):
+        """Start with an 'unknown' snapshot until the first probe completes."""
+        self.snapshot: dict = {
+            "status": "starting",
+            "checked_at": None,
+            "services": {
+                "api": "operational",
+                "google_sheets": "unknown",
+                "sms": "unknown"
+            },
+            "queues": {}
+        }
+        self.journal_backlog = 0  # Refreshed off the event loop (it is a SQLite COUNT)
+        self._task: Optional[asyncio.Task] = None
+
+    async def refresh_journal_backlog(self):
+        """Re-count the journal backlog on a worker thread for queue_depths()."""
+        if settings.journal_enabled:
+            self.journal_backlog = await asyncio.to_thread(registration_journal.backlog)
+
+    def queue_depths(self) -> dict:
+        """Current depth and capacity of each internal queue (the journal backlog as last counted)."""
+        queues = {
+            "sheets_writer": {"depth": sheets_writer.depth(), "capacity": sheets_writer.max_pending},
+            "sms_dispatch": {"depth": sms_dispatcher.depth(), "capacity": sms_dispatcher.max_pending},
+            "checkin_writer": {"depth": checkin_writer.depth(), "capacity": checkin_writer.max_pending},
+            "sheets_calls": {"depth": sheets_executor.in_flight(), "capacity": None},
+            "sms_calls": {"depth": sms_executor.in_flight(), "capacity": None},
+        }
+        if settings.journal_enabled:
+            queues["journal_backlog"] = {"depth": self.journal_backlog, "capacity": None}
+        return queues
+
+    def saturated_queues(self) -> list[str]:
+        """Names of bounded queues that are at or above the backpressure threshold."""
+        threshold = settings.health_queue_backpressure_ratio
+        return [
+            name for name, queue in self.queue_depths().items()
+            if queue["capacity"] and queue["depth"] >= queue["capacity"] * threshold
+        ]
+
+    async def probe_once(self) -> dict:
+        """Run every check once and replace the cached snapshot."""
+        services = {"api": "operational"}
+        status = "healthy"
+
+        # Check Google Sheets
+        try:
+            await sheets_executor.run(sheets_service.ping)
+            services["google_sheets"] = "operational"
+        except Exception as e:
+            logger.error("Google Sheets health check failed: %s", e)
+            services["google_sheets"] = f"error: {str(e)}"
+            status = "degraded"
+
+        # Check SMS service
+        if not sms_service.api_key:
+            services["sms"] = "not_initialized"
+            status = "degraded"
+        else:
+            try:
+                await sms_executor.run(sms_service.ping)
+                services["sms"] = "operational"
+            except Exception as e:
+                logger.error("mNotify health check failed: %s", e)
+                services["sms"] = f"error: {str(e)}"
+                status = "degraded"
+
+        try:
+            await self.refresh_journal_backlog()
+        except Exception as e:
+            logger.error("Failed to count the journal backlog: %s", e)
+
+        self.snapshot = {
+            "status": status,
+            "checked_at": datetime.now().isoformat(timespec='seconds'),
+            "services": services,
+            "queues": self.queue_depths(),
+            "sheets_quota": sheets_governor.status(),
+            "admission": admission_controller.status()
+        }
+        return self.snapshot
+
+    def readiness(self) -> tuple[bool, list[str]]:
+        """
+        Decide whether this worker should receive new registrations.
+
+        Returns:
+            tuple: (ready: bool, reasons it is not ready)
+        """
+        reasons = [f"queue_full:{name}" for name in self.saturated_queues()]
+        sheets_state = self.snapshot["services"].get("google_sheets", "unknown")
+        # With the journal enabled registrations are accepted while Sheets is down
+        if sheets_state.startswith("error") and not settings.journal_enabled:
+            reasons.append("google_sheets_unavailable")
+        if sheets_governor.breaker.state != CLOSED and not settings.journal_enabled:
+            reasons.append("google_sheets_overloaded")
+        return not reasons, reasons
+
+    async def _run(self):
+        """Probe loop."""
+        while True:
+            try:
+                await self.probe_once()
+            except Exception as e:
+                logger.error("Health probe failed: %s", e)
+            await asyncio.sleep(settings.health_probe_interval_seconds)
+
+    def start(self):
+        """Start probing in the background on the running event loop."""
+        if self._task and not self._task.done():
+            return
+        self._task = asyncio.create_task(self._run())
+        logger.info("Health prober started")
+
+    async def stop(self):
+        """Cancel the background probe loop."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+
+# Global instance
+health_prober = HealthProber()
@@ -0,0 +1,289 @@
+"""
+Local durable registration journal backed by SQLite in WAL mode.
+Registrations are committed here first and synced to Google Sheets in the background.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from datetime import datetime
+from typing import Optional
+from .config import settings
+from .batching import BatchDispatcher
+from .google_sheets import sheets_service
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS registrations (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at TEXT NOT NULL,
+    data TEXT NOT NULL,
+    row TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sync_state (
+    name TEXT PRIMARY KEY,
+    last_id INTEGER NOT NULL DEFAULT 0,
+    owner TEXT,
+    lease_until REAL NOT NULL DEFAULT 0
+);
+INSERT OR IGNORE INTO sync_state (name, last_id) VALUES ('google_sheets', 0);
+"""
+
+# Google Sheets calls one append can make (shard rotation, header check, the
+# append itself), each of which may park for SHEETS_QUOTA_MAX_WAIT_SECONDS
+SYNC_CALLS_PER_APPEND = 4
+
+# Allowance for the Sheets calls themselves on top of the time parked for quota
+SYNC_CALL_ALLOWANCE_SECONDS = 60.0
+
+
+def sync_lease_seconds() -> float:
+    """How long the sync lease lasts: longer than one append can take, so it doesn't lapse mid-append."""
+    return max(
+        30.0,
+        settings.journal_sync_interval_seconds * 10,
+        settings.sheets_quota_max_wait_seconds * SYNC_CALLS_PER_APPEND + SYNC_CALL_ALLOWANCE_SECONDS,
+    )
+
+
+class RegistrationJournal:
+    """
+    Append-only journal of accepted registrations.
+
+    Inserts from concurrent requests are group-committed: they are collected
+    for up to JOURNAL_COMMIT_INTERVAL_MS and written in one transaction, so a
+    burst of registrations costs one fsync instead of one per request.
+    A background sync worker drains rows past the stored cursor to Google
+    Sheets. Only one process at a time holds the sync lease, so running
+    several uvicorn workers against the same file does not duplicate rows.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Location of the SQLite database file
+        """
+        self.path = path
+        self.owner = f"{os.getpid()}-{id(self)}"
+        self._local = threading.local()
+        self._committer = BatchDispatcher(
+            name="journal-writer",
+            flush=self._insert_batch,
+            max_batch_size=settings.journal_sync_batch_size,
+            max_delay_ms=settings.journal_commit_interval_ms,
+            # Same backpressure limit as the Sheets write buffer
+            max_pending=settings.sheets_batch_max_pending,
+        )
+        self._sync_thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._opened = False
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            # FULL keeps every committed batch durable across power loss
+            conn.execute("PRAGMA synchronous=FULL")
+            self._local.conn = conn
+        return conn
+
+    def open(self):
+        """Create the database file and tables if needed."""
+        if self._opened:
+            return
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        self._connection().executescript(SCHEMA)
+        self._opened = True
+        logger.info("Registration journal opened")
+
+    def append(self, registration_data: dict) -> Future:
+        """
+        Queue a sanitized registration for the next group commit.
+
+        Args:
+            registration_data: Sanitized registration form data
+
+        Returns:
+            Future: Resolved with the journal row id once the insert is committed
+
+        Raises:
+            QueueFullError: If too many inserts are already waiting
+        """
+        self.open()
+        row = sheets_service.build_row(registration_data)
+        return self._committer.submit((registration_data, row))
+
+    def append_many(self, registrations: list[dict]) -> list[int]:
+        """
+        Commit several sanitized registrations in one transaction (blocking).
+
+        Used by batch imports, which already arrive as one group and don't
+        need to wait for the group-commit window.
+
+        Returns:
+            list[int]: Journal row ids, in order
+        """
+        self.open()
+        items = [(data, sheets_service.build_row(data)) for data in registrations]
+        return self._insert_batch(items)
+
+    def _insert_batch(self, items: list[tuple[dict, list]]) -> list[int]:
+        """Insert a batch of registrations in a single transaction."""
+        conn = self._connection()
+        created_at = datetime.now().isoformat(timespec='seconds')
+        ids = []
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for data, row in items:
+                cursor = conn.execute(
+                    "INSERT INTO registrations (created_at, data, row) VALUES (?, ?, ?)",
+                    (created_at, json.dumps(data), json.dumps(row)),
+                )
+                ids.append(cursor.lastrowid)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return ids
+
+    def backlog(self) -> int:
+        """Number of journaled registrations not yet synced to Google Sheets."""
+        self.open()
+        conn = self._connection()
+        (last_id,) = conn.execute(
+            "SELECT last_id FROM sync_state WHERE name = 'google_sheets'"
+        ).fetchone()
+        (count,) = conn.execute(
+            "SELECT COUNT(*) FROM registrations WHERE id > ?", (last_id,)
+        ).fetchone()
+        return count
+
+    def unsynced_registrations(self) -> list[dict]:
+        """Registrations committed to the journal but not yet synced to Google Sheets."""
+        self.open()
+        conn = self._connection()
+        (last_id,) = conn.execute(
+            "SELECT last_id FROM sync_state WHERE name = 'google_sheets'"
+        ).fetchone()
+        return [
+            json.loads(data)
+            for (data,) in conn.execute("SELECT data FROM registrations WHERE id > ? ORDER BY id", (last_id,))
+        ]
+
+    def _acquire_lease(self, conn: sqlite3.Connection) -> Optional[int]:
+        """
+        Take (or renew) the sync lease for this process.
+
+        Returns:
+            int: Current sync cursor if the lease is held, otherwise None
+        """
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            last_id, owner, lease_until = conn.execute(
+                "SELECT last_id, owner, lease_until FROM sync_state WHERE name = 'google_sheets'"
+            ).fetchone()
+            if owner not in (None, self.owner) and lease_until > now:
+                conn.execute("COMMIT")
+                return None
+            conn.execute(
+                "UPDATE sync_state SET owner = ?, lease_until = ? WHERE name = 'google_sheets'",
+                (self.owner, now + sync_lease_seconds()),
+            )
+            conn.execute("COMMIT")
+            return last_id
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def sync_once(self) -> int:
+        """
+        Push the next batch of unsynced rows to Google Sheets.
+
+        Returns:
+            int: Number of rows synced (0 if nothing was pending or another process holds the lease)
+        """
+        self.open()
+        conn = self._connection()
+        # Renewed right before the append, so the full lease (sync_lease_seconds) covers it
+        last_id = self._acquire_lease(conn)
+        if last_id is None:
+            return 0
+
+        pending = conn.execute(
+            "SELECT id, row FROM registrations WHERE id > ? ORDER BY id LIMIT ?",
+            (last_id, settings.journal_sync_batch_size),
+        ).fetchall()
+        if not pending:
+            return 0
+
+        rows = [json.loads(row) for _, row in pending]
+        # No 'Failed' fallback rows here - the rows stay in the journal and are retried
+        sheets_service.append_rows(rows, mark_failed=False)
+
+        cursor = conn.execute(
+            "UPDATE sync_state SET last_id = ? WHERE name = 'google_sheets' AND owner = ?",
+            (pending[-1][0], self.owner),
+        )
+        if cursor.rowcount == 0:
+            logger.error(
+                "Journal sync lease expired while appending registrations %s-%s; "
+                "the worker that took over may append them again",
+                pending[0][0], pending[-1][0]
+            )
+            return 0
+        logger.info("Synced %s journaled registration(s) to Google Sheets", len(rows))
+        return len(rows)
+
+    def _sync_loop(self):
+        """Background worker that drains the journal to Google Sheets."""
+        delay = settings.journal_sync_interval_seconds
+        while not self._stopping.is_set():
+            try:
+                synced = self.sync_once()
+                delay = settings.journal_sync_interval_seconds
+                if synced == settings.journal_sync_batch_size:
+                    # More rows are waiting - keep draining without sleeping
+                    continue
+            except Exception as e:
+                # Back off while Google Sheets is unavailable
+                delay = min(delay * 2, 60.0)
+                logger.error("Journal sync failed, retrying in %.0fs: %s", delay, e)
+            self._stopping.wait(delay)
+
+    def start(self):
+        """Open the journal and start the background sync worker."""
+        self.open()
+        if self._sync_thread and self._sync_thread.is_alive():
+            return
+        self._stopping.clear()
+        self._sync_thread = threading.Thread(target=self._sync_loop, name="journal-sync", daemon=True)
+        self._sync_thread.start()
+        logger.info("Journal sync worker started")
+
+    def stop(self):
+        """Commit pending inserts and stop the sync worker."""
+        self._committer.stop()
+        self._stopping.set()
+        if self._sync_thread:
+            self._sync_thread.join(timeout=30)
+        # Release the sync lease so another worker can take over straight away
+        if self._opened:
+            self._connection().execute(
+                "UPDATE sync_state SET owner = NULL, lease_until = 0 WHERE name = 'google_sheets' AND owner = ?",
+                (self.owner,),
+            )
+        logger.info("Registration journal stopped")
+
+
+# Global instance
+registration_journal = RegistrationJournal(settings.journal_path)
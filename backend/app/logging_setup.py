@@ -0,0 +1,187 @@
+"""
+Non-blocking logging pipeline.
+
+Log calls only put the record on a bounded in-memory queue; a background
+listener thread formats it (JSON lines by default) and writes it to stderr,
+so a slow terminal or log shipper never stalls the event loop. When the
+queue is full the record is dropped and counted instead of blocking.
+
+Every record carries the correlation ID of the request that produced it
+(X-Request-ID, or a generated one), and INFO-and-below events of busy
+loggers can be sampled with LOG_SAMPLE_RATES. Sampling is decided per
+request, so the lines of one request are kept or dropped together.
+"""
+
+import atexit
+import json
+import logging
+import queue
+import random
+import re
+import sys
+import uuid
+import zlib
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+from .config import settings
+
+# Correlation ID of the request being handled ("-" outside a request)
+correlation_id: ContextVar[str] = ContextVar("correlation_id", default="-")
+
+# Incoming X-Request-ID values are reused only if they look like this
+_VALID_ID = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+# uvicorn configures its own synchronous handlers; route them through the queue too
+QUEUED_LOGGERS = ("uvicorn", "uvicorn.error", "uvicorn.access")
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s [%(correlation_id)s] - %(message)s"
+
+
+def new_correlation_id(header: Optional[str] = None) -> str:
+    """The caller's X-Request-ID if it is well-formed, otherwise a fresh random ID."""
+    if header and _VALID_ID.match(header):
+        return header
+    return uuid.uuid4().hex[:16]
+
+
+class CorrelationFilter(logging.Filter):
+    """Stamp each record with the current correlation ID (runs in the logging thread)."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.correlation_id = correlation_id.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep only a fraction of INFO-and-below records of selected loggers.
+
+    Rates apply to a logger and its children (the longest matching name
+    wins). Warnings and errors are never sampled.
+    """
+
+    def __init__(self, rates: dict[str, float]):
+        super().__init__()
+        # Longest prefix first, so "app.routes" overrides "app"
+        self.rates = sorted(rates.items(), key=lambda item: len(item[0]), reverse=True)
+
+    def rate_for(self, name: str) -> float:
+        for prefix, rate in self.rates:
+            if name == prefix or name.startswith(prefix + "."):
+                return rate
+        return 1.0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or not self.rates:
+            return True
+        rate = self.rate_for(record.name)
+        if rate >= 1.0:
+            return True
+        if rate <= 0.0:
+            return False
+        request_id = getattr(record, "correlation_id", "-")
+        if request_id == "-":
+            return random.random() < rate
+        return zlib.crc32(request_id.encode()) % 10000 < rate * 10000
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    QueueHandler that never blocks and leaves formatting to the listener.
+
+    The stock handler formats the message in the caller's thread; here the
+    record is queued as is (arguments included) and only rendered by the
+    listener, and records that don't fit in the queue are counted as dropped.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if record.exc_info and not record.exc_text:
+            # Tracebacks reference frames that may be gone by the time the listener runs
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message, correlation_id (and exception)."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "correlation_id": getattr(record, "correlation_id", "-"),
+        }
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class LogPipeline:
+    """Root logger -> bounded queue -> listener thread -> stderr."""
+
+    def __init__(self):
+        self.handler: Optional[NonBlockingQueueHandler] = None
+        self._listener: Optional[QueueListener] = None
+
+    def start(self):
+        """Replace the root logger's handlers with the queue (idempotent)."""
+        if self._listener is not None:
+            return
+        log_queue = queue.Queue(maxsize=max(1, settings.log_queue_size))
+        self.handler = NonBlockingQueueHandler(log_queue)
+        # Filters run in the caller's thread, where the request's context is visible
+        self.handler.addFilter(CorrelationFilter())
+        if settings.log_sample_rates:
+            self.handler.addFilter(SamplingFilter(settings.log_sample_rates))
+
+        output = logging.StreamHandler(sys.stderr)
+        output.setFormatter(JsonFormatter() if settings.log_format == "json" else logging.Formatter(TEXT_FORMAT))
+
+        root = logging.getLogger()
+        for existing in root.handlers[:]:
+            root.removeHandler(existing)
+        root.addHandler(self.handler)
+        root.setLevel(settings.log_level.upper())
+        for name in QUEUED_LOGGERS:
+            named = logging.getLogger(name)
+            for existing in named.handlers[:]:
+                named.removeHandler(existing)
+            named.propagate = True
+
+        self._listener = QueueListener(log_queue, output, respect_handler_level=True)
+        self._listener.start()
+        atexit.register(self.stop)
+
+    def stop(self):
+        """Write out everything still queued and stop the listener thread."""
+        if self._listener is None:
+            return
+        try:
+            self._listener.stop()
+        except queue.Full:
+            pass  # Listener is still draining; the records left are lost at exit anyway
+        self._listener = None
+        if self.handler and self.handler.dropped:
+            sys.stderr.write(f"logging: dropped {self.handler.dropped} record(s) because the log queue was full\n")
+
+    def dropped(self) -> int:
+        """Records discarded because the queue was full."""
+        return self.handler.dropped if self.handler else 0
+
+
+# Global instance
+log_pipeline = LogPipeline()
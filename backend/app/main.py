@@ -3,21 +3,36 @@ Conference Registration Backend API
 Main application entry point.
 """
 
-from fastapi import FastAPI, Request
+from fastapi import Depends, FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 import logging
+import time
 
 from .config import settings
+from .admission import admission_controller
+from .logging_setup import log_pipeline, correlation_id, new_correlation_id
 from .routes import router, limiter
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+from .admin import router as admin_router
+from .auth import require_metrics_access
+from .google_sheets import sheets_service, sheets_writer
+from .journal import registration_journal
+from .dedup import registration_index
+from .stats import registration_stats
+from .suggest import suggestion_index
+from .tickets import ticket_index
+from .seeding import registration_seeder
+from .executors import sheets_executor, sms_executor
+from .sms_dispatcher import sms_dispatcher
+from .broadcast import broadcast_runner
+from .health import health_prober
+from . import prewarm
+from .metrics import REQUESTS_IN_FLIGHT, gauge_refresher, observe_stage, record_outcome, render as render_metrics
+
+# Configure logging (queued, written by a background thread)
+log_pipeline.start()
 logger = logging.getLogger(__name__)
 
 # Create FastAPI application
@@ -29,9 +44,78 @@ app = FastAPI(
     redoc_url="/redoc"
 )
 
+
+
+# Only single registrations count as a registration outcome when rate limited
+# (batches, suggestions and other limited endpoints are not one registration each)
+REGISTRATION_PATH = "/api/register"
+
+
+def rate_limit_handler(request: Request, exc: RateLimitExceeded):
+    """Count rate-limited registrations, then return slowapi's standard 429."""
+    if request.url.path == REGISTRATION_PATH:
+        record_outcome("rate_limited")
+    return _rate_limit_exceeded_handler(request, exc)
+
+
 # Add rate limiter to app state
 app.state.limiter = limiter
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+app.add_exception_handler(RateLimitExceeded, rate_limit_handler)
+
+
+@app.middleware("http")
+async def metrics_middleware(request: Request, call_next):
+    """Track in-flight requests and time response serialization for /metrics."""
+    request.state.received_at = time.perf_counter()
+    REQUESTS_IN_FLIGHT.inc()
+    try:
+        response = await call_next(request)
+    finally:
+        REQUESTS_IN_FLIGHT.dec()
+    handler_finished_at = getattr(request.state, "handler_finished_at", None)
+    if handler_finished_at is not None:
+        observe_stage("serialization", time.perf_counter() - handler_finished_at)
+    return response
+
+
+@app.middleware("http")
+async def admission_middleware(request: Request, call_next):
+    """Shed new registrations with a fast 503 while this worker is over its adaptive limit."""
+    if not admission_controller.governs(request.method, request.url.path):
+        return await call_next(request)
+    if not admission_controller.try_acquire():
+        record_outcome("shed")
+        return JSONResponse(
+            status_code=503,
+            content={
+                "detail": {
+                    "message": "We are receiving a lot of registrations right now. Please try again in a moment.",
+                    "error": "server_busy"
+                }
+            },
+            headers={"Retry-After": str(admission_controller.retry_after())}
+        )
+    started = time.perf_counter()
+    overloaded = False
+    try:
+        response = await call_next(request)
+        overloaded = response.status_code == 503
+    finally:
+        admission_controller.release(time.perf_counter() - started, overloaded)
+    return response
+
+
+@app.middleware("http")
+async def correlation_middleware(request: Request, call_next):
+    """Tag every log line of the request with its ID and echo it as X-Request-ID."""
+    request_id = new_correlation_id(request.headers.get("x-request-id"))
+    token = correlation_id.set(request_id)
+    try:
+        response = await call_next(request)
+    finally:
+        correlation_id.reset(token)
+    response.headers["X-Request-ID"] = request_id
+    return response
 
 # Configure CORS
 app.add_middleware(
@@ -40,10 +124,13 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Let the frontend read when to retry a shed registration
+    expose_headers=["Retry-After", "X-Request-ID"],
 )
 
 # Include routers
 app.include_router(router)
+app.include_router(admin_router)
 
 # Note: Frontend is served separately on Vercel
 # This backend is API-only
@@ -56,14 +143,28 @@ async def root():
         "message": "IYC Conference Registration API",
         "version": "1.0.0",
         "documentation": "/docs",
-        "health": "/api/health"
+        "health": "/api/health",
+        "liveness": "/api/live",
+        "readiness": "/api/ready",
+        "metrics": "/metrics"
     }
 
 
+@app.get("/metrics", include_in_schema=False, dependencies=[Depends(require_metrics_access)])
+async def metrics():
+    """
+    Prometheus scrape endpoint (aggregated across workers in multiprocess mode).
+
+    Requires `Authorization: Bearer <METRICS_TOKEN>` (or the admin token).
+    """
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     """Global exception handler for unexpected errors."""
-    logger.error(f"Unexpected error: {str(exc)}")
+    logger.error("Unexpected error: %s", exc)
     return JSONResponse(
         status_code=500,
         content={
@@ -78,8 +179,25 @@ async def global_exception_handler(request: Request, exc: Exception):
 async def startup_event():
     """Run on application startup."""
     logger.info("Starting IYC Conference Registration API...")
-    logger.info(f"Conference: {settings.conference_name}")
+    logger.info("Conference: %s", settings.conference_name)
     # Sheet ID removed for security - do not log sensitive identifiers
+    if settings.journal_enabled:
+        registration_journal.start()
+    if settings.sms_dispatch_enabled:
+        sms_dispatcher.start()
+    # Continue any broadcast interrupted by the last shutdown
+    broadcast_runner.resume()
+    if settings.prewarm_enabled:
+        prewarm.start()
+    # One bulk read of the sheet fills the duplicate, ticket and suggestion indexes and the statistics
+    seeded = [registration_stats, ticket_index, suggestion_index]
+    if settings.dedup_enabled:
+        seeded.append(registration_index)
+    registration_seeder.start(seeded)
+    registration_stats.start()
+    ticket_index.start()
+    health_prober.start()
+    gauge_refresher.start()
     logger.info("API is ready to accept registrations")
 
 
@@ -87,6 +205,23 @@ async def startup_event():
 async def shutdown_event():
     """Run on application shutdown."""
     logger.info("Shutting down IYC Conference Registration API...")
+    await health_prober.stop()
+    await gauge_refresher.stop()
+    await prewarm.stop()
+    await registration_seeder.stop()
+    await registration_stats.stop()
+    await ticket_index.stop()
+    # Flush any buffered registrations before the process exits
+    sheets_writer.stop()
+    if settings.journal_enabled:
+        registration_journal.stop()
+    if settings.sms_dispatch_enabled:
+        sms_dispatcher.stop()
+    broadcast_runner.stop()
+    registration_index.close()
+    sheets_service.stop()
+    sheets_executor.shutdown()
+    sms_executor.shutdown()
 
 
 if __name__ == "__main__":
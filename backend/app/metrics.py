@@ -0,0 +1,158 @@
+"""
+Prometheus instrumentation for the registration API.
+Per-stage latency histograms, outcome counters and queue/in-flight gauges.
+
+With several uvicorn workers, set PROMETHEUS_MULTIPROC_DIR to an empty
+directory before starting the server (start.sh does this) so /metrics
+aggregates every worker instead of only the one that answered the scrape.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from contextlib import contextmanager
+from typing import Optional
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from .config import settings
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+STAGE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+REGISTRATION_STAGE_SECONDS = Histogram(
+    "iyc_registration_stage_seconds",
+    "Time spent in each stage of /api/register",
+    ["stage"],
+    buckets=STAGE_BUCKETS,
+)
+REGISTRATION_OUTCOMES = Counter(
+    "iyc_registration_outcomes_total",
+    "Registration outcomes (success, duplicate, sheets_error, sms_failed, rate_limited, server_busy, shed, internal_error)",
+    ["outcome"],
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "iyc_http_requests_in_flight",
+    "HTTP requests currently being handled",
+    multiprocess_mode="livesum",
+)
+QUEUE_DEPTH = Gauge(
+    "iyc_queue_depth",
+    "Items waiting in internal queues",
+    ["queue"],
+    multiprocess_mode="livesum",
+)
+SHEETS_CALLS = Counter(
+    "iyc_sheets_calls_total",
+    "Google Sheets API calls by quota (read, write) and result (ok, overloaded, error, rejected)",
+    ["kind", "result"],
+)
+SHEETS_QUOTA_WAIT_SECONDS = Histogram(
+    "iyc_sheets_quota_wait_seconds",
+    "Time Google Sheets calls were parked waiting for quota",
+    ["kind"],
+    buckets=STAGE_BUCKETS,
+)
+ADMISSION_LIMIT = Gauge(
+    "iyc_admission_limit",
+    "Adaptive concurrency limit for new registrations",
+    multiprocess_mode="livesum",
+)
+SHEETS_BREAKER_OPEN = Gauge(
+    "iyc_sheets_circuit_open",
+    "1 while the Google Sheets circuit breaker is open",
+    multiprocess_mode="livemax",
+)
+
+
+@contextmanager
+def time_stage(stage: str):
+    """Observe the duration of the wrapped block as a registration stage."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        REGISTRATION_STAGE_SECONDS.labels(stage).observe(time.perf_counter() - started)
+
+
+def observe_stage(stage: str, seconds: float):
+    """Record a stage duration measured elsewhere."""
+    REGISTRATION_STAGE_SECONDS.labels(stage).observe(seconds)
+
+
+def record_outcome(outcome: str, amount: int = 1):
+    """Count registration outcomes (one by default)."""
+    REGISTRATION_OUTCOMES.labels(outcome).inc(amount)
+
+
+def update_queue_gauges():
+    """Copy the current queue depths into the gauges."""
+    # Imported here: health pulls in every service module
+    from .health import health_prober
+
+    for name, queue in health_prober.queue_depths().items():
+        QUEUE_DEPTH.labels(name).set(queue["depth"])
+
+
+def render() -> tuple[bytes, str]:
+    """
+    Render all metrics in the Prometheus text format.
+
+    Returns:
+        tuple: (body, content type)
+    """
+    update_queue_gauges()
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+class GaugeRefresher:
+    """Keeps this worker's queue gauges fresh between scrapes."""
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self):
+        from .health import health_prober
+
+        while True:
+            try:
+                await health_prober.refresh_journal_backlog()
+                update_queue_gauges()
+            except Exception as e:
+                logger.error("Failed to update queue gauges: %s", e)
+            await asyncio.sleep(settings.metrics_refresh_interval_seconds)
+
+    def start(self):
+        if self._task and not self._task.done():
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+            # Drop this worker's live gauges from the aggregate
+            multiprocess.mark_process_dead(os.getpid())
+
+
+# Global instance
+gauge_refresher = GaugeRefresher()
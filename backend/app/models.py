@@ -3,8 +3,9 @@ Pydantic models for request/response validation.
 """
 
 from pydantic import BaseModel, EmailStr, Field, field_validator
+from datetime import datetime
 from typing import Optional
-import re
+from .phone import normalize_phone
 
 
 class RegistrationRequest(BaseModel):
@@ -18,7 +19,8 @@ class RegistrationRequest(BaseModel):
     city: str = Field(..., min_length=2, max_length=100, description="City or location")
     
     # Optional fields
-    phone: Optional[str] = Field(None, min_length=10, max_length=15, description="Phone number in Ghana format")
+    # Loose cap: separators are allowed ("+233 24 123 4567"); the validator checks the digits
+    phone: Optional[str] = Field(None, max_length=30, description="Phone number in Ghana format")
     institution: Optional[str] = Field(None, min_length=2, max_length=150, description="School or institution name")
     leader: Optional[str] = Field(None, min_length=2, max_length=100, description="Name of person who invited or leader")
     email: Optional[EmailStr] = Field(None, description="Email address (optional)")
@@ -37,25 +39,16 @@ class RegistrationRequest(BaseModel):
         - 0241234567 (10 digits starting with 0)
         - +233241234567 (international format)
         - 233241234567 (international without +)
+        - 00233241234567 (international dialling prefix)
+        - any of these with spaces, dashes, dots or brackets
+        
+        Returns the number in E.164 form (+233241234567).
         """
         # Allow None/empty for optional field
         if not v:
             return v
-            
-        # Remove spaces and dashes
-        cleaned = re.sub(r'[\s\-]', '', v)
-        
-        # Check various Ghana phone formats
-        patterns = [
-            r'^0\d{9}$',           # 0241234567
-            r'^\+233\d{9}$',       # +233241234567
-            r'^233\d{9}$',         # 233241234567
-        ]
-        
-        if not any(re.match(pattern, cleaned) for pattern in patterns):
-            raise ValueError('Phone number must be in Ghana format (e.g., 0241234567 or +233241234567)')
         
-        return cleaned
+        return normalize_phone(v).e164
     
     @field_validator('privacy_consent')
     @classmethod
@@ -81,3 +74,23 @@ class RegistrationResponse(BaseModel):
     success: bool
     message: str
     data: Optional[dict] = None
+
+
+class BroadcastFilter(BaseModel):
+    """
+    Which registrants receive a broadcast (all of them when empty).
+    Text fields match case-insensitively.
+    """
+    church: Optional[str] = Field(None, description="Only attendees of this church")
+    city: Optional[str] = Field(None, description="Only attendees from this city")
+    institution: Optional[str] = Field(None, description="Only attendees from this institution")
+    first_time_attendee: Optional[str] = Field(None, description="Yes or No")
+    registered_since: Optional[datetime] = Field(None, description="Only registrations at or after this time")
+
+
+class BroadcastRequest(BaseModel):
+    """
+    Model for starting a bulk SMS broadcast.
+    """
+    template: str = Field(..., min_length=1, max_length=918, description="Message text with optional {placeholders}")
+    filter: BroadcastFilter = Field(default_factory=BroadcastFilter)
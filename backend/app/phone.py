@@ -0,0 +1,103 @@
+"""
+Ghana phone number normalization.
+
+One parser shared by request validation, duplicate detection and SMS
+delivery, so they all agree on what a number is. Numbers are reduced to
+their 9-digit national significant number, from which the E.164 form
+(+233241234567) and the local form mNotify expects (0241234567) follow.
+"""
+
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Iterable, Optional
+from .config import settings
+
+# Separators people type inside numbers: spaces, dashes, dots, brackets
+_SEPARATORS = re.compile(r"[\s\-.()]")
+
+# 0XXXXXXXXX, +233XXXXXXXXX, 233XXXXXXXXX, 00233XXXXXXXXX (also with a stray 0 after 233)
+_GHANA_NUMBER = re.compile(r"^(?:(?:\+|00)?2330?|0)(\d{9})$")
+
+# Mobile network by the two digits after the trunk 0
+NETWORK_PREFIXES = {
+    '24': 'MTN', '25': 'MTN', '53': 'MTN', '54': 'MTN', '55': 'MTN', '59': 'MTN',
+    '20': 'Telecel', '50': 'Telecel',
+    '26': 'AT', '27': 'AT', '56': 'AT', '57': 'AT',
+}
+
+INVALID_PHONE_MESSAGE = 'Phone number must be in Ghana format (e.g., 0241234567 or +233241234567)'
+UNKNOWN_NETWORK_MESSAGE = 'Phone number must be an MTN, Telecel or AT mobile number'
+
+
+class InvalidPhoneNumber(ValueError):
+    """Raised when a value is not a usable Ghana phone number."""
+
+
+@dataclass(frozen=True)
+class PhoneNumber:
+    """A parsed Ghana phone number."""
+    national: str  # 9-digit national significant number, e.g. 241234567
+
+    @property
+    def e164(self) -> str:
+        return f"+233{self.national}"
+
+    @property
+    def local(self) -> str:
+        """0XXXXXXXXX, the format mNotify expects."""
+        return f"0{self.national}"
+
+    @property
+    def network(self) -> Optional[str]:
+        """'MTN', 'Telecel', 'AT', or None for other prefixes (landlines, unknown networks)."""
+        return NETWORK_PREFIXES.get(self.national[:2])
+
+
+@lru_cache(maxsize=8192)
+def parse_phone(value: str) -> Optional[PhoneNumber]:
+    """
+    Parse a Ghana number in any common format.
+
+    Returns:
+        PhoneNumber: The parsed number, or None if the value isn't one
+    """
+    match = _GHANA_NUMBER.match(_SEPARATORS.sub('', value or ''))
+    return PhoneNumber(match.group(1)) if match else None
+
+
+def normalize_phone(value: str, check_network: Optional[bool] = None) -> PhoneNumber:
+    """
+    Parse a number, rejecting anything that isn't a Ghana number.
+
+    Args:
+        value: Number as entered
+        check_network: Also require an MTN/Telecel/AT prefix
+            (default: PHONE_VALIDATE_NETWORK)
+
+    Raises:
+        InvalidPhoneNumber: If the value is not a (supported) Ghana number
+    """
+    phone = parse_phone(value)
+    if phone is None:
+        raise InvalidPhoneNumber(INVALID_PHONE_MESSAGE)
+    if check_network is None:
+        check_network = settings.phone_validate_network
+    if check_network and phone.network is None:
+        raise InvalidPhoneNumber(UNKNOWN_NETWORK_MESSAGE)
+    return phone
+
+
+def parse_many(values: Iterable[str]) -> list[Optional[PhoneNumber]]:
+    """
+    Parse many numbers at once (bulk imports, broadcasts).
+
+    Returns:
+        list: One PhoneNumber (or None if unparseable) per value, in order
+    """
+    return [parse_phone(value) for value in values]
+
+
+def local_numbers(values: Iterable[str]) -> list[Optional[str]]:
+    """Local (0XXXXXXXXX) forms of many numbers, None where a value isn't a number."""
+    return [phone.local if phone else None for phone in parse_many(values)]
@@ -0,0 +1,55 @@
+"""
+Background prewarm after startup.
+
+On a cold start the first registration would otherwise pay for importing
+gspread/requests, the Google OAuth token exchange and opening the
+spreadsheet. Prewarm does that work in the background as soon as the
+server is up, so the first user doesn't wait for it.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Optional
+from .config import settings
+from .executors import sheets_executor, sms_executor
+from .google_sheets import sheets_service
+from .sms_service import sms_service
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+_task: Optional[asyncio.Task] = None
+
+
+async def prewarm():
+    """Authenticate to Google and open the mNotify connection pool."""
+    # Yield first so startup completes and the server binds its port
+    await asyncio.sleep(settings.prewarm_delay_seconds)
+    started = time.perf_counter()
+    sheets, sms = await asyncio.gather(
+        sheets_executor.run(sheets_service.ensure_connected),
+        sms_executor.run(lambda: sms_service.session),
+        return_exceptions=True,
+    )
+    for name, result in (("Google Sheets", sheets), ("mNotify", sms)):
+        if isinstance(result, Exception):
+            logger.warning("Prewarm of %s failed (will retry on first use): %s", name, result)
+    logger.info("Prewarm finished in %.2fs", time.perf_counter() - started)
+
+
+def start():
+    """Schedule the prewarm on the running event loop."""
+    global _task
+    if _task and not _task.done():
+        return
+    _task = asyncio.create_task(prewarm())
+
+
+async def stop():
+    if _task and not _task.done():
+        _task.cancel()
+        try:
+            await _task
+        except asyncio.CancelledError:
+            pass
@@ -0,0 +1,159 @@
+"""
+Shared rate-limit storage for slowapi.
+Lets every uvicorn worker on a host count requests in the same SQLite table.
+"""
+
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import urllib.parse
+from limits.storage import Storage
+from .config import settings
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+
+class SQLiteStorage(Storage):
+    """
+    Rate-limit counters in a local SQLite file shared by all worker processes.
+
+    Use with a storage URI such as ``sqlite:////tmp/iyc-rate-limits.db``.
+    Each check is a single primary-key lookup; the file runs in WAL mode
+    with a memory map, so reads never wait on writers and are served from
+    the page cache. Expired counters are deleted periodically rather than
+    on every hit.
+    """
+
+    STORAGE_SCHEME = ["sqlite"]
+
+    def __init__(self, uri: str, wrap_exceptions: bool = False, **options):
+        """
+        Args:
+            uri: sqlite:///relative/path.db or sqlite:////absolute/path.db
+            wrap_exceptions: Wrap sqlite errors in limits.errors.StorageError
+            compaction_interval: Seconds between purges of expired counters (default 60)
+        """
+        parsed = urllib.parse.urlparse(uri)
+        # Same convention as SQLAlchemy: three slashes relative, four absolute
+        self.path = parsed.path[1:] if parsed.path else parsed.netloc
+        self.compaction_interval = float(options.pop("compaction_interval", 60))
+        self._local = threading.local()
+        self._last_compaction = time.time()
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+        self._connection().executescript(
+            """
+            CREATE TABLE IF NOT EXISTS counters (
+                key TEXT PRIMARY KEY,
+                count INTEGER NOT NULL,
+                expiry REAL NOT NULL
+            ) WITHOUT ROWID;
+            """
+        )
+
+    @property
+    def base_exceptions(self):
+        return sqlite3.Error
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            # Counters are disposable - no need to fsync every hit
+            conn.execute("PRAGMA synchronous=OFF")
+            conn.execute("PRAGMA mmap_size=8388608")
+            self._local.conn = conn
+        return conn
+
+    def incr(self, key: str, expiry: float, amount: int = 1, **kwargs) -> int:
+        """
+        Increment the counter for key, starting a new window if it expired.
+
+        Returns:
+            int: Counter value after the increment
+        """
+        conn = self._connection()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                """
+                INSERT INTO counters (key, count, expiry) VALUES (?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET
+                    count = CASE WHEN expiry <= ? THEN excluded.count ELSE count + excluded.count END,
+                    expiry = CASE WHEN expiry <= ? THEN excluded.expiry ELSE expiry END
+                """,
+                (key, amount, now + expiry, now, now),
+            )
+            (count,) = conn.execute("SELECT count FROM counters WHERE key = ?", (key,)).fetchone()
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        if now - self._last_compaction > self.compaction_interval:
+            self.compact()
+        return count
+
+    def get(self, key: str) -> int:
+        """Current counter value (0 if missing or expired)."""
+        row = self._connection().execute(
+            "SELECT count FROM counters WHERE key = ? AND expiry > ?", (key, time.time())
+        ).fetchone()
+        return row[0] if row else 0
+
+    def get_expiry(self, key: str) -> float:
+        """Epoch time at which the key's current window ends."""
+        row = self._connection().execute(
+            "SELECT expiry FROM counters WHERE key = ? AND expiry > ?", (key, time.time())
+        ).fetchone()
+        return row[0] if row else time.time()
+
+    def check(self) -> bool:
+        """Check that the database file is usable."""
+        try:
+            self._connection().execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def reset(self) -> int:
+        """Delete every counter."""
+        return self._connection().execute("DELETE FROM counters").rowcount
+
+    def clear(self, key: str) -> None:
+        """Delete one counter."""
+        self._connection().execute("DELETE FROM counters WHERE key = ?", (key,))
+
+    def compact(self) -> int:
+        """
+        Delete expired counters.
+
+        Returns:
+            int: Number of counters removed
+        """
+        self._last_compaction = time.time()
+        removed = self._connection().execute(
+            "DELETE FROM counters WHERE expiry <= ?", (self._last_compaction,)
+        ).rowcount
+        if removed:
+            logger.info("Compacted %s expired rate-limit counter(s)", removed)
+        return removed
+
+
+def storage_uri() -> str:
+    """
+    Storage URI for the limiter.
+
+    RATE_LIMIT_STORAGE_URI wins when set (e.g. redis://host:6379 for several
+    nodes, memory:// for a single process). Otherwise a SQLite file in the
+    system temp directory is shared by all workers on this host.
+    """
+    if settings.rate_limit_storage_uri:
+        return settings.rate_limit_storage_uri
+    path = os.path.join(tempfile.gettempdir(), "iyc-rate-limits.db")
+    return f"sqlite:///{path}"
@@ -0,0 +1,221 @@
+"""
+Reconciliation and repair of the registrations sheet.
+
+The sheet (every shard, when sharded) is scanned with range reads of
+RECONCILE_CHUNK_SIZE rows. Each
+row is reduced to a 16-byte hash of its normalized content (timestamp,
+status and ticket excluded), and only those hashes are kept, so a 50k-row
+sheet needs a few MB whatever the rows contain. The scan finds:
+
+- duplicates: a later row with the same content as a 'Success' row
+- redundant failures: a 'Failed' row whose person registered again later
+- delivered failures: a 'Failed' row whose ticket was checked in at the door
+  (it then counts as a 'Success' row from where it stands, so a later
+  copy is a duplicate and an earlier one makes it a redundant failure)
+- orphaned failures: any other 'Failed' row (reported, left as is)
+- incomplete rows: rows missing a name, church or city
+
+Repairs only rewrite the Status cell ('Duplicate', 'Success' or
+'Incomplete') with batched batch_update calls. Rows are never deleted, so
+export cursors (sheet row numbers) stay valid.
+
+Run a dry run with `python -m app.reconcile`, add `--apply` to write the fixes.
+"""
+
+import argparse
+import hashlib
+import html
+import json
+import logging
+import re
+from typing import Optional
+from .config import settings
+from .export import FIRST_DATA_ROW
+from .google_sheets import sheets_service, row_to_registration
+from .phone import parse_phone
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Row numbers listed per finding in the report (counts are always complete)
+MAX_SAMPLES = 20
+
+# Status cells rewritten per batch_update call
+UPDATE_BATCH_SIZE = 500
+
+# Columns that identify a registration; two rows agreeing on all of them are duplicates
+HASHED_FIELDS = ('full_name', 'phone', 'email', 'church', 'institution', 'city', 'leader')
+
+REQUIRED_FIELDS = ('full_name', 'church', 'city')
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def row_hash(registration: dict) -> bytes:
+    """Hash of a registration's identifying content, ignoring case, spacing, escaping and phone format."""
+    parts = []
+    for field in HASHED_FIELDS:
+        value = _WHITESPACE.sub(" ", html.unescape(registration.get(field, '')).strip()).casefold()
+        if field == 'phone':
+            phone = parse_phone(value)
+            value = phone.national if phone else value
+        parts.append(value)
+    return hashlib.blake2b("\x1f".join(parts).encode(), digest_size=16).digest()
+
+
+class Finding:
+    """Count and sample rows ("Worksheet!row") of one kind of problem."""
+
+    def __init__(self, fix: Optional[str] = None):
+        self.fix = fix  # Status written by --apply (None = report only)
+        self.count = 0
+        self.rows: list[str] = []
+
+    def add(self, shard: str, row_number: int):
+        self.count += 1
+        if len(self.rows) < MAX_SAMPLES:
+            self.rows.append(f"{shard}!{row_number}")
+
+    def as_dict(self) -> dict:
+        return {"count": self.count, "fix": self.fix, "sample_rows": self.rows}
+
+
+class Reconciler:
+    """One scan of the sheet (blocking; run it in a worker thread)."""
+
+    def __init__(self, chunk_size: Optional[int] = None):
+        self.chunk_size = chunk_size or settings.reconcile_chunk_size
+        self.findings = {
+            "duplicate": Finding("Duplicate"),
+            "redundant_failed": Finding("Duplicate"),
+            "delivered_failed": Finding("Success"),
+            "orphaned_failed": Finding(),
+            "incomplete": Finding("Incomplete"),
+        }
+        self.rows_scanned = 0
+        self.updates: dict[str, list[tuple[int, str]]] = {}  # shard -> (row, status)
+
+    def _flag(self, finding: str, shard: str, row_number: int):
+        self.findings[finding].add(shard, row_number)
+        fix = self.findings[finding].fix
+        if fix:
+            self.updates.setdefault(shard, []).append((row_number, fix))
+
+    @property
+    def update_count(self) -> int:
+        return sum(len(updates) for updates in self.updates.values())
+
+    def scan(self, checked_in: set[str]):
+        """
+        Read every shard chunk by chunk and collect findings and the status updates that fix them.
+
+        Args:
+            checked_in: Tickets recorded on the Check-ins worksheet
+        """
+        seen: set[bytes] = set()  # Hashes of 'Success' rows, across all shards
+        failed: list[tuple[str, int, bytes]] = []  # (shard, row, hash) of undelivered failures, resolved at the end
+
+        for shard in sheets_service.list_shards():
+            start = FIRST_DATA_ROW
+            while True:
+                rows = sheets_service.read_rows(start, self.chunk_size, shard)
+                for offset, row in enumerate(rows):
+                    if not any(str(cell).strip() for cell in row):
+                        continue
+                    row_number = start + offset
+                    self.rows_scanned += 1
+                    registration = row_to_registration(row)
+                    status = registration['status']
+                    if status in ('Duplicate', 'Incomplete'):
+                        continue
+                    if any(not registration[field].strip() for field in REQUIRED_FIELDS):
+                        self._flag("incomplete", shard, row_number)
+                        continue
+                    digest = row_hash(registration)
+                    if status == 'Failed' and registration['ticket'] not in checked_in:
+                        failed.append((shard, row_number, digest))
+                    elif digest in seen:
+                        self._flag("redundant_failed" if status == 'Failed' else "duplicate", shard, row_number)
+                    else:
+                        seen.add(digest)
+                        if status == 'Failed':
+                            self._flag("delivered_failed", shard, row_number)
+                if len(rows) < self.chunk_size:
+                    break
+                start += self.chunk_size
+
+        for shard, row_number, digest in failed:
+            if digest in seen:
+                self._flag("redundant_failed", shard, row_number)
+            else:
+                self._flag("orphaned_failed", shard, row_number)
+
+    def apply(self) -> int:
+        """Write the collected status fixes. Returns the number of rows updated."""
+        for shard, updates in self.updates.items():
+            updates.sort()
+            for i in range(0, len(updates), UPDATE_BATCH_SIZE):
+                sheets_service.update_statuses(updates[i:i + UPDATE_BATCH_SIZE], shard)
+        return self.update_count
+
+    def report(self, applied: bool) -> dict:
+        return {
+            "rows_scanned": self.rows_scanned,
+            "applied": applied,
+            "rows_to_update": self.update_count,
+            "findings": {name: finding.as_dict() for name, finding in self.findings.items()},
+        }
+
+
+def read_checked_in_tickets() -> set[str]:
+    """Tickets on the Check-ins worksheet (ticket column of CHECKIN_HEADERS)."""
+    return {row[1] for row in sheets_service.read_checkins() if len(row) > 1 and row[1]}
+
+
+def reconcile(apply: bool = False, chunk_size: Optional[int] = None) -> dict:
+    """
+    Scan the registrations sheet and optionally repair it (blocking).
+
+    Args:
+        apply: Write the status fixes (otherwise only report them)
+        chunk_size: Rows per range read (default RECONCILE_CHUNK_SIZE)
+
+    Returns:
+        dict: Rows scanned, and count, fix and sample row numbers per finding
+    """
+    reconciler = Reconciler(chunk_size)
+    reconciler.scan(read_checked_in_tickets())
+    if apply and reconciler.updates:
+        reconciler.apply()
+    report = reconciler.report(applied=apply)
+    logger.info(
+        "Reconciled %s row(s): %s status fix(es)%s",
+        reconciler.rows_scanned, reconciler.update_count, " applied" if apply else " found (dry run)"
+    )
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Find and repair duplicate, failed and incomplete rows in the registrations sheet")
+    parser.add_argument("--apply", action="store_true", help="Write the status fixes (default is a dry run)")
+    parser.add_argument("--chunk-size", type=int, default=None, help="Rows per range read (default RECONCILE_CHUNK_SIZE)")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s: %(message)s")
+    report = reconcile(apply=args.apply, chunk_size=args.chunk_size)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"Rows scanned: {report['rows_scanned']}")
+    for name, finding in report["findings"].items():
+        action = f" -> {finding['fix']}" if finding["fix"] else " (report only)"
+        rows = ", ".join(finding["sample_rows"])
+        print(f"  {name:<18} {finding['count']:>6}{action}{f'  rows {rows}' if rows else ''}")
+    if report["rows_to_update"] and not args.apply:
+        print(f"\nDry run: re-run with --apply to update {report['rows_to_update']} row(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,20 +2,39 @@
 API routes for conference registration.
 """
 
-from fastapi import APIRouter, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse
 from slowapi import Limiter
 from slowapi.util import get_remote_address
+import asyncio
 import logging
 import html
+import time
+from typing import Awaitable, Literal
+from .config import settings
+from .batching import QueueFullError
+from .batch_import import BatchFormatError, BatchTooLargeError, read_batch, validate_records
 from .models import RegistrationRequest, RegistrationResponse
-from .google_sheets import sheets_service
+from .google_sheets import sheets_service, sheets_writer
+from .sheets_quota import SheetsUnavailableError
+from .journal import registration_journal
+from .dedup import MAX_IDEMPOTENCY_KEY_LENGTH, RegistrationPendingError, registration_index, registration_keys
+from .stats import registration_stats
+from .suggest import suggestion_index
+from .tickets import issue_ticket, ticket_index, verify_ticket
+from .auth import require_admin
+from .executors import sheets_executor, sms_executor
+from .health import health_prober
+from .rate_limit import storage_uri
+from .metrics import time_stage, observe_stage, record_outcome
 from .sms_service import sms_service
+from .sms_dispatcher import sms_dispatcher
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
-# Set up rate limiter
-limiter = Limiter(key_func=get_remote_address)
+# Set up rate limiter (counters shared across worker processes)
+limiter = Limiter(key_func=get_remote_address, storage_uri=storage_uri())
 
 # Create router
 router = APIRouter(prefix="/api", tags=["registration"])
@@ -33,44 +52,272 @@ def sanitize_input(text: str) -> str:
     return sanitized
 
 
+def sanitize_registration(registration: RegistrationRequest) -> dict:
+    """Build the sanitized registration dict that is saved and confirmed."""
+    return {
+        'full_name': sanitize_input(registration.full_name),
+        'church': sanitize_input(registration.church),
+        'city': sanitize_input(registration.city),
+        'phone': sanitize_input(registration.phone) if registration.phone else '',
+        'institution': sanitize_input(registration.institution) if registration.institution else '',
+        'leader': sanitize_input(registration.leader) if registration.leader else '',
+        'email': registration.email if registration.email else '',
+        'contact_method': registration.contact_method if registration.contact_method else '',
+        'first_time_attendee': registration.first_time_attendee if registration.first_time_attendee else '',
+        'prayer_request': sanitize_input(registration.prayer_request) if registration.prayer_request else '',
+    }
+
+
+async def save_registration(sanitized_data: dict):
+    """
+    Persist a sanitized registration using the configured write path.
+    
+    Raises:
+        QueueFullError: If the write buffer is at capacity
+        Exception: If the registration could not be saved
+    """
+    if settings.journal_enabled:
+        # Durable local commit; the sync worker writes it to Google Sheets
+        await asyncio.wrap_future(registration_journal.append(sanitized_data))
+    elif settings.sheets_batch_enabled:
+        # Buffered write: wait for the batch containing this row to be flushed
+        row = sheets_service.build_row(sanitized_data)
+        await asyncio.wrap_future(sheets_writer.submit(row))
+    else:
+        await sheets_executor.run(sheets_service.append_registration, sanitized_data)
+
+
+async def send_confirmation(sanitized_data: dict) -> tuple[bool, str]:
+    """
+    Queue (or send) the confirmation SMS without letting failures escape.
+    
+    Returns:
+        tuple: (sms_sent: bool, message: str)
+    """
+    if not sanitized_data.get('phone'):
+        return False, "No phone number provided"
+    
+    with time_stage("sms"):
+        return await _send_confirmation(sanitized_data)
+
+
+async def _send_confirmation(sanitized_data: dict) -> tuple[bool, str]:
+    """Queue the SMS, or send it inline when queueing is disabled or saturated."""
+    if settings.sms_dispatch_enabled:
+        try:
+            sms_dispatcher.enqueue(sanitized_data['phone'], sanitized_data['full_name'], sanitized_data.get('ticket', ''))
+            return False, "Confirmation SMS queued"
+        except QueueFullError as e:
+            # Queue is saturated - fall back to sending inline
+            logger.warning("SMS queue full, sending inline: %s", e)
+    
+    try:
+        sms_sent, sms_message = await sms_executor.run(
+            sms_service.send_confirmation_sms,
+            sanitized_data['phone'],
+            sanitized_data['full_name'],
+            sanitized_data.get('ticket', '')
+        )
+        if sms_sent:
+            logger.info("SMS confirmation sent successfully")
+        else:
+            record_outcome("sms_failed")
+            logger.warning("SMS failed but registration succeeded: %s", sms_message)
+        return sms_sent, sms_message
+    except Exception as e:
+        record_outcome("sms_failed")
+        logger.error("SMS service error (non-critical): %s", e)
+        return False, str(e)
+
+
+def sheets_busy(error: SheetsUnavailableError) -> HTTPException:
+    """503 telling the client when Google Sheets should accept writes again."""
+    return HTTPException(
+        status_code=503,
+        detail={
+            "message": "We are receiving a lot of registrations right now. Please try again in a moment.",
+            "error": "server_busy"
+        },
+        headers={"Retry-After": str(max(1, int(error.retry_after + 0.999)))}
+    )
+
+
+def still_saving(error: RegistrationPendingError) -> HTTPException:
+    """409 telling a repeat submission to come back once the original has been saved."""
+    return HTTPException(
+        status_code=409,
+        detail={
+            "message": "Your registration is still being processed. Please check again in a moment.",
+            "error": "registration_pending"
+        },
+        headers={"Retry-After": str(error.retry_after)}
+    )
+
+
+async def record_ticket_holders(registrations: list[dict]):
+    """Share the holders of newly issued tickets with the other workers (failures are only logged)."""
+    try:
+        await asyncio.to_thread(ticket_index.add_many, registrations)
+    except Exception as e:
+        logger.error("Failed to record ticket holder(s): %s", e)
+
+
+async def finish_registration(sanitized_data: dict, keys: list[str]) -> dict:
+    """
+    Confirm a saved registration and record it in the shared indexes.
+    
+    Returns:
+        dict: The response data (also stored for duplicates of this registration)
+    """
+    sms_sent, sms_message = await send_confirmation(sanitized_data)
+    data = {
+        'name': sanitized_data['full_name'],
+        'sms_sent': sms_sent,
+        'sms_message': sms_message if not sms_sent else 'Confirmation SMS sent successfully',
+        'ticket': sanitized_data['ticket']
+    }
+    registration_index.complete(keys, data)
+    await registration_stats.add_many([sanitized_data])
+    suggestion_index.add(sanitized_data)
+    await record_ticket_holders([sanitized_data])
+    return data
+
+
+# Registrations whose request was cancelled, finished in the background (kept referenced until done)
+_abandoned_registrations: set[asyncio.Task] = set()
+
+
+def finish_without_client(work: Awaitable, keys: list[str]):
+    """
+    Let a registration whose client went away run to the end in the background.
+    
+    Once the save has started the row gets written regardless (by the Sheets
+    thread, the write buffer or the journal), so the duplicate reservation
+    is held until the work is over: a retry waits for it and gets this
+    registration back instead of saving a second row and paying for a
+    second SMS. The keys are released only if the save failed.
+    
+    Args:
+        work: The rest of the registration (the save and/or finish_registration())
+        keys: Keys the cancelled request reserved
+    """
+    async def run():
+        try:
+            await work
+            logger.info("Registration finished after its client disconnected")
+        except Exception as e:
+            logger.warning("Registration abandoned by its client failed: %s", e)
+        finally:
+            registration_index.release(keys)
+
+    task = asyncio.create_task(run())
+    _abandoned_registrations.add(task)
+    task.add_done_callback(_abandoned_registrations.discard)
+
+
+async def save_then_finish(save: asyncio.Future, sanitized_data: dict, keys: list[str]):
+    """Wait for an in-flight save, then confirm and record the registration."""
+    await save
+    await finish_registration(sanitized_data, keys)
+
+
+def registration_success(data: dict) -> RegistrationResponse:
+    """Build the /api/register success response from its data dict."""
+    return RegistrationResponse(
+        success=True,
+        message=f"Registration successful! Welcome, {data['name']}!",
+        data=data
+    )
+
+
 @router.post("/register", response_model=RegistrationResponse)
-@limiter.limit("5/minute")  # Max 5 registrations per minute per IP
-async def register_attendee(request: Request, registration: RegistrationRequest):
+@limiter.limit(lambda: settings.register_rate_limit)  # Default: max 5 registrations per minute per IP
+async def register_attendee(request: Request, response: Response, registration: RegistrationRequest):
     """
     Register a new conference attendee.
     
     This endpoint:
     1. Validates the registration data
     2. Sanitizes all inputs
-    3. Saves to Google Sheets
-    4. Sends SMS confirmation (non-blocking, errors logged but don't fail registration)
-    5. Returns success response
+    3. Saves to Google Sheets, then queues (or sends) the SMS confirmation
+       (SMS errors are logged but don't fail registration; nothing is sent
+       for a registration that wasn't saved)
+    4. Returns success response
     
-    Rate limited to 5 requests per minute per IP address.
+    Blocking Google/mNotify client calls run in their own bounded thread
+    pools, so a slow dependency never stalls the event loop.
+    
+    Rate limited per IP address (REGISTER_RATE_LIMIT, default 5 per minute).
+    
+    Repeat submissions (same Idempotency-Key header, or same name with the
+    same phone number or email) get the original response back, marked
+    with an Idempotent-Replayed header, without another save or SMS.
+    
+    Each stage (validation, sanitize, save, sms, serialization) is timed
+    for /metrics.
     """
+    # Body parsing and model validation happened between the middleware and here
+    received_at = getattr(request.state, "received_at", None)
+    if received_at is not None:
+        observe_stage("validation", time.perf_counter() - received_at)
+    
+    keys = []
+    reserved_keys = []  # Keys this request reserved in the duplicate index
     try:
         logger.info("Processing new registration")
         
         # Sanitize all text inputs
-        sanitized_data = {
-            'full_name': sanitize_input(registration.full_name),
-            'church': sanitize_input(registration.church),
-            'city': sanitize_input(registration.city),
-            'phone': sanitize_input(registration.phone) if registration.phone else '',
-            'institution': sanitize_input(registration.institution) if registration.institution else '',
-            'leader': sanitize_input(registration.leader) if registration.leader else '',
-            'email': registration.email if registration.email else '',
-            'contact_method': registration.contact_method if registration.contact_method else '',
-            'first_time_attendee': registration.first_time_attendee if registration.first_time_attendee else '',
-            'prayer_request': sanitize_input(registration.prayer_request) if registration.prayer_request else '',
-        }
+        sanitize_started = time.perf_counter()
+        sanitized_data = sanitize_registration(registration)
+        observe_stage("sanitize", time.perf_counter() - sanitize_started)
+        
+        # Answer a repeat submission with the original response
+        if settings.dedup_enabled:
+            keys = registration_keys(sanitized_data, request.headers.get("Idempotency-Key"))
+            try:
+                original = await registration_index.claim(keys)
+            except RegistrationPendingError as e:
+                record_outcome("duplicate")
+                logger.info("Duplicate registration gave up waiting for the original to be saved")
+                raise still_saving(e)
+            if original is not None:
+                record_outcome("duplicate")
+                logger.info("Duplicate registration answered with the original response")
+                response.headers["Idempotent-Replayed"] = "true"
+                return registration_success(original)
+            reserved_keys = keys
         
-        # Save to Google Sheets
+        sanitized_data['ticket'] = issue_ticket()
+        
+        # Save the registration (local journal, write buffer or straight to Google Sheets)
+        save = asyncio.ensure_future(save_registration(sanitized_data))
         try:
-            sheets_service.append_registration(sanitized_data)
-            logger.info("Registration saved to Google Sheets successfully")
+            with time_stage("save"):
+                await asyncio.shield(save)
+            logger.info("Registration saved successfully")
+        except asyncio.CancelledError:
+            # The client went away, but the save goes on: keep the reservation until it resolves
+            finish_without_client(save_then_finish(save, sanitized_data, keys), reserved_keys)
+            reserved_keys = []
+            raise
+        except QueueFullError as e:
+            record_outcome("server_busy")
+            logger.warning("Registration write buffer is full: %s", e)
+            raise HTTPException(
+                status_code=503,
+                detail={
+                    "message": "We are receiving a lot of registrations right now. Please try again in a moment.",
+                    "error": "server_busy"
+                }
+            )
+        except SheetsUnavailableError as e:
+            # Google is overloaded - fail fast instead of adding to the pile
+            record_outcome("server_busy")
+            logger.warning("Google Sheets unavailable, registration not saved: %s", e)
+            raise sheets_busy(e)
         except Exception as e:
-            logger.error(f"Failed to save to Google Sheets: {str(e)}")
+            record_outcome("sheets_error")
+            logger.error("Failed to save to Google Sheets: %s", e)
             raise HTTPException(
                 status_code=500,
                 detail={
@@ -79,41 +326,27 @@ async def register_attendee(request: Request, registration: RegistrationRequest)
                 }
             )
         
-        # Send SMS confirmation (non-blocking - don't fail registration if SMS fails)
-        sms_sent = False
-        sms_message = ""
-        if sanitized_data.get('phone'):
-            try:
-                sms_sent, sms_message = sms_service.send_confirmation_sms(
-                    sanitized_data['phone'],
-                    sanitized_data['full_name']
-                )
-                if sms_sent:
-                    logger.info("SMS confirmation sent successfully")
-                else:
-                    logger.warning(f"SMS failed but registration succeeded: {sms_message}")
-            except Exception as e:
-                logger.error(f"SMS service error (non-critical): {str(e)}")
-                sms_message = str(e)
-        else:
-            sms_message = "No phone number provided"
+        # Only confirm a registration that was saved
+        finish = asyncio.ensure_future(finish_registration(sanitized_data, keys))
+        try:
+            data = await asyncio.shield(finish)
+        except asyncio.CancelledError:
+            finish_without_client(finish, reserved_keys)
+            reserved_keys = []
+            raise
+        record_outcome("success")
+        # Serialization is timed from here by the metrics middleware
+        request.state.handler_finished_at = time.perf_counter()
         
         # Return success response
-        return RegistrationResponse(
-            success=True,
-            message=f"Registration successful! Welcome, {sanitized_data['full_name']}!",
-            data={
-                'name': sanitized_data['full_name'],
-                'sms_sent': sms_sent,
-                'sms_message': sms_message if not sms_sent else 'Confirmation SMS sent successfully'
-            }
-        )
+        return registration_success(data)
         
     except HTTPException:
         # Re-raise HTTP exceptions
         raise
     except Exception as e:
-        logger.error(f"Unexpected error during registration: {str(e)}")
+        record_outcome("internal_error")
+        logger.error("Unexpected error during registration: %s", e)
         raise HTTPException(
             status_code=500,
             detail={
@@ -121,6 +354,238 @@ async def register_attendee(request: Request, registration: RegistrationRequest)
                 "error": "internal_server_error"
             }
         )
+    finally:
+        # No-op once complete() ran (or a cancelled save took the keys over);
+        # otherwise lets a retry go ahead
+        registration_index.release(reserved_keys)
+
+
+async def save_registrations(sanitized_batch: list[dict]):
+    """
+    Persist a batch of sanitized registrations with a single write.
+    
+    Raises:
+        Exception: If the batch could not be saved
+    """
+    if settings.journal_enabled:
+        # One local transaction; the sync worker pushes the rows to Google Sheets
+        await asyncio.to_thread(registration_journal.append_many, sanitized_batch)
+    else:
+        rows = [sheets_service.build_row(data) for data in sanitized_batch]
+        await sheets_executor.run(sheets_service.append_rows, rows)
+
+
+async def queue_confirmations(sanitized_batch: list[dict]) -> int:
+    """
+    Queue confirmation SMS for a batch (or send them inline when queueing is disabled).
+    
+    Returns:
+        int: Number of confirmations queued or sent
+    """
+    recipients = [data for data in sanitized_batch if data.get('phone')]
+    if not settings.sms_dispatch_enabled:
+        results = await asyncio.gather(*(_send_confirmation(data) for data in recipients))
+        return sum(1 for sms_sent, _ in results if sms_sent)
+    
+    queued = 0
+    for data in recipients:
+        try:
+            sms_dispatcher.enqueue(data['phone'], data['full_name'], data.get('ticket', ''))
+            queued += 1
+        except QueueFullError as e:
+            # Don't send hundreds of messages inline; report them as not queued
+            record_outcome("sms_failed", len(recipients) - queued)
+            logger.warning("SMS queue full during batch registration: %s", e)
+            break
+    return queued
+
+
+@router.post("/register/batch", response_model=RegistrationResponse)
+@limiter.limit(lambda: settings.batch_rate_limit)  # Default: 10 batches per hour per IP
+async def register_batch(request: Request):
+    """
+    Register several attendees at once (kiosks, church group sign-ups).
+    
+    Accepts a JSON array of registration objects (or {"records": [...]}),
+    or a multipart upload with a CSV file in the "file" field whose header
+    row uses the registration field names.
+    
+    Records are validated one at a time; invalid records are reported by
+    index and skipped. All valid records are saved with one bulk write and
+    their confirmation SMS are queued together, so a batch of a few hundred
+    costs about as much as a single registration.
+    
+    Rate limited per IP address (BATCH_RATE_LIMIT, default 10 per hour) and
+    capped at BATCH_MAX_RECORDS records and BATCH_MAX_BYTES bytes.
+    
+    Records matching an existing registration (or an earlier record in the
+    same batch) are reported under "duplicates" and not saved again. A
+    retried batch with the same Idempotency-Key gets the original response.
+    """
+    batch_keys = []
+    if settings.dedup_enabled and request.headers.get("Idempotency-Key"):
+        batch_keys = [f"batch:{request.headers['Idempotency-Key'][:MAX_IDEMPOTENCY_KEY_LENGTH]}"]
+        try:
+            original = await registration_index.claim(batch_keys)
+        except RegistrationPendingError as e:
+            record_outcome("duplicate")
+            raise still_saving(e)
+        if original is not None:
+            record_outcome("duplicate")
+            return JSONResponse(
+                content=RegistrationResponse(success=True, message=original['message'], data=original['data']).model_dump(),
+                headers={"Idempotent-Replayed": "true"}
+            )
+    
+    record_keys = []
+    try:
+        try:
+            records = await read_batch(request, settings.batch_max_bytes)
+            valid, errors = validate_records(records, settings.batch_max_records)
+        except BatchFormatError as e:
+            raise HTTPException(
+                status_code=413 if isinstance(e, BatchTooLargeError) else 400,
+                detail={"message": str(e), "error": "invalid_batch"}
+            )
+    
+        if not valid:
+            raise HTTPException(
+                status_code=422,
+                detail={
+                    "message": "No valid registrations in the batch.",
+                    "error": "validation_error",
+                    "errors": errors
+                }
+            )
+    
+        logger.info("Processing batch of %s registration(s) (%s invalid)", len(valid), len(errors))
+        with time_stage("sanitize"):
+            sanitized = [(index, sanitize_registration(registration)) for index, registration in valid]
+        keys_by_record = [
+            registration_keys(sanitized_data) if settings.dedup_enabled else []
+            for _, sanitized_data in sanitized
+        ]
+        # One reservation round trip for the whole batch
+        reserved = await registration_index.claim_each(keys_by_record)
+        sanitized_batch = []
+        duplicates = []
+        for (index, sanitized_data), keys, is_new in zip(sanitized, keys_by_record, reserved):
+            if not is_new:
+                duplicates.append({'index': index, 'name': sanitized_data['full_name']})
+                continue
+            sanitized_data['ticket'] = issue_ticket()
+            sanitized_batch.append(sanitized_data)
+            record_keys.append(keys)
+    
+        try:
+            if sanitized_batch:
+                with time_stage("save"):
+                    await save_registrations(sanitized_batch)
+        except Exception as e:
+            if isinstance(e, SheetsUnavailableError):
+                record_outcome("server_busy", len(sanitized_batch))
+                logger.warning("Google Sheets unavailable, batch not saved: %s", e)
+                raise sheets_busy(e)
+            record_outcome("sheets_error", len(sanitized_batch))
+            logger.error("Failed to save registration batch: %s", e)
+            raise HTTPException(
+                status_code=500,
+                detail={
+                    "message": "Failed to save registrations. Please try again or contact support.",
+                    "error": "google_sheets_error"
+                }
+            )
+    
+        with time_stage("sms"):
+            sms_queued = await queue_confirmations(sanitized_batch)
+        registration_index.complete_many([
+            (keys, {
+                'name': sanitized_data['full_name'],
+                'sms_sent': False,
+                'sms_message': 'Confirmation SMS queued',
+                'ticket': sanitized_data['ticket']
+            })
+            for sanitized_data, keys in zip(sanitized_batch, record_keys)
+        ])
+        await registration_stats.add_many(sanitized_batch)
+        for sanitized_data in sanitized_batch:
+            suggestion_index.add(sanitized_data)
+        await record_ticket_holders(sanitized_batch)
+        record_outcome("success", len(sanitized_batch))
+        if duplicates:
+            record_outcome("duplicate", len(duplicates))
+    
+        message = f"Registered {len(sanitized_batch)} attendee(s)."
+        data = {
+            'received': len(valid) + len(errors),
+            'saved': len(sanitized_batch),
+            'failed': len(errors),
+            'errors': errors,
+            'duplicates': duplicates,
+            'sms_queued': sms_queued,
+            'tickets': [{'name': d['full_name'], 'ticket': d['ticket']} for d in sanitized_batch]
+        }
+        registration_index.complete(batch_keys, {'message': message, 'data': data})
+        return RegistrationResponse(success=True, message=message, data=data)
+    finally:
+        # Give back reservations of records that were not saved (no-op for completed ones)
+        for keys in record_keys + [batch_keys]:
+            registration_index.release(keys)
+
+
+@router.get("/suggest")
+@limiter.limit(lambda: settings.suggest_rate_limit)
+async def suggest(
+    request: Request,
+    field: Literal["church", "institution", "city"],
+    q: str = Query("", max_length=100),
+    limit: int = Query(None, ge=1, le=20),
+):
+    """
+    Suggest values for a free-text field as the attendee types.
+    
+    Matches the start of any word ("pent" finds "The Church of Pentecost"),
+    most used first. Served from an in-memory index, so responses are
+    cacheable for SUGGEST_CACHE_SECONDS.
+    """
+    suggestions = suggestion_index.suggest(field, q, limit)
+    return JSONResponse(
+        content={"field": field, "query": q, "suggestions": suggestions},
+        headers={"Cache-Control": f"public, max-age={settings.suggest_cache_seconds}"}
+    )
+
+
+@router.post("/checkin/{ticket}", response_model=dict, dependencies=[Depends(require_admin)])
+async def check_in(ticket: str, request: Request):
+    """
+    Check an attendee in at the door (organizer token required).
+    
+    The ticket's signature is verified without any lookup, and the
+    check-in is recorded in the file shared by all workers; the check-in
+    row is written to the "Check-ins" worksheet in the next batch. Scanning
+    a ticket again (on any worker) reports when it was first checked in.
+    
+    Send an X-Scanner-Id header to record which device scanned the ticket.
+    """
+    canonical = verify_ticket(ticket)
+    if canonical is None:
+        raise HTTPException(
+            status_code=400,
+            detail={"message": "This is not a valid ticket.", "error": "invalid_ticket"}
+        )
+    
+    scanner = request.headers.get("X-Scanner-Id", "")[:64]
+    first, checked_in_at = await asyncio.to_thread(ticket_index.check_in, canonical, scanner)
+    # Signed by us but unknown: issued on another host, or its holder couldn't be recorded
+    holder = await asyncio.to_thread(ticket_index.holder, canonical) or {'name': '', 'church': ''}
+    return {
+        "valid": True,
+        "ticket": canonical,
+        "name": html.unescape(holder['name']),
+        "church": html.unescape(holder['church']),
+        "already_checked_in": not first,
+        "checked_in_at": checked_in_at
+    }
 
 
 @router.get("/health", response_model=dict)
@@ -128,35 +593,35 @@ async def health_check():
     """
     Health check endpoint to verify service status.
     
-    Checks:
+    Returns the snapshot cached by the background health prober:
     - API is running
     - Google Sheets connectivity
-    - SMS service initialization
-    """
-    health_status = {
-        "status": "healthy",
-        "services": {
-            "api": "operational",
-            "google_sheets": "unknown",
-            "sms": "unknown"
-        }
-    }
-    
-    # Check Google Sheets
-    try:
-        sheets_service.authenticate()
-        sheets_service.get_worksheet()
-        health_status["services"]["google_sheets"] = "operational"
-    except Exception as e:
-        logger.error(f"Google Sheets health check failed: {str(e)}")
-        health_status["services"]["google_sheets"] = f"error: {str(e)}"
-        health_status["status"] = "degraded"
-    
-    # Check SMS service
-    if sms_service.client:
-        health_status["services"]["sms"] = "operational"
-    else:
-        health_status["services"]["sms"] = "not_initialized"
-        health_status["status"] = "degraded"
+    - mNotify reachability
+    - Internal queue depths
+    - Google Sheets quota tokens and circuit breaker state
+    - Admission control limit and shed count
     
-    return health_status
+    Calling it never touches Google or mNotify.
+    """
+    return health_prober.snapshot
+
+
+@router.get("/live", response_model=dict)
+async def liveness_check():
+    """Liveness probe: the process is up and serving requests."""
+    return {"status": "alive"}
+
+
+@router.get("/ready", response_model=dict)
+async def readiness_check():
+    """
+    Readiness probe: 503 while queues are saturated or a required dependency is down.
+    """
+    ready, reasons = health_prober.readiness()
+    body = {
+        "ready": ready,
+        "reasons": reasons,
+        "checked_at": health_prober.snapshot["checked_at"]
+    }
+    return JSONResponse(status_code=200 if ready else 503, content=body)
+
@@ -0,0 +1,89 @@
+"""
+Startup seeding of the in-memory registration indexes.
+
+Duplicate detection, statistics and similar per-process indexes are all
+filled from the same single bulk read of the sheet (plus journal rows not
+yet synced) instead of each reading the sheet on its own.
+"""
+
+import asyncio
+import logging
+from typing import Optional, Protocol
+from .config import settings
+from .executors import sheets_executor
+from .google_sheets import INACTIVE_STATUSES, sheets_service, row_to_registration
+from .journal import registration_journal
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+
+class SeededIndex(Protocol):
+    """Anything that can be (re)built from the saved registrations."""
+
+    def rebuild(self, registrations: list[dict]): ...
+
+
+def read_registrations() -> list[dict]:
+    """
+    Read every saved registration with one Sheets call (blocking).
+
+    Rows marked 'Failed' are skipped: they were never confirmed, so the
+    person will register again. So are rows the reconciliation tool marked
+    as duplicates or incomplete.
+
+    Returns:
+        list[dict]: Registrations (see row_to_registration)
+    """
+    registrations = []
+    for row in sheets_service.read_all_rows():
+        registration = row_to_registration(row)
+        if registration['status'] not in INACTIVE_STATUSES:
+            registrations.append(registration)
+    if settings.journal_enabled:
+        registrations.extend(registration_journal.unsynced_registrations())
+    return registrations
+
+
+class RegistrationSeeder:
+    """Runs the startup read in the background and hands the result to every index."""
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+
+    async def seed(self, indexes: list[SeededIndex]) -> int:
+        """
+        Read the saved registrations once and rebuild each index from them.
+
+        Returns:
+            int: Number of registrations read
+        """
+        registrations = await sheets_executor.run(read_registrations)
+        for index in indexes:
+            index.rebuild(registrations)
+        return len(registrations)
+
+    async def _run(self, indexes: list[SeededIndex]):
+        try:
+            count = await self.seed(indexes)
+            logger.info("Seeded %s index(es) from %s saved registration(s)", len(indexes), count)
+        except Exception as e:
+            logger.error("Failed to seed registration indexes: %s", e)
+
+    def start(self, indexes: list[SeededIndex]):
+        """Seed in the background; the indexes only miss older registrations until it finishes."""
+        if self._task and not self._task.done():
+            return
+        self._task = asyncio.create_task(self._run(indexes))
+
+    async def stop(self):
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+
+# Global instance
+registration_seeder = RegistrationSeeder()
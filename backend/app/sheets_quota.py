@@ -0,0 +1,220 @@
+"""
+Quota governor and circuit breaker for Google Sheets calls.
+
+Google Sheets allows a fixed number of read and of write requests per
+minute per service account. Every Sheets call takes a token from the
+matching bucket first, waiting up to SHEETS_QUOTA_MAX_WAIT_SECONDS when the
+bucket is empty, so bursts are smoothed out here instead of turning into
+429s. After SHEETS_BREAKER_THRESHOLD consecutive 429/5xx responses the
+breaker opens and calls fail fast for SHEETS_BREAKER_RESET_SECONDS; then a
+single trial call decides whether it closes again.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Optional
+from .config import settings
+from .metrics import SHEETS_BREAKER_OPEN, SHEETS_CALLS, SHEETS_QUOTA_WAIT_SECONDS
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+READ, WRITE = "read", "write"
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class SheetsUnavailableError(Exception):
+    """Raised without calling Google when the breaker is open or the quota wait would be too long."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def is_overload_error(error: Exception) -> bool:
+    """True for 429 and 5xx API errors (quota exhausted or Google unavailable)."""
+    response = getattr(error, "response", None)
+    code = getattr(response, "status_code", None)
+    return code is not None and (code == 429 or code >= 500)
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at `rate_per_minute`."""
+
+    def __init__(self, rate_per_minute: float, burst: int):
+        self.rate = max(rate_per_minute, 0.001) / 60
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, max_wait: float) -> tuple[bool, float]:
+        """
+        Take a token, possibly from the future.
+
+        Args:
+            max_wait: Longest the caller is willing to wait for it
+
+        Returns:
+            tuple: (True if the token was taken, seconds until it can be used)
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            wait = max(0.0, (1 - self.tokens) / self.rate)
+            if wait > max_wait:
+                return False, wait
+            self.tokens -= 1
+            return True, wait
+
+    def available(self) -> float:
+        with self._lock:
+            self._refill(time.monotonic())
+            return self.tokens
+
+
+class CircuitBreaker:
+    """Opens after `threshold` consecutive overload errors; lets one trial call through after `reset_seconds`."""
+
+    def __init__(self, threshold: int, reset_seconds: float):
+        self.threshold = max(1, threshold)
+        self.reset_seconds = reset_seconds
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trips = 0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def retry_after(self) -> float:
+        return max(0.0, self.opened_at + self.reset_seconds - time.monotonic())
+
+    def allow(self) -> bool:
+        """Whether a call may go out now (moves open -> half-open once the reset time has passed)."""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and self.retry_after() > 0:
+                return False
+            if self._trial_in_flight:
+                return False
+            self.state = HALF_OPEN
+            self._trial_in_flight = True
+            return True
+
+    def release_trial(self):
+        """Give the half-open trial back when it was granted but the call never went out."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_success(self):
+        with self._lock:
+            if self.state != CLOSED:
+                logger.info("Google Sheets circuit breaker closed")
+            self.state = CLOSED
+            self.failures = 0
+            self._trial_in_flight = False
+        SHEETS_BREAKER_OPEN.set(0)
+
+    def record_failure(self, overload: bool):
+        """Count a failed call; only 429/5xx responses can open the breaker."""
+        with self._lock:
+            self._trial_in_flight = False
+            if not overload:
+                if self.state == HALF_OPEN:
+                    # The trial reached Google - it isn't overloaded
+                    self.state = CLOSED
+                self.failures = 0
+                return
+            self.failures += 1
+            if self.state == HALF_OPEN or self.failures >= self.threshold:
+                if self.state != OPEN:
+                    self.trips += 1
+                    logger.warning(
+                        "Google Sheets circuit breaker opened after %s consecutive overload error(s); "
+                        "pausing calls for %.0fs", self.failures, self.reset_seconds
+                    )
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+        if self.state == OPEN:
+            SHEETS_BREAKER_OPEN.set(1)
+
+
+class SheetsGovernor:
+    """Routes every Google Sheets call through the quota buckets and the circuit breaker."""
+
+    def __init__(self):
+        # Each worker process gets its share of the project-wide quota
+        workers = max(1, settings.sheets_quota_workers or settings.web_concurrency)
+        self.buckets = {
+            READ: TokenBucket(settings.sheets_read_quota_per_minute / workers, settings.sheets_quota_burst),
+            WRITE: TokenBucket(settings.sheets_write_quota_per_minute / workers, settings.sheets_quota_burst),
+        }
+        self.breaker = CircuitBreaker(settings.sheets_breaker_threshold, settings.sheets_breaker_reset_seconds)
+
+    def call(self, kind: str, fn: Callable, *args, max_wait: Optional[float] = None, **kwargs) -> Any:
+        """
+        Make one Google Sheets API call (blocking).
+
+        Args:
+            kind: READ or WRITE (which quota the call counts against)
+            fn: gspread method to call
+            max_wait: Longest to wait for quota (default SHEETS_QUOTA_MAX_WAIT_SECONDS; 0 = don't wait)
+            *args, **kwargs: Arguments passed to fn
+
+        Raises:
+            SheetsUnavailableError: If the breaker is open or quota isn't available in time
+            Exception: Whatever fn raises
+        """
+        if not self.breaker.allow():
+            SHEETS_CALLS.labels(kind, "rejected").inc()
+            raise SheetsUnavailableError(
+                "Google Sheets is overloaded (circuit breaker open)", self.breaker.retry_after()
+            )
+
+        if max_wait is None:
+            max_wait = settings.sheets_quota_max_wait_seconds
+        granted, wait = self.buckets[kind].reserve(max_wait)
+        if not granted:
+            self.breaker.release_trial()
+            SHEETS_CALLS.labels(kind, "rejected").inc()
+            raise SheetsUnavailableError(f"Google Sheets {kind} quota exhausted", wait)
+        if wait:
+            SHEETS_QUOTA_WAIT_SECONDS.labels(kind).observe(wait)
+            time.sleep(wait)
+
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            overload = is_overload_error(e)
+            self.breaker.record_failure(overload)
+            SHEETS_CALLS.labels(kind, "overloaded" if overload else "error").inc()
+            raise
+        self.breaker.record_success()
+        SHEETS_CALLS.labels(kind, "ok").inc()
+        return result
+
+    def quota_pressure(self) -> bool:
+        """True while the breaker isn't closed or the write bucket is empty."""
+        return self.breaker.state != CLOSED or self.buckets[WRITE].available() < 1
+
+    def status(self) -> dict:
+        """Breaker state and remaining tokens, for /api/health."""
+        return {
+            "breaker": self.breaker.state,
+            "consecutive_failures": self.breaker.failures,
+            "trips": self.breaker.trips,
+            "retry_after": round(self.breaker.retry_after(), 1) if self.breaker.state == OPEN else 0,
+            "read_tokens": round(self.buckets[READ].available(), 2),
+            "write_tokens": round(self.buckets[WRITE].available(), 2),
+        }
+
+
+# Global instance
+sheets_governor = SheetsGovernor()
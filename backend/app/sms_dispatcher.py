@@ -0,0 +1,260 @@
+"""
+Background SMS dispatch queue.
+Confirmation messages are queued by the API and delivered by worker threads with retries.
+"""
+
+import logging
+import queue
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from .config import settings
+from .logging_setup import correlation_id
+from .batching import QueueFullError
+from .phone import INVALID_PHONE_MESSAGE, local_numbers
+from .sms_service import sms_service, SMSTransientError
+from .metrics import record_outcome
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SMSJob:
+    """A confirmation SMS waiting to be delivered."""
+    phone: str
+    name: str
+    ticket: str = ""
+    attempts: int = 0
+    last_error: str = ""
+    created_at: str = field(default_factory=lambda: datetime.now().isoformat(timespec='seconds'))
+    request_id: str = field(default_factory=correlation_id.get)  # Correlation ID of the registration
+
+
+class SMSDispatcher:
+    """
+    Delivers SMS jobs from a bounded in-process queue using a pool of worker threads.
+
+    With SMS_COALESCE_ENABLED, a worker waits up to SMS_COALESCE_WINDOW_MS
+    for more jobs after taking one, and jobs with an identical message body
+    are sent as one mNotify call with up to SMS_COALESCE_MAX_RECIPIENTS
+    numbers in `recipient`. Bodies are only identical with
+    SMS_PERSONALIZE_CONFIRMATION and SMS_INCLUDE_TICKET off (both default
+    to on); otherwise coalescing is skipped.
+
+    Timeouts, connection errors, 429 and 5xx responses are retried with
+    jittered exponential backoff. Jobs that still fail after
+    SMS_MAX_ATTEMPTS, or that mNotify rejects outright, are moved to a
+    dead-letter list for manual follow-up.
+    """
+
+    def __init__(self):
+        """Set up the queue; worker threads start on first use."""
+        self.workers = max(1, settings.sms_dispatch_workers)
+        self.max_attempts = max(1, settings.sms_max_attempts)
+        self.max_pending = settings.sms_queue_size
+        self._queue: queue.Queue = queue.Queue(maxsize=settings.sms_queue_size)
+        self._threads: list[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._dead_letters: deque = deque(maxlen=1000)
+        self.sent = 0
+        self.calls = 0
+
+    @staticmethod
+    def coalescing_blockers() -> list[str]:
+        """Settings that make every confirmation unique, so coalescing can't merge any."""
+        blockers = []
+        if settings.sms_personalize_confirmation:
+            blockers.append("SMS_PERSONALIZE_CONFIRMATION")
+        if settings.sms_include_ticket:
+            blockers.append("SMS_INCLUDE_TICKET")
+        return blockers
+
+    def start(self):
+        """Start the worker threads if they are not already running."""
+        with self._lock:
+            if any(thread.is_alive() for thread in self._threads):
+                return
+            if settings.sms_coalesce_enabled and self.coalescing_blockers():
+                logger.warning(
+                    "SMS_COALESCE_ENABLED is ignored while %s is on (every confirmation is unique); "
+                    "turn it off to coalesce confirmations",
+                    " and ".join(self.coalescing_blockers())
+                )
+            self._stopping.clear()
+            self._threads = [
+                threading.Thread(target=self._run, name=f"sms-dispatch-{i}", daemon=True)
+                for i in range(self.workers)
+            ]
+            for thread in self._threads:
+                thread.start()
+            logger.info("SMS dispatcher started with %s worker(s)", self.workers)
+
+    def enqueue(self, phone: str, name: str, ticket: str = ""):
+        """
+        Queue a confirmation SMS for delivery.
+
+        Args:
+            phone: Attendee's phone number
+            name: Attendee's full name
+            ticket: Attendee's ticket ID
+
+        Raises:
+            QueueFullError: If the queue is at capacity
+        """
+        if self._stopping.is_set():
+            raise QueueFullError("SMS dispatcher is shutting down")
+
+        self.start()
+        try:
+            self._queue.put_nowait(SMSJob(phone=phone, name=name, ticket=ticket))
+        except queue.Full:
+            raise QueueFullError(f"SMS queue is full ({settings.sms_queue_size} pending)")
+
+    def depth(self) -> int:
+        """Number of SMS jobs waiting for a worker."""
+        return self._queue.qsize()
+
+    def dead_letters(self) -> list[dict]:
+        """Permanently failed jobs, oldest first."""
+        return [vars(job).copy() for job in self._dead_letters]
+
+    def backoff_delay(self, attempt: int) -> float:
+        """Full-jitter exponential backoff for the given attempt number (1-based)."""
+        cap = min(
+            settings.sms_retry_max_delay_seconds,
+            settings.sms_retry_base_delay_seconds * (2 ** (attempt - 1)),
+        )
+        return random.uniform(0, cap)
+
+    def _run(self):
+        """Worker loop: take jobs and deliver them until stopped and drained."""
+        while True:
+            try:
+                jobs = [self._queue.get(timeout=0.5)]
+            except queue.Empty:
+                if self._stopping.is_set():
+                    return
+                continue
+            # Don't hold messages back for a window in which none could be merged
+            if settings.sms_coalesce_enabled and not self.coalescing_blockers():
+                jobs.extend(self._collect_more())
+            try:
+                for message, group in self._group_by_message(jobs).items():
+                    # Log under the registration's request ID (none for a coalesced group)
+                    correlation_id.set(group[0].request_id if len(group) == 1 else "-")
+                    self._deliver(group, message)
+            finally:
+                for _ in jobs:
+                    self._queue.task_done()
+
+    def _collect_more(self) -> list[SMSJob]:
+        """Gather further queued jobs for up to the coalescing window."""
+        jobs = []
+        deadline = time.monotonic() + settings.sms_coalesce_window_ms / 1000
+        while len(jobs) + 1 < settings.sms_coalesce_max_recipients:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                jobs.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return jobs
+
+    def _group_by_message(self, jobs: list[SMSJob]) -> dict[str, list[SMSJob]]:
+        """Group jobs whose rendered message body is identical."""
+        groups: dict[str, list[SMSJob]] = {}
+        for job in jobs:
+            message = sms_service.build_confirmation_message(job.name, job.ticket)
+            groups.setdefault(message, []).append(job)
+        return groups
+
+    def _deliver(self, jobs: list[SMSJob], message: str):
+        """
+        Send one message to every job's number in a single mNotify call,
+        retrying transient failures with backoff.
+        """
+        if not sms_service.api_key:
+            self._dead_letter(jobs, "SMS service not initialized. Check mNotify API key.")
+            return
+
+        numbers = local_numbers(job.phone for job in jobs)
+        invalid = [job for job, number in zip(jobs, numbers) if number is None]
+        if invalid:
+            self._dead_letter(invalid, INVALID_PHONE_MESSAGE)
+            jobs = [job for job, number in zip(jobs, numbers) if number is not None]
+            if not jobs:
+                return
+        recipients = [number for number in numbers if number is not None]
+        attempts = 0
+        last_error = ""
+
+        while attempts < self.max_attempts:
+            attempts += 1
+            for job in jobs:
+                job.attempts = attempts
+            try:
+                response_data = sms_service.post_sms(recipients, message)
+            except SMSTransientError as e:
+                last_error = str(e)
+                if attempts >= self.max_attempts:
+                    break
+                delay = self.backoff_delay(attempts)
+                logger.warning("SMS attempt %s failed (%s), retrying in %.1fs", attempts, last_error, delay)
+                # Wake early on shutdown so pending retries are not lost silently
+                if self._stopping.wait(delay):
+                    break
+                continue
+            except Exception as e:
+                last_error = f"Failed to send SMS: {str(e)}"
+                break
+
+            if not sms_service.is_success(response_data):
+                # The provider rejected the message - retrying won't help
+                last_error = f"mNotify error: {response_data.get('message')}"
+                break
+
+            # Map the provider's per-number result back to each job
+            accepted = sms_service.accepted_recipients(response_data, recipients)
+            rejected = [job for job, number in zip(jobs, recipients) if number not in accepted]
+            with self._lock:
+                self.sent += len(jobs) - len(rejected)
+                self.calls += 1
+            logger.info("SMS sent successfully via mNotify to %s recipient(s)", len(jobs) - len(rejected))
+            if rejected:
+                self._dead_letter(rejected, "mNotify did not accept this number")
+            return
+
+        self._dead_letter(jobs, last_error)
+
+    def _dead_letter(self, jobs: list[SMSJob], error: str):
+        """Record permanently failed jobs."""
+        for job in jobs:
+            job.last_error = error
+            self._dead_letters.append(job)
+            record_outcome("sms_failed")
+        logger.error("%s SMS moved to dead-letter list after %s attempt(s): %s", len(jobs), jobs[0].attempts, error)
+
+    def stop(self, timeout: float = 30.0):
+        """
+        Stop accepting jobs and give the workers time to drain the queue.
+
+        Args:
+            timeout: Maximum number of seconds to wait per worker
+        """
+        self._stopping.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        remaining = self.depth()
+        if remaining:
+            logger.warning("SMS dispatcher stopped with %s undelivered message(s)", remaining)
+        logger.info("SMS dispatcher stopped")
+
+
+# Global instance
+sms_dispatcher = SMSDispatcher()
@@ -3,15 +3,28 @@ SMS service integration using mNotify API.
 Sends confirmation messages to registered attendees.
 """
 
-import requests
 import logging
-import re
+from typing import TYPE_CHECKING
 from .config import settings
+from .phone import normalize_phone, parse_many
+from .tickets import format_ticket
+
+if TYPE_CHECKING:
+    # requests is imported on first use so it stays off the cold-start path
+    import requests
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
 
+class SMSTransientError(Exception):
+    """Raised for SMS failures that are worth retrying (timeouts, 429, 5xx)."""
+
+
+class SMSDeliveryUnknownError(SMSTransientError):
+    """Raised when mNotify may have accepted the message before the call failed (read timeout)."""
+
+
 class SMSService:
     """
     Service class for sending SMS messages via mNotify API.
@@ -22,12 +35,15 @@ class SMSService:
         """Initialize mNotify service with API key from settings."""
         try:
             self.api_key = settings.mnotify_api_key
-            self.endpoint = "https://api.mnotify.com/api/sms/quick"
+            self.endpoint = f"{settings.mnotify_api_url}/sms/quick"
+            self.balance_endpoint = f"{settings.mnotify_api_url}/balance/sms"
             self.sender_id = "IYC-C 2025"  # mNotify sender ID (max 11 chars)
+            self._session = None
             logger.info("mNotify SMS service initialized successfully")
         except Exception as e:
-            logger.error(f"Failed to initialize mNotify service: {str(e)}")
+            logger.error("Failed to initialize mNotify service: %s", e)
             self.api_key = None
+            self._session = None
     
     def format_phone_number(self, phone: str) -> str:
         """
@@ -39,32 +55,156 @@ class SMSService:
             
         Returns:
             str: Phone number in 0XXXXXXXXX format
+            
+        Raises:
+            InvalidPhoneNumber: If the value is not a Ghana number
+        """
+        return normalize_phone(phone, check_network=False).local
+    
+    @property
+    def session(self) -> "requests.Session":
+        """
+        Shared HTTP session with a keep-alive connection pool to mNotify.
+        Created on first use so every send reuses the same TCP/TLS connections.
+        """
+        if self._session is None:
+            import requests
+            
+            session = requests.Session()
+            pool_size = settings.sms_dispatch_workers + settings.sms_max_concurrency
+            adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            self._session = session
+        return self._session
+    
+    def build_confirmation_message(self, name: str, ticket: str = "") -> str:
+        """
+        Render the confirmation SMS for an attendee.
+        
+        Args:
+            name: Attendee's full name
+            ticket: Attendee's ticket ID (included when SMS_INCLUDE_TICKET is set)
+            
+        Returns:
+            str: Message body
         """
-        # Remove spaces, dashes, and other characters
-        cleaned = re.sub(r'[\s\-\(\)]', '', phone)
-        
-        # Convert to local Ghana format (0XXXXXXXXX)
-        if cleaned.startswith('+233'):
-            # +233241234567 -> 0241234567
-            return f"0{cleaned[4:]}"
-        elif cleaned.startswith('233'):
-            # 233241234567 -> 0241234567
-            return f"0{cleaned[3:]}"
-        elif cleaned.startswith('0'):
-            # Already in correct format
-            return cleaned
+        if not settings.sms_personalize_confirmation:
+            # Identical body for everyone so confirmations can be coalesced
+            greeting = "Hello!"
         else:
-            # Unknown format, add 0 prefix
-            logger.warning("Unknown phone format received, normalizing...")
-            return f"0{cleaned}"
+            # Get first name for personalization
+            first_name = name.split()[0] if name else "Guest"
+            greeting = f"Hello {first_name.upper()}!"
+        
+        message = (
+            f"{greeting}\n\n"
+            f"Thank you for registering for {settings.conference_name}! "
+            f"Your registration is confirmed.\n\n"
+        )
+        if ticket and settings.sms_include_ticket:
+            message += f"Your ticket: {format_ticket(ticket)}\nShow it at the entrance.\n\n"
+        return message
+    
+    def post_sms(self, recipients: list[str], message: str) -> dict:
+        """
+        Send one message to a list of numbers with a single mNotify call.
+        
+        Args:
+            recipients: Phone numbers already in 0XXXXXXXXX format
+            message: Message body
+            
+        Returns:
+            dict: Parsed mNotify response
+            
+        Raises:
+            SMSDeliveryUnknownError: If the response timed out after the request was sent
+            SMSTransientError: On connect timeouts, connection errors, 429 and 5xx responses (safe to retry)
+            requests.exceptions.RequestException: On other network errors
+        """
+        import requests
+        
+        # Prepare mNotify API request
+        url = f"{self.endpoint}?key={self.api_key}"
+        data = {
+            'recipient': recipients,
+            'sender': self.sender_id,
+            'message': message,
+            'is_schedule': False,
+            'schedule_date': '',
+        }
+        
+        try:
+            response = self.session.post(url, json=data, timeout=settings.sms_timeout_seconds)
+        except requests.exceptions.ReadTimeout as e:
+            raise SMSDeliveryUnknownError(f"No response from mNotify: {str(e)}")
+        except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
+            raise SMSTransientError(f"Network error: {str(e)}")
+        
+        if response.status_code == 429 or response.status_code >= 500:
+            raise SMSTransientError(f"mNotify returned HTTP {response.status_code}")
+        
+        response_data = response.json()
+        logger.debug("mNotify response: %s", response_data)
+        return response_data
+    
+    def ping(self):
+        """
+        Check that the mNotify API is reachable (uses the free balance endpoint).
+        
+        Raises:
+            SMSTransientError: If mNotify is unreachable or returns a 5xx
+        """
+        import requests
+        
+        try:
+            response = self.session.get(
+                f"{self.balance_endpoint}?key={self.api_key}",
+                timeout=settings.sms_timeout_seconds
+            )
+        except requests.exceptions.RequestException as e:
+            raise SMSTransientError(f"Network error: {str(e)}")
+        if response.status_code >= 500:
+            raise SMSTransientError(f"mNotify returned HTTP {response.status_code}")
+    
+    def is_success(self, response_data: dict) -> bool:
+        """Check whether an mNotify response reports success."""
+        return response_data.get('code') == '2000' or response_data.get('status') == 'success'
+    
+    def accepted_recipients(self, response_data: dict, recipients: list[str]) -> set[str]:
+        """
+        Work out which numbers of a multi-recipient send mNotify accepted.
+        
+        mNotify lists the delivered numbers in summary.numbers_sent; when the
+        summary is missing, a successful response counts for every recipient.
+        
+        Args:
+            response_data: Parsed mNotify response
+            recipients: Numbers that were sent, in 0XXXXXXXXX format
+            
+        Returns:
+            set: The subset of recipients that were accepted
+        """
+        if not self.is_success(response_data):
+            return set()
+        
+        summary = response_data.get('summary')
+        numbers_sent = summary.get('numbers_sent') if isinstance(summary, dict) else None
+        if not isinstance(numbers_sent, list):
+            return set(recipients)
+        
+        # Compare parsed numbers so 0XX, 233XX and +233XX all match
+        sent = {phone.national for phone in parse_many(str(number) for number in numbers_sent) if phone}
+        return {number for number, phone in zip(recipients, parse_many(recipients)) if phone and phone.national in sent}
     
-    def send_confirmation_sms(self, phone: str, name: str) -> tuple[bool, str]:
+    def send_confirmation_sms(self, phone: str, name: str, ticket: str = "") -> tuple[bool, str]:
         """
         Send a confirmation SMS to the registered attendee via mNotify.
         
         Args:
             phone: Attendee's phone number
             name: Attendee's full name
+            ticket: Attendee's ticket ID
             
         Returns:
             tuple: (success: bool, message: str)
@@ -74,57 +214,37 @@ class SMSService:
             logger.error(error_msg)
             return False, error_msg
         
+        import requests
+        
         try:
             # Format phone number for Ghana
             to_number = self.format_phone_number(phone)
             
-            # Get first name for personalization
-            first_name = name.split()[0] if name else "Guest"
-            
-            # Create SMS message
-            message_body = (
-                f"Hello {first_name.upper()}!\n\n"
-                f"Thank you for registering for {settings.conference_name}! "
-                f"Your registration is confirmed.\n\n"
-            )
-            
-            # Prepare mNotify API request
-            url = f"{self.endpoint}?key={self.api_key}"
-            data = {
-                'recipient': [to_number],
-                'sender': self.sender_id,
-                'message': message_body,
-                'is_schedule': False,
-                'schedule_date': '',
-            }
-            
             # Send SMS via mNotify API
-            response = requests.post(url, json=data)
-            response_data = response.json()
-            print(response_data)
+            response_data = self.post_sms([to_number], self.build_confirmation_message(name, ticket))
             
             # Check response status
-            if response_data.get('code') == '2000' or response_data.get('status') == 'success':
+            if self.is_success(response_data):
                 logger.info("SMS sent successfully via mNotify")
                 return True, f"SMS sent successfully to {to_number}"
             else:
                 error_msg = response_data.get('message', response_data.get('message'))
-                logger.error(f"mNotify API error: {error_msg}")
+                logger.error("mNotify API error: %s", error_msg)
                 return False, f"mNotify error: {error_msg}"
             
-        except requests.exceptions.Timeout:
-            error_msg = "Request timeout - mNotify API did not respond in time"
-            logger.error(f"SMS request timeout: {error_msg}")
+        except SMSTransientError as e:
+            error_msg = str(e)
+            logger.error("SMS transient error: %s", error_msg)
             return False, error_msg
             
         except requests.exceptions.RequestException as e:
             error_msg = f"Network error: {str(e)}"
-            logger.error(f"SMS network error: {error_msg}")
+            logger.error("SMS network error: %s", error_msg)
             return False, error_msg
             
         except Exception as e:
             error_msg = f"Failed to send SMS: {str(e)}"
-            logger.error(f"SMS unexpected error: {error_msg}")
+            logger.error("SMS unexpected error: %s", error_msg)
             return False, error_msg
 
 
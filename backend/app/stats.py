@@ -0,0 +1,342 @@
+"""
+Live registration statistics.
+
+Counts by church, city, institution and first-time attendance are kept in
+a SQLite file shared by all workers and bumped as each registration is
+accepted, so /api/stats never reads the sheet and every worker reports the
+same figures. They are seeded at startup and periodically rebuilt from the
+sheet, which also corrects any count missed by a failed update. Only one
+worker at a time (holding a lease in the same file) runs that periodic
+rebuild, and registrations counted while the sheet was being read are kept.
+"""
+
+import asyncio
+import hashlib
+import html
+import json
+import logging
+import os
+import re
+import sqlite3
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Optional
+from .config import settings
+from .seeding import registration_seeder
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+NOT_SPECIFIED = "Not specified"
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+class Breakdown:
+    """Counts per value, grouping spellings that only differ in case or spacing."""
+
+    def __init__(self):
+        self.counts: Counter = Counter()
+        self.labels: dict[str, str] = {}  # group key -> first spelling seen
+
+    def add(self, value: str):
+        label = _WHITESPACE.sub(" ", html.unescape(value or "").strip()) or NOT_SPECIFIED
+        key = label.casefold()
+        self.labels.setdefault(key, label)
+        self.counts[key] += 1
+
+    def as_dict(self) -> dict[str, int]:
+        """Counts keyed by label, largest first."""
+        return {self.labels[key]: count for key, count in self.counts.most_common()}
+
+
+STATS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS stats_counts (
+    dimension TEXT NOT NULL,
+    key TEXT NOT NULL,
+    label TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (dimension, key)
+);
+CREATE TABLE IF NOT EXISTS stats_meta (
+    name TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS stats_pending (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ticket TEXT,
+    counted_at REAL NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS stats_lease (
+    name TEXT PRIMARY KEY,
+    owner TEXT,
+    lease_until REAL NOT NULL DEFAULT 0
+);
+"""
+
+# A counted registration not found by a sheet read is still added on top of
+# it for this long (the read may have started before it was saved); after
+# that it is assumed to have been removed from the sheet
+PENDING_GRACE_SECONDS = 600.0
+
+# Response field -> registration field counted in it
+DIMENSIONS = {
+    'by_church': 'church',
+    'by_city': 'city',
+    'by_institution': 'institution',
+    'first_time_attendee': 'first_time_attendee',
+}
+
+
+class RegistrationStats:
+    """
+    Aggregates over all accepted registrations, shared by every worker.
+
+    The counts live in a SQLite file, so /api/stats gives the same totals
+    (and ETag) whichever worker answers it. add_many() bumps them with one
+    small transaction; every change also bumps a generation number, and the
+    rendered snapshot and its ETag are cached until the generation moves, so
+    polling dashboards cost one indexed read. File access runs on one
+    background thread per worker.
+
+    Each counted registration is also remembered until a sheet read finds
+    it, so a rebuild from a read that started before it was saved (or that
+    ran while it sat in the write buffer) adds it back instead of losing it.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Location of the SQLite database file
+        """
+        self.path = path
+        self.owner = f"{os.getpid()}-{id(self)}"
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="stats")
+        self._conn: Optional[sqlite3.Connection] = None
+        self._snapshot: Optional[tuple[str, dict, str]] = None  # (generation, body, etag)
+        self._task: Optional[asyncio.Task] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        """The stats thread's connection, creating the file and tables on first use."""
+        if self._conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")  # Rebuilt from the sheet anyway
+            conn.executescript(STATS_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def _count(registrations: list[dict]) -> dict[str, Breakdown]:
+        breakdowns = {dimension: Breakdown() for dimension in DIMENSIONS}
+        for registration in registrations:
+            for dimension, field in DIMENSIONS.items():
+                breakdowns[dimension].add(registration.get(field, ''))
+        return breakdowns
+
+    @staticmethod
+    def _rows(breakdowns: dict[str, Breakdown]) -> list[tuple]:
+        return [
+            (dimension, key, breakdown.labels[key], count)
+            for dimension, breakdown in breakdowns.items()
+            for key, count in breakdown.counts.items()
+        ]
+
+    def _add(self, registrations: list[dict]):
+        """Count accepted registrations in one transaction (blocking; stats thread only)."""
+        conn = self._connection()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._apply(conn, self._rows(self._count(registrations)), len(registrations), replace=False)
+            conn.executemany(
+                "INSERT INTO stats_pending (ticket, counted_at, data) VALUES (?, ?, ?)",
+                [
+                    (registration.get('ticket') or None, now,
+                     json.dumps({field: registration.get(field, '') for field in DIMENSIONS.values()}))
+                    for registration in registrations
+                ],
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _replace(self, registrations: list[dict]):
+        """
+        Substitute counts computed from a sheet read, plus registrations
+        counted since that the read didn't include (blocking; stats thread only).
+        """
+        conn = self._connection()
+        saved = {registration['ticket'] for registration in registrations if registration.get('ticket')}
+        stale_before = time.time() - PENDING_GRACE_SECONDS
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            settled, missing = [], []
+            for pending_id, ticket, counted_at, data in conn.execute(
+                "SELECT id, ticket, counted_at, data FROM stats_pending"
+            ).fetchall():
+                if ticket in saved or counted_at < stale_before:
+                    settled.append((pending_id,))
+                else:
+                    missing.append(json.loads(data))
+            conn.executemany("DELETE FROM stats_pending WHERE id = ?", settled)
+            counted = registrations + missing
+            self._apply(conn, self._rows(self._count(counted)), len(counted), replace=True)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    @staticmethod
+    def _apply(conn: sqlite3.Connection, rows: list[tuple], total: int, replace: bool):
+        """Add (or with replace, substitute) counts inside the caller's transaction."""
+        if replace:
+            conn.execute("DELETE FROM stats_counts")
+            conn.execute(
+                "INSERT OR REPLACE INTO stats_meta (name, value) VALUES ('reconciled_at', ?)",
+                (datetime.now().isoformat(timespec='seconds'),),
+            )
+        conn.executemany(
+            "INSERT INTO stats_counts (dimension, key, label, count) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (dimension, key) DO UPDATE SET count = count + excluded.count",
+            rows,
+        )
+        if replace:
+            conn.execute("INSERT OR REPLACE INTO stats_meta (name, value) VALUES ('total', ?)", (total,))
+        else:
+            conn.execute(
+                "INSERT INTO stats_meta (name, value) VALUES ('total', ?) "
+                "ON CONFLICT (name) DO UPDATE SET value = CAST(value AS INTEGER) + excluded.value",
+                (total,),
+            )
+        conn.execute(
+            "INSERT INTO stats_meta (name, value) VALUES ('generation', 1) "
+            "ON CONFLICT (name) DO UPDATE SET value = CAST(value AS INTEGER) + 1"
+        )
+
+    def _acquire_lease(self) -> bool:
+        """
+        Take (or renew) the periodic rebuild lease for this worker (blocking; stats thread only).
+
+        Returns:
+            bool: True if this worker should run the rebuild
+        """
+        conn = self._connection()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT owner, lease_until FROM stats_lease WHERE name = 'reconcile'").fetchone()
+            if row is not None and row[0] not in (None, self.owner) and row[1] > now:
+                conn.execute("COMMIT")
+                return False
+            # Outlasts one interval, so the holder keeps it as long as it is running
+            conn.execute(
+                "INSERT OR REPLACE INTO stats_lease (name, owner, lease_until) VALUES ('reconcile', ?, ?)",
+                (self.owner, now + settings.stats_reconcile_interval_seconds * 2),
+            )
+            conn.execute("COMMIT")
+            return True
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _release_lease(self):
+        self._connection().execute(
+            "UPDATE stats_lease SET owner = NULL, lease_until = 0 WHERE name = 'reconcile' AND owner = ?",
+            (self.owner,),
+        )
+
+    def _read(self) -> tuple[dict, str]:
+        """The current snapshot, re-read only if the counts changed (blocking; stats thread only)."""
+        conn = self._connection()
+        row = conn.execute("SELECT value FROM stats_meta WHERE name = 'generation'").fetchone()
+        generation = row[0] if row else "0"
+        if self._snapshot is not None and self._snapshot[0] == generation:
+            return self._snapshot[1], self._snapshot[2]
+        conn.execute("BEGIN")
+        try:
+            meta = dict(conn.execute("SELECT name, value FROM stats_meta").fetchall())
+            counts = conn.execute(
+                "SELECT dimension, label, count FROM stats_counts ORDER BY count DESC, rowid"
+            ).fetchall()
+        finally:
+            conn.execute("COMMIT")
+        body = {'total': int(meta.get('total', 0))}
+        body.update({dimension: {} for dimension in DIMENSIONS})
+        for dimension, label, count in counts:
+            if dimension in body:
+                body[dimension][label] = count
+        body['reconciled_at'] = meta.get('reconciled_at')
+        digest = hashlib.sha1(json.dumps(body, sort_keys=True).encode()).hexdigest()[:16]
+        self._snapshot = (meta.get('generation', generation), body, f'"{digest}"')
+        return body, self._snapshot[2]
+
+    async def _run(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    async def add_many(self, registrations: list[dict]):
+        """Count accepted registrations (failures are only logged; the next rebuild corrects them)."""
+        if not registrations:
+            return
+        try:
+            await self._run(self._add, registrations)
+        except Exception as e:
+            logger.error("Failed to update registration statistics: %s", e)
+
+    def rebuild(self, registrations: list[dict]):
+        """Replace the counts with ones computed from the saved registrations (written in the background)."""
+        future = self._executor.submit(self._replace, registrations)
+        future.add_done_callback(self._log_rebuild)
+
+    @staticmethod
+    def _log_rebuild(future):
+        if future.exception() is not None:
+            logger.error("Failed to rebuild registration statistics: %s", future.exception())
+        else:
+            logger.info("Registration statistics rebuilt from the sheet")
+
+    async def snapshot(self) -> tuple[dict, str]:
+        """
+        Returns:
+            tuple: (statistics body, strong ETag of that body)
+        """
+        return await self._run(self._read)
+
+    async def _reconcile_loop(self):
+        while True:
+            await asyncio.sleep(settings.stats_reconcile_interval_seconds)
+            try:
+                # One worker reads the sheet for everyone; the others skip their turn
+                if await self._run(self._acquire_lease):
+                    await registration_seeder.seed([self])
+            except Exception as e:
+                logger.error("Failed to reconcile registration statistics: %s", e)
+
+    def start(self):
+        """Start periodic reconciliation against the sheet (run by one worker at a time)."""
+        if self._task and not self._task.done():
+            return
+        self._task = asyncio.create_task(self._reconcile_loop())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        # Let another worker take the rebuild over straight away
+        try:
+            await self._run(self._release_lease)
+        except Exception as e:
+            logger.warning("Failed to release the statistics rebuild lease: %s", e)
+        self._executor.shutdown(wait=True)
+
+
+# Global instance
+registration_stats = RegistrationStats(settings.stats_db_path)
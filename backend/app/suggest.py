@@ -0,0 +1,179 @@
+"""
+Typeahead suggestions for the free-text church, institution and city fields.
+
+Each field keeps a sorted list of (word-start, value) entries, so a prefix
+lookup is a binary search plus a short scan: "pent" finds "The Church of
+Pentecost" as well as "Pentecost University". Values come from a curated
+seed list and from saved registrations, ranked by how many people used
+them, and new registrations are added as they are accepted. Answers are
+cached until the field's values next change.
+"""
+
+import heapq
+import html
+import json
+import logging
+import re
+from bisect import bisect_left, insort
+from typing import Optional
+from .config import settings
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+SUGGEST_FIELDS = ('church', 'institution', 'city')
+
+# Entries scanned per lookup; a one-letter prefix on a large index stops here
+MAX_SCAN = 2000
+
+# Answers kept per field until its values next change
+MAX_CACHED_QUERIES = 4096
+
+# Curated spellings offered before anyone has registered with them
+SEED_SUGGESTIONS = {
+    'church': [
+        "The Church of Pentecost", "Assemblies of God Ghana", "International Central Gospel Church (ICGC)",
+        "Lighthouse Chapel International", "Action Chapel International", "Royalhouse Chapel International",
+        "Perez Chapel International", "Christ Embassy", "Methodist Church Ghana", "Presbyterian Church of Ghana",
+        "Evangelical Presbyterian Church", "Global Evangelical Church", "Catholic Church", "Anglican Church",
+        "Baptist Church", "Seventh-day Adventist Church", "The Apostolic Church Ghana", "Christ Apostolic Church",
+        "Deeper Life Bible Church", "Winners Chapel", "Calvary Charismatic Centre", "Word Miracle Church International",
+    ],
+    'institution': [
+        "University of Ghana", "Kwame Nkrumah University of Science and Technology (KNUST)",
+        "University of Cape Coast", "University of Education, Winneba", "University for Development Studies",
+        "University of Mines and Technology", "University of Health and Allied Sciences",
+        "University of Professional Studies, Accra (UPSA)", "Ghana Institute of Management and Public Administration (GIMPA)",
+        "Ashesi University", "Central University", "Valley View University", "Pentecost University",
+        "Accra Technical University", "Kumasi Technical University", "Takoradi Technical University",
+        "Ghana Communication Technology University",
+    ],
+    'city': [
+        "Accra", "Kumasi", "Tema", "Kasoa", "Takoradi", "Cape Coast", "Winneba", "Apam", "Koforidua", "Tamale",
+        "Ho", "Sunyani", "Techiman", "Obuasi", "Nkawkaw", "Madina", "Ashaiman", "Teshie", "Bolgatanga", "Wa",
+    ],
+}
+
+_WHITESPACE = re.compile(r"\s+")
+_WORD_START = re.compile(r"\w+")
+
+
+def normalize_value(value: str) -> str:
+    """Display form of a saved value: unescaped, trimmed, single-spaced."""
+    return _WHITESPACE.sub(" ", html.unescape(value or "").strip())
+
+
+class FieldIndex:
+    """Values of one field with their use counts, searchable by the start of any word."""
+
+    def __init__(self):
+        self.counts: dict[str, int] = {}  # casefolded value -> registrations using it
+        self.labels: dict[str, str] = {}  # casefolded value -> first spelling seen
+        self.curated: set[str] = set()
+        self._entries: list[tuple[str, str]] = []  # (casefolded text from a word start, casefolded value)
+        self._cache: dict[tuple[str, int], list[str]] = {}
+
+    def _index(self, key: str):
+        for match in _WORD_START.finditer(key):
+            insort(self._entries, (key[match.start():], key))
+
+    def add(self, value: str, curated: bool = False):
+        label = normalize_value(value)
+        if not label:
+            return
+        self._cache.clear()
+        key = label.casefold()
+        if key not in self.labels:
+            self.labels[key] = label
+            self.counts[key] = 0
+            self._index(key)
+        if curated:
+            # Curated spelling wins over whatever was typed first
+            self.labels[key] = label
+            self.curated.add(key)
+        else:
+            self.counts[key] += 1
+
+    def _visible(self, key: str) -> bool:
+        return key in self.curated or self.counts[key] >= settings.suggest_min_count
+
+    def search(self, prefix: str, limit: int) -> list[str]:
+        """
+        Most used values with a word starting with `prefix` (all values when empty).
+
+        Returns:
+            list[str]: Up to `limit` values, most used first
+        """
+        prefix = normalize_value(prefix).casefold()
+        cached = self._cache.get((prefix, limit))
+        if cached is not None:
+            return cached
+
+        if prefix:
+            matches = set()
+            start = bisect_left(self._entries, (prefix,))
+            for i in range(start, min(start + MAX_SCAN, len(self._entries))):
+                text, key = self._entries[i]
+                if not text.startswith(prefix):
+                    break
+                matches.add(key)
+        else:
+            matches = self.counts.keys()
+        ranked = heapq.nsmallest(
+            limit,
+            (key for key in matches if self._visible(key)),
+            key=lambda key: (-self.counts[key], key)
+        )
+        result = [self.labels[key] for key in ranked]
+        if len(self._cache) >= MAX_CACHED_QUERIES:
+            self._cache.clear()
+        self._cache[(prefix, limit)] = result
+        return result
+
+
+def load_seed_file(path: str) -> dict[str, list[str]]:
+    """Read extra curated values ({"church": [...], "city": [...]}) from a JSON file."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return {field: [str(value) for value in data.get(field, [])] for field in SUGGEST_FIELDS}
+    except (OSError, ValueError, AttributeError) as e:
+        logger.error("Failed to load suggestion seed file %s: %s", path, e)
+        return {}
+
+
+class SuggestionIndex:
+    """Suggestion indexes for every supported field."""
+
+    def __init__(self):
+        self.fields = self._seeded_fields()
+
+    @staticmethod
+    def _seeded_fields() -> dict[str, FieldIndex]:
+        fields = {field: FieldIndex() for field in SUGGEST_FIELDS}
+        extra = load_seed_file(settings.suggest_seed_file) if settings.suggest_seed_file else {}
+        for field, index in fields.items():
+            for value in SEED_SUGGESTIONS[field] + extra.get(field, []):
+                index.add(value, curated=True)
+        return fields
+
+    def add(self, registration: dict):
+        """Count the values of one accepted registration."""
+        for field, index in self.fields.items():
+            index.add(registration.get(field, ''))
+
+    def rebuild(self, registrations: list[dict]):
+        """Replace the indexes with ones built from the saved registrations."""
+        fields = self._seeded_fields()
+        for registration in registrations:
+            for field, index in fields.items():
+                index.add(registration.get(field, ''))
+        self.fields = fields
+        logger.info("Suggestion index built from %s registration(s)", len(registrations))
+
+    def suggest(self, field: str, query: str, limit: Optional[int] = None) -> list[str]:
+        return self.fields[field].search(query, limit or settings.suggest_limit)
+
+
+# Global instance
+suggestion_index = SuggestionIndex()
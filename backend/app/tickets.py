@@ -0,0 +1,238 @@
+"""
+Signed ticket IDs and the door check-in index.
+
+A ticket is 5 random bytes plus the first 5 bytes of their HMAC-SHA256
+under SECRET_KEY, written as 16 base32 characters (e.g. K7QF-2MXA-RB4D-9TZC
+without the dashes). A scanner can reject forged or mistyped tickets
+without any lookup. Check-ins and the holders of newly issued tickets are
+kept in a SQLite file shared by all workers (CHECKIN_DB_PATH).
+"""
+
+import asyncio
+import base64
+import hashlib
+import hmac
+import logging
+import os
+import re
+import secrets
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Optional
+from .config import settings
+from .batching import QueueFullError
+from .executors import sheets_executor
+from .google_sheets import checkin_writer, sheets_service
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+TICKET_ID_BYTES = 5
+TICKET_MAC_BYTES = 5
+
+_SEPARATORS = re.compile(r"[\s\-]")
+
+
+def _mac(ticket_id: bytes) -> bytes:
+    return hmac.new(settings.secret_key.encode(), ticket_id, hashlib.sha256).digest()[:TICKET_MAC_BYTES]
+
+
+def issue_ticket() -> str:
+    """Create a new signed ticket ID."""
+    ticket_id = secrets.token_bytes(TICKET_ID_BYTES)
+    return base64.b32encode(ticket_id + _mac(ticket_id)).decode()
+
+
+def verify_ticket(ticket: str) -> Optional[str]:
+    """
+    Check a ticket's signature.
+
+    Args:
+        ticket: Ticket as scanned or typed (case and dashes are ignored)
+
+    Returns:
+        str: The canonical ticket, or None if it is malformed or forged
+    """
+    canonical = _SEPARATORS.sub("", ticket or "").upper()
+    try:
+        raw = base64.b32decode(canonical)
+    except ValueError:
+        return None
+    if len(raw) != TICKET_ID_BYTES + TICKET_MAC_BYTES:
+        return None
+    ticket_id, mac = raw[:TICKET_ID_BYTES], raw[TICKET_ID_BYTES:]
+    return canonical if hmac.compare_digest(mac, _mac(ticket_id)) else None
+
+
+def format_ticket(ticket: str) -> str:
+    """Group a ticket in fours for reading aloud or typing (K7QF-2MXA-RB4D-9TZC)."""
+    return "-".join(ticket[i:i + 4] for i in range(0, len(ticket), 4))
+
+
+CHECKIN_SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkins (
+    ticket TEXT PRIMARY KEY,
+    checked_in_at TEXT NOT NULL,
+    scanner TEXT NOT NULL DEFAULT ''
+);
+CREATE TABLE IF NOT EXISTS ticket_holders (
+    ticket TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    church TEXT NOT NULL
+);
+"""
+
+
+class TicketIndex:
+    """
+    Ticket holders and check-ins, shared by every worker through a SQLite file.
+
+    Check-ins are rows keyed by ticket, so the first worker to insert one
+    wins and every later scan (on any worker) sees it. Tickets issued at
+    runtime are recorded with their holder's name, so a ticket registered on
+    another worker is found too. Holders of registrations already in the
+    sheet are kept in memory by each worker (filled by the registration
+    seeder) and only looked up in the file when missing.
+
+    Methods other than rebuild() are blocking; call them from a worker thread.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Location of the SQLite database file
+        """
+        self.path = path
+        self._holders: dict[str, dict] = {}  # ticket -> {'name', 'church'} (this worker's cache)
+        self._local = threading.local()
+        self._task: Optional[asyncio.Task] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return this thread's connection, creating the file and tables on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")  # Check-ins are also written to the sheet
+            conn.executescript(CHECKIN_SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def add(self, registration: dict):
+        """Record the holder of a newly issued ticket for every worker."""
+        self.add_many([registration])
+
+    def add_many(self, registrations: list[dict]):
+        holders = [
+            (registration['ticket'], registration.get('full_name', ''), registration.get('church', ''))
+            for registration in registrations if registration.get('ticket')
+        ]
+        if not holders:
+            return
+        for ticket, name, church in holders:
+            self._holders[ticket] = {'name': name, 'church': church}
+        self._connection().executemany(
+            "INSERT OR REPLACE INTO ticket_holders (ticket, name, church) VALUES (?, ?, ?)", holders
+        )
+
+    def rebuild(self, registrations: list[dict]):
+        """Cache the holders of saved registrations (in memory only; every worker reads the sheet)."""
+        for registration in registrations:
+            ticket = registration.get('ticket')
+            if ticket:
+                self._holders[ticket] = {
+                    'name': registration.get('full_name', ''),
+                    'church': registration.get('church', ''),
+                }
+        logger.info("Indexed %s ticket(s) for check-in", len(self._holders))
+
+    def holder(self, ticket: str) -> Optional[dict]:
+        holder = self._holders.get(ticket)
+        if holder is None:
+            row = self._connection().execute(
+                "SELECT name, church FROM ticket_holders WHERE ticket = ?", (ticket,)
+            ).fetchone()
+            if row is not None:
+                holder = self._holders[ticket] = {'name': row[0], 'church': row[1]}
+        return holder
+
+    def check_in(self, ticket: str, scanner: str = "") -> tuple[bool, str]:
+        """
+        Mark a (verified) ticket as checked in.
+
+        The first check-in (across all workers) is stored in the shared file
+        and its row queued for the next batched write to the check-ins worksheet.
+
+        Args:
+            ticket: Canonical ticket from verify_ticket()
+            scanner: Identifier of the scanning device, recorded with the check-in
+
+        Returns:
+            tuple: (True if this is the first check-in, timestamp of the first check-in)
+        """
+        conn = self._connection()
+        checked_in_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        cursor = conn.execute(
+            "INSERT OR IGNORE INTO checkins (ticket, checked_in_at, scanner) VALUES (?, ?, ?)",
+            (ticket, checked_in_at, scanner),
+        )
+        if cursor.rowcount == 0:
+            (existing,) = conn.execute("SELECT checked_in_at FROM checkins WHERE ticket = ?", (ticket,)).fetchone()
+            return False, existing
+
+        holder = self.holder(ticket) or {}
+        row = [checked_in_at, ticket, holder.get('name', ''), scanner]
+        try:
+            checkin_writer.submit(row).add_done_callback(self._log_write_failure)
+        except QueueFullError as e:
+            # The attendee is let in either way; only the sheet record is lost
+            logger.error("Check-in of %s not recorded: %s", ticket, e)
+        return True, checked_in_at
+
+    @staticmethod
+    def _log_write_failure(future):
+        if future.exception() is not None:
+            logger.error("Failed to record check-in: %s", future.exception())
+
+    def checked_in_count(self) -> int:
+        (count,) = self._connection().execute("SELECT COUNT(*) FROM checkins").fetchone()
+        return count
+
+    def load_checkins(self) -> int:
+        """Copy earlier check-ins from the check-ins worksheet into the shared file (one Sheets read)."""
+        rows = sheets_service.read_checkins()
+        self._connection().executemany(
+            "INSERT OR IGNORE INTO checkins (ticket, checked_in_at, scanner) VALUES (?, ?, ?)",
+            [(row[1], row[0], row[3] if len(row) > 3 else '') for row in rows if len(row) > 1 and row[1]],
+        )
+        return len(rows)
+
+    async def _load(self):
+        try:
+            count = await sheets_executor.run(self.load_checkins)
+            logger.info("Loaded %s earlier check-in(s)", count)
+        except Exception as e:
+            logger.error("Failed to load earlier check-ins: %s", e)
+
+    def start(self):
+        """Start the check-in writer and load earlier check-ins in the background."""
+        checkin_writer.start()
+        if self._task and not self._task.done():
+            return
+        self._task = asyncio.create_task(self._load())
+
+    async def stop(self):
+        """Stop loading and flush check-ins that haven't been written yet."""
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        await asyncio.to_thread(checkin_writer.stop)
+
+
+# Global instance
+ticket_index = TicketIndex(settings.checkin_db_path)
@@ -0,0 +1,71 @@
+"""
+Compare two benchmark result files and flag regressions.
+
+Usage (from the backend directory):
+    python -m benchmarks.compare benchmarks/results/baseline.json benchmarks/results/candidate.json
+
+Exits with status 1 if any metric is worse than the baseline by more than
+the tolerance, so it can gate a release.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+# (path in the result file, True if higher is better)
+METRICS = [
+    (("throughput_rps",), True),
+    (("latency_ms", "p50"), False),
+    (("latency_ms", "p95"), False),
+    (("latency_ms", "p99"), False),
+    (("error_rate",), False),
+]
+
+
+def lookup(result: dict, path: tuple) -> float:
+    value = result
+    for key in path:
+        value = value.get(key, {}) if isinstance(value, dict) else {}
+    return float(value) if isinstance(value, (int, float)) else 0.0
+
+
+def compare(baseline: dict, candidate: dict, tolerance: float) -> list[str]:
+    """
+    Returns:
+        list[str]: One line per regressed metric (empty if none)
+    """
+    regressions = []
+    for path, higher_is_better in METRICS:
+        name = ".".join(path)
+        old, new = lookup(baseline, path), lookup(candidate, path)
+        if old == 0:
+            change = 0.0 if new == 0 else float("inf")
+        else:
+            change = (new - old) / old
+        worse = -change if higher_is_better else change
+        marker = "REGRESSION" if worse > tolerance else "ok"
+        print(f"{name:<16} {old:>10.2f} -> {new:>10.2f}  ({change:+.1%})  {marker}")
+        if worse > tolerance:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two load test results")
+    parser.add_argument("baseline", type=Path)
+    parser.add_argument("candidate", type=Path)
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed relative change (default 10%%)")
+    args = parser.parse_args()
+
+    baseline = json.loads(args.baseline.read_text())
+    candidate = json.loads(args.candidate.read_text())
+    regressions = compare(baseline, candidate, args.tolerance)
+    if regressions:
+        print(f"\nRegressed: {', '.join(regressions)}")
+        sys.exit(1)
+    print("\nNo regressions")
+
+
+if __name__ == "__main__":
+    main()
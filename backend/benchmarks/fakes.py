@@ -0,0 +1,272 @@
+"""
+In-process stand-ins for Google Sheets and mNotify used by the benchmarks.
+Both take a Profile describing latency, error rate and quota.
+"""
+
+import json
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+import gspread
+from gspread.utils import a1_to_rowcol
+
+
+@dataclass
+class Profile:
+    """Behaviour of a fake dependency."""
+    latency_ms: float = 0.0  # Mean latency per call
+    jitter_ms: float = 0.0  # Uniform +/- jitter around the mean
+    error_rate: float = 0.0  # Fraction of calls that fail with a 5xx
+    quota_per_minute: Optional[int] = None  # Calls allowed per rolling minute (429 beyond)
+
+
+class FakeResponse:
+    """Minimal response object so gspread.exceptions.APIError can be raised."""
+
+    def __init__(self, code: int, message: str, status: str):
+        self.status_code = code
+        self.text = message
+        self._body = {"error": {"code": code, "message": message, "status": status}}
+
+    def json(self) -> dict:
+        return self._body
+
+
+class CallGate:
+    """Applies a Profile to each call: sleeps, enforces quota and injects errors."""
+
+    def __init__(self, profile: Profile):
+        self.profile = profile
+        self.calls = 0
+        self.rejected = 0
+        self._window: deque = deque()
+        self._lock = threading.Lock()
+
+    def delay(self):
+        """Sleep for the profile's latency."""
+        if self.profile.latency_ms or self.profile.jitter_ms:
+            jitter = random.uniform(-self.profile.jitter_ms, self.profile.jitter_ms)
+            time.sleep(max(0.0, self.profile.latency_ms + jitter) / 1000)
+
+    def admit(self) -> Optional[tuple[int, str, str]]:
+        """
+        Count a call against the quota and roll for an injected error.
+
+        Returns:
+            tuple: (code, message, status) of the error to return, or None
+        """
+        with self._lock:
+            self.calls += 1
+            now = time.monotonic()
+            while self._window and now - self._window[0] > 60:
+                self._window.popleft()
+            if self.profile.quota_per_minute is not None and len(self._window) >= self.profile.quota_per_minute:
+                self.rejected += 1
+                return 429, "Quota exceeded", "RESOURCE_EXHAUSTED"
+            self._window.append(now)
+        if random.random() < self.profile.error_rate:
+            with self._lock:
+                self.rejected += 1
+            return 503, "The service is currently unavailable", "UNAVAILABLE"
+        return None
+
+
+class FakeWorksheet:
+    """Enough of gspread.Worksheet for the registration backend."""
+
+    def __init__(self, gate: CallGate, title: str = "Sheet1", index: int = 0):
+        self.gate = gate
+        self.title = title
+        self.index = index
+        self.id = index
+        self.rows: list[list] = []
+        self._lock = threading.Lock()
+
+    def _call(self):
+        self.gate.delay()
+        error = self.gate.admit()
+        if error:
+            raise gspread.exceptions.APIError(FakeResponse(*error))
+
+    @property
+    def row_count(self) -> int:
+        return max(1000, len(self.rows))
+
+    def row_values(self, row: int, **kwargs) -> list:
+        self._call()
+        with self._lock:
+            return list(self.rows[row - 1]) if len(self.rows) >= row else []
+
+    def append_row(self, values: list, **kwargs):
+        self.append_rows([values])
+
+    def append_rows(self, values: list[list], **kwargs) -> dict:
+        self._call()
+        with self._lock:
+            first = len(self.rows) + 1
+            self.rows.extend([list(row) for row in values])
+            last = len(self.rows)
+        return {"updates": {"updatedRange": f"'{self.title}'!A{first}:M{last}", "updatedRows": len(values)}}
+
+    def get(self, range_name: str, pad_values: bool = False, **kwargs) -> list[list]:
+        """Rows of an A1 range such as 'A2:L501' (trailing empty rows omitted, like the API)."""
+        self._call()
+        start, end = range_name.split(":")
+        (first_row, first_col), (last_row, last_col) = a1_to_rowcol(start), a1_to_rowcol(end)
+        with self._lock:
+            block = [row[first_col - 1:last_col] for row in self.rows[first_row - 1:last_row]]
+        while block and not any(block[-1]):
+            block.pop()
+        if pad_values:
+            width = last_col - first_col + 1
+            block = [row + [''] * (width - len(row)) for row in block]
+        return block
+
+    def get_all_values(self, **kwargs) -> list[list]:
+        self._call()
+        with self._lock:
+            return [list(row) for row in self.rows]
+
+    def update(self, values: list[list], range_name: str = "A1", **kwargs):
+        """Overwrite the cells starting at the top-left corner of range_name."""
+        self._call()
+        first_row, first_col = a1_to_rowcol(range_name.split(":")[0])
+        self._write(first_row, first_col, values)
+
+    def _write(self, first_row: int, first_col: int, values: list[list]):
+        with self._lock:
+            for offset, values_row in enumerate(values):
+                index = first_row - 1 + offset
+                while len(self.rows) <= index:
+                    self.rows.append([])
+                row = self.rows[index]
+                row.extend([''] * (first_col - 1 + len(values_row) - len(row)))
+                row[first_col - 1:first_col - 1 + len(values_row)] = list(values_row)
+
+    def batch_update(self, data: list[dict], **kwargs):
+        """Apply several single-range updates in one call."""
+        self._call()
+        for update in data:
+            first_row, first_col = a1_to_rowcol(update["range"].split(":")[0])
+            self._write(first_row, first_col, update["values"])
+
+
+class FakeSpreadsheet:
+    """Enough of gspread.Spreadsheet for the registration backend."""
+
+    def __init__(self, gate: CallGate):
+        self.gate = gate
+        self.id = "benchmark-sheet"
+        self.title = "Benchmark Registrations"
+        self._worksheets = [FakeWorksheet(gate)]
+
+    def fetch_sheet_metadata(self, **kwargs) -> dict:
+        self._worksheets[0]._call()
+        return {"properties": {"title": self.title}}
+
+    def get_worksheet(self, index: int) -> FakeWorksheet:
+        return self._worksheets[index]
+
+    def worksheets(self, **kwargs) -> list[FakeWorksheet]:
+        return list(self._worksheets)
+
+    def worksheet(self, title: str) -> FakeWorksheet:
+        for worksheet in self._worksheets:
+            if worksheet.title == title:
+                return worksheet
+        raise gspread.WorksheetNotFound(title)
+
+    def add_worksheet(self, title: str, rows: int = 1000, cols: int = 26, **kwargs) -> FakeWorksheet:
+        self._worksheets[0]._call()
+        if any(worksheet.title == title for worksheet in self._worksheets):
+            raise gspread.exceptions.APIError(
+                FakeResponse(400, f'A sheet with the name "{title}" already exists.', "INVALID_ARGUMENT")
+            )
+        worksheet = FakeWorksheet(self.gate, title=title, index=len(self._worksheets))
+        self._worksheets.append(worksheet)
+        return worksheet
+
+
+class FakeSheetsClient:
+    """Stand-in for gspread.Client; assign to sheets_service.client."""
+
+    def __init__(self, profile: Profile):
+        self.gate = CallGate(profile)
+        self.spreadsheet = FakeSpreadsheet(self.gate)
+
+    def open_by_key(self, key: str) -> FakeSpreadsheet:
+        return self.spreadsheet
+
+    def all_rows(self) -> list[list]:
+        """Every row across all worksheets, headers included."""
+        return [row for worksheet in self.spreadsheet.worksheets() for row in worksheet.rows]
+
+
+class FakeMNotifyServer:
+    """
+    Local HTTP server that answers like mNotify's quick SMS and balance endpoints.
+    Point MNOTIFY_API_URL at `api_url` to use it.
+    """
+
+    def __init__(self, profile: Profile):
+        self.gate = CallGate(profile)
+        self.delivered: list[str] = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def api_url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}/api"
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _reply(self, status: int, body: dict):
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self):
+                self._reply(200, {"status": "success", "code": "2000", "balance": 100000})
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                fake.gate.delay()
+                error = fake.gate.admit()
+                if error:
+                    self._reply(error[0], {"status": "error", "code": str(error[0]), "message": error[1]})
+                    return
+                recipients = list(body.get("recipient", []))
+                with fake._lock:
+                    fake.delivered.extend(recipients)
+                self._reply(200, {
+                    "status": "success",
+                    "code": "2000",
+                    "message": "messages sent successfully",
+                    "summary": {"total_sent": len(recipients), "numbers_sent": recipients},
+                })
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-mnotify", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
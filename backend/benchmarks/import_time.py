@@ -0,0 +1,103 @@
+"""
+Cold-start import budget for the API.
+
+Imports app.main in fresh interpreters with `python -X importtime`, reports
+the median import time and the slowest modules, and fails if the budget
+is exceeded or a deferred client library (gspread, oauth2client, requests)
+is imported at startup.
+
+Usage (from the backend directory):
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --budget-ms 800 --runs 7
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+from .load_test import BENCH_ENV
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Client libraries that must only be imported on first use
+DEFERRED_MODULES = ["gspread", "oauth2client", "requests", "httplib2"]
+
+PROBE = (
+    "import sys, json, app.main; "
+    f"print(json.dumps([m for m in {DEFERRED_MODULES!r} if m in sys.modules]))"
+)
+
+
+def measure_once() -> tuple[float, dict[str, float], list[str]]:
+    """
+    Import app.main in a fresh interpreter.
+
+    Returns:
+        tuple: (app.main cumulative ms, cumulative ms of each module app.main imports directly,
+        deferred modules loaded)
+    """
+    env = {**os.environ, **BENCH_ENV}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    total = 0.0
+    children: dict[str, float] = {}
+    pending: dict[str, float] = {}
+    for line in result.stderr.splitlines():
+        # "import time: self [us] | cumulative | <indent>package" - children are listed
+        # before their parent, indented two more spaces
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, raw_name = line[len("import time:"):].split("|")
+        if not cumulative.strip().isdigit():
+            continue
+        depth = (len(raw_name) - len(raw_name.lstrip()) - 1) // 2
+        name, ms = raw_name.strip(), int(cumulative) / 1000
+        if depth == 1:
+            pending[name] = ms
+        elif depth == 0:
+            if name == "app.main":
+                total, children = ms, pending
+            pending = {}
+    loaded = json.loads(result.stdout.strip().splitlines()[-1])
+    return total, children, loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the app.main import-time budget")
+    parser.add_argument("--budget-ms", type=float, default=1200, help="Maximum median import time of app.main")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to measure")
+    parser.add_argument("--top", type=int, default=8, help="Slowest direct imports of app.main to list")
+    args = parser.parse_args()
+
+    totals = []
+    children: dict[str, float] = {}
+    loaded: set[str] = set()
+    for _ in range(args.runs):
+        total, children, run_loaded = measure_once()
+        totals.append(total)
+        loaded.update(run_loaded)
+
+    median = statistics.median(totals)
+    print(f"app.main import: median {median:.0f} ms over {args.runs} runs (budget {args.budget_ms:.0f} ms)")
+    for name, ms in sorted(children.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f"  {name:<24} {ms:>8.1f} ms")
+
+    failures = []
+    if median > args.budget_ms:
+        failures.append(f"import time {median:.0f} ms exceeds the {args.budget_ms:.0f} ms budget")
+    if loaded:
+        failures.append(f"deferred modules imported at startup: {', '.join(sorted(loaded))}")
+    if failures:
+        print("\nFAILED: " + "; ".join(failures))
+        sys.exit(1)
+    print("\nWithin budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+"""
+End-to-end load test for /api/register.
+
+Runs the FastAPI app in-process against fake Google Sheets and mNotify
+backends, drives /api/register at a target request rate with realistic
+payloads and writes the results as JSON for later comparison.
+
+Usage (from the backend directory):
+    python -m benchmarks.load_test --rps 20 --duration 30
+    python -m benchmarks.load_test --sheets-latency-ms 400 --sheets-quota 60 --output results/quota.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import httpx
+
+from .fakes import FakeMNotifyServer, FakeSheetsClient, Profile
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+# Dummy values for the required settings; nothing real is contacted
+BENCH_ENV = {
+    "GOOGLE_SHEETS_CREDENTIALS_PATH": "benchmark-credentials.json",
+    "GOOGLE_SHEET_ID": "benchmark-sheet",
+    "MNOTIFY_API_KEY": "benchmark-key",
+    "SECRET_KEY": "benchmark-secret",
+    "WHATSAPP_GROUP_LINK": "https://chat.whatsapp.com/benchmark",
+    "FACEBOOK_URL": "https://facebook.com/benchmark",
+    "YOUTUBE_URL": "https://youtube.com/@benchmark",
+    "REGISTER_RATE_LIMIT": "1000000/minute",
+    "RATE_LIMIT_STORAGE_URI": "memory://",
+    "HEALTH_PROBE_INTERVAL_SECONDS": "3600",
+}
+
+FIRST_NAMES = ["Kwame", "Ama", "Kofi", "Akosua", "Yaw", "Abena", "Kwaku", "Adwoa", "Kojo", "Efua", "Esi", "Nana"]
+LAST_NAMES = ["Mensah", "Owusu", "Boateng", "Asante", "Osei", "Addo", "Appiah", "Agyeman", "Darko", "Quaye"]
+CHURCHES = [
+    "The Church of Pentecost", "ICGC Christ Temple", "Lighthouse Chapel International",
+    "Methodist Church Ghana", "Presbyterian Church of Ghana", "Assemblies of God", "Royalhouse Chapel",
+]
+CITIES = ["Accra", "Kumasi", "Cape Coast", "Takoradi", "Tamale", "Koforidua", "Winneba", "Tema", "Ho", "Apam"]
+INSTITUTIONS = ["University of Ghana", "KNUST", "University of Cape Coast", "University of Education, Winneba", "Accra Technical University"]
+NETWORK_PREFIXES = ["024", "054", "055", "059", "020", "050", "026", "027", "057"]
+
+
+def make_registration(rng: random.Random) -> dict:
+    """Build a RegistrationRequest-shaped payload with a realistic mix of optional fields."""
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    local = rng.choice(NETWORK_PREFIXES) + "".join(rng.choices("0123456789", k=7))
+    phone_format = rng.random()
+    if phone_format < 0.6:
+        phone = local
+    elif phone_format < 0.8:
+        phone = "+233" + local[1:]
+    else:
+        phone = "233" + local[1:]
+
+    payload = {
+        "full_name": f"{first} {last}",
+        "church": rng.choice(CHURCHES),
+        "city": rng.choice(CITIES),
+        "privacy_consent": True,
+    }
+    if rng.random() < 0.9:
+        payload["phone"] = phone
+    if rng.random() < 0.6:
+        payload["institution"] = rng.choice(INSTITUTIONS)
+    if rng.random() < 0.4:
+        payload["email"] = f"{first.lower()}.{last.lower()}{rng.randint(1, 999)}@example.com"
+    if rng.random() < 0.5:
+        payload["contact_method"] = rng.choice(["Phone", "Email", "WhatsApp"])
+    if rng.random() < 0.7:
+        payload["first_time_attendee"] = rng.choice(["Yes", "No"])
+    if rng.random() < 0.2:
+        payload["prayer_request"] = "Pray for my family and my studies."
+    return payload
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def git_commit() -> str:
+    """Short hash of the checked-out commit, if available."""
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except Exception:
+        return "unknown"
+
+
+async def drive(app, args) -> tuple[list[float], dict, float]:
+    """
+    Send requests on a fixed open-loop schedule of `rps` per second.
+
+    Returns:
+        tuple: (latencies in ms, status code counts, wall-clock seconds)
+    """
+    rng = random.Random(args.seed)
+    total = int(args.rps * args.duration)
+    interval = 1 / args.rps
+    latencies: list[float] = []
+    statuses: dict[str, int] = {}
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=args.timeout) as client:
+        async def one(payload: dict):
+            started = time.perf_counter()
+            try:
+                response = await client.post("/api/register", json=payload)
+                status = str(response.status_code)
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            latencies.append((time.perf_counter() - started) * 1000)
+            statuses[status] = statuses.get(status, 0) + 1
+
+        started = time.perf_counter()
+        tasks = []
+        for i in range(total):
+            delay = started + i * interval - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(one(make_registration(rng))))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - started
+
+    return latencies, statuses, elapsed
+
+
+async def wait_for_drain(timeout: float):
+    """Wait until the background queues (write buffer, journal, SMS) are empty."""
+    from app.health import health_prober
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if all(queue["depth"] == 0 for queue in health_prober.queue_depths().values()):
+            return
+        await asyncio.sleep(0.1)
+
+
+async def run(args) -> dict:
+    """Start the fakes, run the app through its lifespan and collect results."""
+    mnotify = FakeMNotifyServer(Profile(
+        latency_ms=args.sms_latency_ms,
+        jitter_ms=args.sms_latency_ms / 2,
+        error_rate=args.sms_error_rate,
+    ))
+    mnotify.start()
+
+    # Settings are read at import time, so configure the environment first
+    os.environ.update(BENCH_ENV)
+    os.environ["MNOTIFY_API_URL"] = mnotify.api_url
+    # Pace the app to the fake's quota (one process here); effectively unpaced without one
+    quota = str(args.sheets_quota or 1_000_000)
+    os.environ.update({
+        "SHEETS_READ_QUOTA_PER_MINUTE": quota,
+        "SHEETS_WRITE_QUOTA_PER_MINUTE": quota,
+        "SHEETS_QUOTA_WORKERS": "1",
+    })
+
+    from app.main import app
+    from app.google_sheets import sheets_service
+
+    logging.getLogger().setLevel(args.log_level)
+
+    sheets = FakeSheetsClient(Profile(
+        latency_ms=args.sheets_latency_ms,
+        jitter_ms=args.sheets_latency_ms / 2,
+        error_rate=args.sheets_error_rate,
+        quota_per_minute=args.sheets_quota,
+    ))
+    sheets_service.client = sheets
+
+    async with app.router.lifespan_context(app):
+        latencies, statuses, elapsed = await drive(app, args)
+        await wait_for_drain(args.drain_timeout)
+    mnotify.stop()
+
+    latencies.sort()
+    data_rows = [row for row in sheets.all_rows() if row and row[0] != "Timestamp"]
+    completed = len(latencies)
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "config": vars(args),
+        "requests": completed,
+        "duration_seconds": round(elapsed, 3),
+        "throughput_rps": round(completed / elapsed, 2) if elapsed else 0.0,
+        "status_codes": statuses,
+        "error_rate": round(1 - statuses.get("200", 0) / completed, 4) if completed else 0.0,
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50), 2),
+            "p95": round(percentile(latencies, 95), 2),
+            "p99": round(percentile(latencies, 99), 2),
+            "max": round(latencies[-1], 2) if latencies else 0.0,
+            "mean": round(sum(latencies) / completed, 2) if completed else 0.0,
+        },
+        "rows_written": sum(1 for row in data_rows if "Success" in row),
+        "rows_failed": sum(1 for row in data_rows if "Failed" in row),
+        "sms_delivered": len(mnotify.delivered),
+        "sheets_api_calls": sheets.gate.calls,
+        "sheets_api_rejected": sheets.gate.rejected,
+        "sms_api_calls": mnotify.gate.calls,
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Load test /api/register against fake dependencies")
+    parser.add_argument("--rps", type=float, default=20, help="Target requests per second")
+    parser.add_argument("--duration", type=float, default=15, help="Seconds of load")
+    parser.add_argument("--seed", type=int, default=2025, help="Payload generator seed")
+    parser.add_argument("--timeout", type=float, default=30, help="Per-request client timeout")
+    parser.add_argument("--sheets-latency-ms", type=float, default=250)
+    parser.add_argument("--sheets-error-rate", type=float, default=0.0)
+    parser.add_argument("--sheets-quota", type=int, default=None, help="Sheets calls allowed per minute")
+    parser.add_argument("--sms-latency-ms", type=float, default=300)
+    parser.add_argument("--sms-error-rate", type=float, default=0.0)
+    parser.add_argument("--drain-timeout", type=float, default=30, help="Seconds to wait for background queues")
+    parser.add_argument("--log-level", default="WARNING")
+    parser.add_argument("--output", type=Path, default=None, help="Result file (default: benchmarks/results/<timestamp>.json)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    result = asyncio.run(run(args))
+
+    output = args.output or RESULTS_DIR / f"load-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    result["config"]["output"] = str(output)
+    output.write_text(json.dumps(result, indent=2))
+
+    latency = result["latency_ms"]
+    print(f"Requests:    {result['requests']} in {result['duration_seconds']}s ({result['throughput_rps']} req/s)")
+    print(f"Latency ms:  p50={latency['p50']} p95={latency['p95']} p99={latency['p99']} max={latency['max']}")
+    print(f"Statuses:    {result['status_codes']}")
+    print(f"Delivered:   {result['rows_written']} rows ({result['rows_failed']} failed), {result['sms_delivered']} SMS")
+    print(f"Results:     {output}")
+
+    # A confirmation must never go out for a registration that wasn't saved
+    unsaved = result["sms_delivered"] - result["rows_written"] - result["rows_failed"]
+    if unsaved > 0:
+        print(f"\nFAILED: {unsaved} confirmation SMS sent for registrations that were not saved")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
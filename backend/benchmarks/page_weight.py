@@ -0,0 +1,158 @@
+"""
+Page-weight budget for the static frontend.
+
+Parses each page the way a browser would on first load (no JavaScript):
+the HTML itself, local stylesheets and scripts, and every image that isn't
+lazy-loaded. For <picture> elements the first supported <source> is chosen
+and the srcset candidate is picked from `sizes` at the given viewport
+width and pixel density, like the browser's own selection. Third-party
+resources (Google Fonts, CDN scripts) are listed but not counted.
+
+Usage (from the backend directory):
+    python -m benchmarks.page_weight
+    python -m benchmarks.page_weight --viewport 1440 --dpr 1 --budget-kb 300
+"""
+
+import argparse
+import re
+import sys
+from html.parser import HTMLParser
+from pathlib import Path
+from urllib.parse import urlparse
+
+FRONTEND_DIR = Path(__file__).resolve().parent.parent.parent / "frontend"
+
+PAGES = ("index.html", "thank-you.html")
+
+_CONDITION = re.compile(r"\((min|max)-width:\s*(\d+(?:\.\d+)?)px\)")
+_LENGTH = re.compile(r"(\d+(?:\.\d+)?)(px|vw)$")
+
+
+def slot_width(sizes: str, viewport: float) -> float:
+    """CSS pixel width of the image slot described by a `sizes` attribute."""
+    for entry in (sizes or "100vw").split(","):
+        entry = entry.strip()
+        condition, _, length = entry.rpartition(" ") if entry.startswith("(") else ("", "", entry)
+        matches = all(
+            viewport >= float(value) if kind == "min" else viewport <= float(value)
+            for kind, value in _CONDITION.findall(condition)
+        )
+        match = _LENGTH.match(length.strip())
+        if matches and match:
+            value, unit = float(match.group(1)), match.group(2)
+            return value * viewport / 100 if unit == "vw" else value
+    return viewport
+
+
+def pick_candidate(srcset: str, slot: float, dpr: float) -> str:
+    """The smallest `w` candidate covering slot * dpr (the largest if none does)."""
+    candidates = []
+    for item in srcset.split(","):
+        parts = item.split()
+        if len(parts) == 2 and parts[1].endswith("w"):
+            candidates.append((int(parts[1][:-1]), parts[0]))
+    candidates.sort()
+    needed = slot * dpr
+    for width, url in candidates:
+        if width >= needed:
+            return url
+    return candidates[-1][1] if candidates else ""
+
+
+class PageResources(HTMLParser):
+    """Collects the URLs a page fetches on first load."""
+
+    def __init__(self, viewport: float, dpr: float, formats: set[str]):
+        super().__init__()
+        self.viewport = viewport
+        self.dpr = dpr
+        self.formats = formats
+        self.urls: list[str] = []
+        self.lazy: list[str] = []
+        self._picture_choice: str = ""  # URL chosen from a <source> of the open <picture>
+        self._in_picture = False
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str]]):
+        attributes = dict(attrs)
+        if tag == "link" and attributes.get("rel") == "stylesheet":
+            self.urls.append(attributes.get("href", ""))
+        elif tag == "script" and attributes.get("src"):
+            self.urls.append(attributes["src"])
+        elif tag == "picture":
+            self._in_picture, self._picture_choice = True, ""
+        elif tag == "source" and self._in_picture and not self._picture_choice:
+            kind = attributes.get("type", "").removeprefix("image/")
+            if attributes.get("srcset") and kind in self.formats:
+                slot = slot_width(attributes.get("sizes", ""), self.viewport)
+                self._picture_choice = pick_candidate(attributes["srcset"], slot, self.dpr)
+        elif tag == "img":
+            url = self._picture_choice or attributes.get("src", "")
+            if attributes.get("srcset") and not self._picture_choice:
+                slot = slot_width(attributes.get("sizes", ""), self.viewport)
+                url = pick_candidate(attributes["srcset"], slot, self.dpr) or url
+            if attributes.get("loading") == "lazy":
+                self.lazy.append(attributes.get("data-src") or url)
+            else:
+                self.urls.append(url)
+
+    def handle_endtag(self, tag: str):
+        if tag == "picture":
+            self._in_picture, self._picture_choice = False, ""
+
+
+def measure_page(page: str, viewport: float, dpr: float, formats: set[str]) -> tuple[list, list, list]:
+    """
+    Returns:
+        tuple: ([(url, bytes)] counted, [url] third-party, [url] lazy-loaded)
+    """
+    path = FRONTEND_DIR / page
+    parser = PageResources(viewport, dpr, formats)
+    parser.feed(path.read_text(encoding="utf-8"))
+    counted = [(page, path.stat().st_size)]
+    external = []
+    for url in dict.fromkeys(parser.urls):
+        if not url or url.startswith("data:"):
+            continue  # Inline data is already part of the HTML
+        if urlparse(url).scheme:
+            external.append(url)
+            continue
+        resource = FRONTEND_DIR / url.split("?")[0]
+        counted.append((url, resource.stat().st_size if resource.exists() else 0))
+    lazy = [url for url in parser.lazy if url and not url.startswith("data:")]
+    return counted, external, lazy
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the first-load page weight of the frontend")
+    parser.add_argument("--budget-kb", type=float, default=200, help="Maximum first-load weight of each page")
+    parser.add_argument("--viewport", type=float, default=412, help="Viewport width in CSS pixels")
+    parser.add_argument("--dpr", type=float, default=2, help="Device pixel ratio")
+    parser.add_argument("--formats", default="avif,webp", help="Image formats the browser supports")
+    args = parser.parse_args()
+    formats = set(args.formats.split(","))
+
+    failures = []
+    for page in PAGES:
+        counted, external, lazy = measure_page(page, args.viewport, args.dpr, formats)
+        total = sum(size for _, size in counted) / 1024
+        print(f"{page}: {total:.1f} KB on first load (budget {args.budget_kb:.0f} KB, {args.viewport:.0f}px @ {args.dpr:g}x)")
+        for url, size in sorted(counted, key=lambda item: item[1], reverse=True):
+            print(f"  {size / 1024:>8.1f} KB  {url}{'  (missing)' if not size else ''}")
+        if lazy:
+            print(f"  {len(lazy)} lazy-loaded image(s) not counted")
+        for url in external:
+            print(f"  {'third-party':>11}  {url}")
+        if total > args.budget_kb:
+            failures.append(f"{page} weighs {total:.1f} KB, over the {args.budget_kb:.0f} KB budget")
+        missing = [url for url, size in counted if not size]
+        if missing:
+            failures.append(f"{page} references missing files: {', '.join(missing)}")
+
+    if failures:
+        print("\nFAILED: " + "; ".join(failures))
+        sys.exit(1)
+    print("\nWithin budget")
+
+
+if __name__ == "__main__":
+    main()
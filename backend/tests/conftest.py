@@ -0,0 +1,100 @@
+"""
+Shared fixtures: the app runs in-process against the benchmark fakes for
+Google Sheets and mNotify (benchmarks/fakes.py), so nothing real is contacted.
+"""
+
+import os
+import tempfile
+import time
+
+import pytest
+
+from benchmarks.fakes import FakeMNotifyServer, FakeSheetsClient, Profile
+
+mnotify_server = FakeMNotifyServer(Profile())
+mnotify_server.start()
+
+_state_dir = tempfile.mkdtemp(prefix="iyc-tests-")
+
+# Settings are read at import time, so configure the environment before any app import
+os.environ.update({
+    "GOOGLE_SHEETS_CREDENTIALS_PATH": "test-credentials.json",
+    "GOOGLE_SHEET_ID": "test-sheet",
+    "MNOTIFY_API_KEY": "test-key",
+    "MNOTIFY_API_URL": mnotify_server.api_url,
+    "SECRET_KEY": "test-secret",
+    "WHATSAPP_GROUP_LINK": "https://chat.whatsapp.com/test",
+    "FACEBOOK_URL": "https://facebook.com/test",
+    "YOUTUBE_URL": "https://youtube.com/@test",
+    "ADMIN_TOKEN": "test-admin-token",
+    "REGISTER_RATE_LIMIT": "1000000/minute",
+    "BATCH_RATE_LIMIT": "1000000/hour",
+    "RATE_LIMIT_STORAGE_URI": "memory://",
+    "PREWARM_ENABLED": "false",
+    "HEALTH_PROBE_INTERVAL_SECONDS": "3600",
+    "SHEETS_READ_QUOTA_PER_MINUTE": "1000000",
+    "SHEETS_WRITE_QUOTA_PER_MINUTE": "1000000",
+    "SHEETS_QUOTA_WORKERS": "1",
+    "SMS_RETRY_BASE_DELAY_SECONDS": "0.01",
+    "BROADCAST_DB_PATH": os.path.join(_state_dir, "broadcasts.db"),
+    "CHECKIN_DB_PATH": os.path.join(_state_dir, "checkins.db"),
+    "DEDUP_DB_PATH": os.path.join(_state_dir, "dedup.db"),
+    "STATS_DB_PATH": os.path.join(_state_dir, "stats.db"),
+    "LOG_LEVEL": "WARNING",
+})
+
+ADMIN_HEADERS = {"Authorization": "Bearer test-admin-token"}
+
+
+def registration(name: str = "Ama Mensah", phone: str = "0241234567", **fields) -> dict:
+    """A valid /api/register payload."""
+    return {"full_name": name, "phone": phone, "church": "COP", "city": "Accra", "privacy_consent": True, **fields}
+
+
+def wait_for(condition, timeout: float = 5.0) -> bool:
+    """Poll until condition() is true (background workers) or the timeout passes."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return condition()
+
+
+@pytest.fixture
+def mnotify():
+    """The fake mNotify server, with an empty delivery log."""
+    mnotify_server.gate.profile = Profile()
+    with mnotify_server._lock:
+        mnotify_server.delivered.clear()
+    return mnotify_server
+
+
+@pytest.fixture
+def sheets():
+    """A fresh fake spreadsheet behind sheets_service (set .gate.profile to inject errors)."""
+    from app.google_sheets import sheets_service
+    from app.sheets_quota import sheets_governor
+
+    fake = FakeSheetsClient(Profile())
+    sheets_governor.breaker.record_success()  # Don't inherit an open breaker from an earlier test
+    sheets_service.invalidate()
+    sheets_service.client = fake
+    yield fake
+    sheets_service.invalidate()
+
+
+@pytest.fixture(scope="session")
+def app_client():
+    """One TestClient for the whole run: startup and shutdown only happen once."""
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def client(app_client, sheets, mnotify):
+    """The app with fresh fakes (use a different name per registration: duplicates are answered from the index)."""
+    return app_client
@@ -0,0 +1,81 @@
+"""Adaptive admission limit: shedding, growth under load and back-off."""
+
+import time
+
+import pytest
+
+from app.admission import AdmissionController
+from app.config import settings
+
+TARGET_SECONDS = 0.05
+
+
+@pytest.fixture
+def controller(monkeypatch):
+    monkeypatch.setattr(settings, "admission_initial_limit", 4)
+    monkeypatch.setattr(settings, "admission_min_limit", 2)
+    monkeypatch.setattr(settings, "admission_max_limit", 6)
+    monkeypatch.setattr(settings, "admission_target_latency_ms", TARGET_SECONDS * 1000)
+    monkeypatch.setattr(settings, "admission_backoff_ratio", 0.5)
+    return AdmissionController()
+
+
+def fill(controller: AdmissionController) -> int:
+    admitted = 0
+    while controller.try_acquire():
+        admitted += 1
+    return admitted
+
+
+def test_requests_over_the_limit_are_shed(controller):
+    assert fill(controller) == 4
+    assert controller.shed == 1
+    assert controller.retry_after() >= 1
+
+    controller.release(0.01)
+    assert controller.try_acquire()
+
+
+def test_fast_responses_under_load_raise_the_limit(controller):
+    for _ in range(3):
+        for _ in range(fill(controller)):
+            controller.release(0.01)
+
+    assert int(controller.limit) == 5
+
+
+def test_limit_does_not_grow_while_mostly_idle(controller):
+    for _ in range(20):
+        controller.try_acquire()
+        controller.release(0.01)
+
+    assert controller.limit == 4
+
+
+def test_limit_stops_at_the_maximum(controller):
+    for _ in range(50):
+        for _ in range(fill(controller)):
+            controller.release(0.01)
+
+    assert controller.limit == 6
+
+
+def test_slow_response_cuts_the_limit_once_per_episode(controller):
+    fill(controller)
+
+    controller.release(TARGET_SECONDS * 2)
+    controller.release(TARGET_SECONDS * 2)  # Same congestion episode
+    assert controller.limit == 2
+
+    time.sleep(TARGET_SECONDS)
+    controller.release(0.01, overloaded=True)
+    assert controller.limit == 2  # Never below the minimum
+
+
+def test_overloaded_response_cuts_the_limit(controller):
+    controller.try_acquire()
+
+    controller.release(0.01, overloaded=True)
+
+    assert controller.limit == 2
+    assert controller.in_flight == 0
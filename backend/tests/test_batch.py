@@ -0,0 +1,38 @@
+"""/api/register/batch body limits."""
+
+import json
+
+from app.config import settings
+
+from .conftest import registration
+
+
+def test_batch_is_saved(client):
+    records = [registration("Batch One", "0243330001"), registration("Batch Two", "0243330002")]
+
+    response = client.post("/api/register/batch", json=records)
+
+    assert response.status_code == 200
+    assert response.json()["data"]["saved"] == 2
+
+
+def test_oversized_batch_is_rejected_by_content_length(client, monkeypatch):
+    monkeypatch.setattr(settings, "batch_max_bytes", 1000)
+    body = json.dumps([registration(f"Large {i}", f"024333{i:04d}") for i in range(20)])
+
+    response = client.post("/api/register/batch", content=body, headers={"Content-Type": "application/json"})
+
+    assert response.status_code == 413
+    assert response.json()["detail"]["error"] == "invalid_batch"
+
+
+def test_oversized_streamed_batch_stops_at_the_limit(client, monkeypatch):
+    monkeypatch.setattr(settings, "batch_max_bytes", 1000)
+    def chunks():
+        # No Content-Length: the body is sent chunked
+        for i in range(100):
+            yield (json.dumps(registration(f"Streamed {i}", f"024444{i:04d}")) + ",").encode()
+
+    response = client.post("/api/register/batch", content=chunks(), headers={"Content-Type": "application/json"})
+
+    assert response.status_code == 413
@@ -0,0 +1,97 @@
+"""Write-behind batching: flushing, cancellation and failed flushes."""
+
+import threading
+
+import pytest
+
+from app.batching import BatchDispatcher
+
+
+@pytest.fixture
+def flushed():
+    return []
+
+
+def dispatcher(flush, **kwargs) -> BatchDispatcher:
+    kwargs.setdefault("max_delay_ms", 100)
+    return BatchDispatcher("test-writer", flush, **kwargs)
+
+
+def test_items_are_flushed_together(flushed):
+    writer = dispatcher(lambda items: flushed.append(items) or [item * 2 for item in items])
+
+    futures = [writer.submit(item) for item in range(3)]
+
+    assert [future.result(5) for future in futures] == [0, 2, 4]
+    assert flushed == [[0, 1, 2]]
+    writer.stop()
+
+
+def test_cancelled_item_is_not_flushed(flushed):
+    writer = dispatcher(lambda items: flushed.append(items) or items)
+
+    first, cancelled, last = (writer.submit(item) for item in ("a", "b", "c"))
+    assert cancelled.cancel()
+
+    assert first.result(5) == "a"
+    assert last.result(5) == "c"
+    assert flushed == [["a", "c"]]
+    writer.stop()
+
+
+def test_item_in_a_flush_can_no_longer_be_cancelled():
+    started, release = threading.Event(), threading.Event()
+
+    def flush(items):
+        started.set()
+        release.wait(5)
+        return items
+
+    writer = dispatcher(flush, max_delay_ms=0)
+    future = writer.submit("a")
+    assert started.wait(5)
+
+    assert not future.cancel()  # Its row is being written
+    release.set()
+    assert future.result(5) == "a"
+    writer.stop()
+
+
+def test_failed_flush_fails_every_item_and_the_worker_goes_on():
+    calls = []
+
+    def flush(items):
+        calls.append(items)
+        if len(calls) == 1:
+            raise RuntimeError("Sheets unavailable")
+        return items
+
+    writer = dispatcher(flush)
+    failed = [writer.submit(item) for item in ("a", "b")]
+    for future in failed:
+        with pytest.raises(RuntimeError):
+            future.result(5)
+
+    assert writer.submit("c").result(5) == "c"
+    writer.stop()
+
+
+def test_flush_with_missing_results_fails_the_batch():
+    writer = dispatcher(lambda items: items[:1])
+
+    futures = [writer.submit(item) for item in ("a", "b")]
+
+    for future in futures:
+        with pytest.raises(Exception, match="returned 1 results for 2 items"):
+            future.result(5)
+    writer.stop()
+
+
+def test_stop_flushes_what_is_still_queued(flushed):
+    writer = dispatcher(lambda items: flushed.append(items) or items, max_delay_ms=60_000, max_batch_size=10)
+
+    futures = [writer.submit(item) for item in ("a", "b")]
+    writer.stop()
+
+    assert [future.result(0) for future in futures] == ["a", "b"]
+    assert sum(flushed, []) == ["a", "b"]
@@ -0,0 +1,123 @@
+"""Broadcast leases: renewal while sending and takeover by another worker."""
+
+import pytest
+
+from app.broadcast import BroadcastRunner
+from app.sms_service import SMSDeliveryUnknownError, SMSTransientError, sms_service
+
+RECIPIENTS = [
+    {"phone": "0241234567", "name": "Ama Mensah", "ticket": ""},
+    {"phone": "0201234567", "name": "Kofi Boateng", "ticket": ""},
+]
+
+
+@pytest.fixture
+def runners(tmp_path, monkeypatch):
+    """Two workers sharing one broadcast file, driven by hand (no background threads)."""
+    monkeypatch.setattr(BroadcastRunner, "start", lambda self: None)
+    path = str(tmp_path / "broadcasts.db")
+    return BroadcastRunner(path), BroadcastRunner(path)
+
+
+def lease_until(runner: BroadcastRunner, broadcast_id: int) -> float:
+    return runner._connection().execute(
+        "SELECT lease_until FROM broadcasts WHERE id = ?", (broadcast_id,)
+    ).fetchone()[0]
+
+
+def test_lease_is_renewed_before_every_call(runners, monkeypatch):
+    first, _ = runners
+    job = first.create("Hello {first_name}", {}, RECIPIENTS)
+    leases = []
+
+    def post_sms(numbers, message):
+        leases.append(lease_until(first, job["id"]))
+        return {"code": "2000"}
+
+    monkeypatch.setattr(sms_service, "post_sms", post_sms)
+    assert first.send_next_chunk()
+
+    assert len(leases) == 2  # One call per distinct message
+    assert leases[1] > leases[0]
+    assert first.get(job["id"])["chunk_results"][0]["status"] == "sent"
+
+
+def test_worker_that_lost_its_lease_stops_and_records_nothing(runners, monkeypatch):
+    first, second = runners
+    job = first.create("Hello {first_name}", {}, RECIPIENTS)
+    calls = []
+
+    def post_sms(numbers, message):
+        calls.append(numbers)
+        # The first worker stalls past its lease and the second one takes the job over
+        first._connection().execute("UPDATE broadcasts SET lease_until = 0 WHERE id = ?", (job["id"],))
+        assert second._claim_job(second._connection()) == job["id"]
+        return {"code": "2000"}
+
+    monkeypatch.setattr(sms_service, "post_sms", post_sms)
+    assert first.send_next_chunk()
+
+    assert len(calls) == 1  # The second message was not sent by the old owner
+    result = second.get(job["id"])
+    assert result["chunk_results"][0]["status"] == "unknown"
+    assert result["sent"] == 0
+
+
+def test_timed_out_call_is_not_retried(runners, monkeypatch):
+    first, _ = runners
+    job = first.create("Hello {first_name}", {}, RECIPIENTS)
+    calls = []
+
+    def post_sms(numbers, message):
+        calls.append(numbers)
+        raise SMSDeliveryUnknownError("No response from mNotify: read timed out")
+
+    monkeypatch.setattr(sms_service, "post_sms", post_sms)
+    assert first.send_next_chunk()
+
+    assert len(calls) == 2  # Once per message, never retried
+    result = first.get(job["id"])
+    assert [chunk["status"] for chunk in result["chunk_results"]] == ["unknown"]
+    assert result["sent"] == result["failed"] == 0
+
+
+def test_partly_failed_chunk_keeps_its_failed_recipients(runners, monkeypatch):
+    first, _ = runners
+    job = first.create("Hello {first_name}", {}, RECIPIENTS)
+
+    def post_sms(numbers, message):
+        if "Kofi" in message:
+            return {"code": "4000", "message": "Invalid sender"}
+        return {"code": "2000"}
+
+    monkeypatch.setattr(sms_service, "post_sms", post_sms)
+    assert first.send_next_chunk()
+
+    result = first.get(job["id"])
+    assert [(chunk["status"], chunk["recipients"]) for chunk in result["chunk_results"]] == [("sent", 1), ("failed", 1)]
+    assert result["chunks"] == 2
+    assert (result["sent"], result["failed"], result["remaining"]) == (1, 1, 0)
+
+
+def test_stop_during_backoff_leaves_the_rest_pending(runners, monkeypatch):
+    first, _ = runners
+    job = first.create("Hello {first_name}", {}, RECIPIENTS)
+    calls = []
+
+    def post_sms(numbers, message):
+        calls.append(numbers)
+        first._stopping.set()  # Shutdown starts while this call is failing
+        raise SMSTransientError("mNotify returned HTTP 503")
+
+    monkeypatch.setattr(sms_service, "post_sms", post_sms)
+    assert first.send_next_chunk()
+
+    assert len(calls) == 1  # The other message was not posted during shutdown
+    result = first.get(job["id"])
+    assert [(chunk["status"], chunk["recipients"]) for chunk in result["chunk_results"]] == [("pending", 2)]
+    assert result["remaining"] == 2
+
+    first._stopping.clear()
+    monkeypatch.setattr(sms_service, "post_sms", lambda numbers, message: {"code": "2000"})
+    assert first.send_next_chunk()  # Resumed after the restart
+    assert first.get(job["id"])["sent"] == 2
@@ -0,0 +1,174 @@
+"""Duplicate-submission index: concurrent claims, cancellation and sharing between workers."""
+
+import asyncio
+
+import pytest
+
+from app import dedup
+from app.dedup import RegistrationIndex
+
+KEYS = ["name:ama mensah|phone:233241234567"]
+RESPONSE = {"name": "Ama Mensah", "sms_sent": True, "sms_message": "sent", "ticket": "T1"}
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = RegistrationIndex(str(tmp_path / "dedup.db"))
+    yield index
+    index.close()
+
+
+def test_concurrent_duplicates_are_saved_once(index):
+    saves = []
+
+    async def submit():
+        original = await index.claim(KEYS)
+        if original is not None:
+            return original
+        await asyncio.sleep(0.05)  # Saving
+        saves.append(1)
+        index.complete(KEYS, RESPONSE)
+        return RESPONSE
+
+    async def main():
+        return await asyncio.gather(*(submit() for _ in range(5)))
+
+    responses = asyncio.run(main())
+
+    assert len(saves) == 1
+    assert responses == [RESPONSE] * 5
+
+
+def test_failed_save_lets_the_waiting_duplicate_go_ahead(index):
+    async def main():
+        assert await index.claim(KEYS) is None
+        waiter = asyncio.create_task(index.claim(KEYS))
+        await asyncio.sleep(0.05)
+        assert not waiter.done()
+        index.release(KEYS)
+        return await asyncio.wait_for(waiter, 5)
+
+    assert asyncio.run(main()) is None  # The waiter now holds the reservation
+
+
+def test_cancelled_request_releases_its_claim(index):
+    async def handler():
+        reserved = []
+        try:
+            assert await index.claim(KEYS) is None
+            reserved = KEYS
+            await asyncio.sleep(60)  # Client disconnects while the save is in flight
+        finally:
+            index.release(reserved)
+
+    async def main():
+        request = asyncio.create_task(handler())
+        await asyncio.sleep(0.05)
+        request.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await request
+        return await asyncio.wait_for(index.claim(KEYS), 5)
+
+    assert asyncio.run(main()) is None
+
+
+def test_cancelled_waiter_does_not_disturb_the_claim(index):
+    async def main():
+        assert await index.claim(KEYS) is None
+        waiter = asyncio.create_task(index.claim(KEYS))
+        await asyncio.sleep(0.05)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        second = asyncio.create_task(index.claim(KEYS))
+        index.complete(KEYS, RESPONSE)
+        return await asyncio.wait_for(second, 5)
+
+    assert asyncio.run(main()) == RESPONSE
+
+
+def test_claim_cancelled_during_reservation_is_given_back(index):
+    async def main():
+        claim = asyncio.create_task(index.claim(KEYS))
+        await asyncio.sleep(0)  # Reservation submitted to the index thread
+        claim.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await claim
+        return await asyncio.wait_for(index.claim(KEYS), 5)
+
+    assert asyncio.run(main()) is None
+
+
+def test_duplicate_on_another_worker_gets_the_original_response(tmp_path):
+    path = str(tmp_path / "dedup.db")
+    first_worker, second_worker = RegistrationIndex(path), RegistrationIndex(path)
+
+    async def main():
+        assert await first_worker.claim(KEYS) is None
+        retry = asyncio.create_task(second_worker.claim(KEYS))
+        await asyncio.sleep(0.3)
+        assert not retry.done()  # Waits while the first worker is saving
+        first_worker.complete(KEYS, RESPONSE)
+        return await asyncio.wait_for(retry, 5)
+
+    try:
+        assert asyncio.run(main()) == RESPONSE
+    finally:
+        first_worker.close()
+        second_worker.close()
+
+
+def test_abandoned_reservation_is_taken_over(tmp_path, monkeypatch):
+    path = str(tmp_path / "dedup.db")
+    crashed_worker, second_worker = RegistrationIndex(path), RegistrationIndex(path)
+    monkeypatch.setattr(dedup, "PENDING_TIMEOUT_SECONDS", 0.0)
+
+    async def main():
+        assert await crashed_worker.claim(KEYS) is None
+        return await asyncio.wait_for(second_worker.claim(KEYS), 5)
+
+    try:
+        assert asyncio.run(main()) is None
+    finally:
+        crashed_worker.close()
+        second_worker.close()
+
+
+def test_claim_each_skips_duplicates_within_a_batch(index):
+    other = ["name:kofi boateng|phone:233201234567"]
+
+    async def main():
+        return await index.claim_each([KEYS, other, KEYS, []])
+
+    assert asyncio.run(main()) == [True, True, False, True]
+
+
+def test_duplicate_stops_waiting_for_a_stuck_save_on_another_worker(tmp_path, monkeypatch):
+    path = str(tmp_path / "dedup.db")
+    first_worker, second_worker = RegistrationIndex(path), RegistrationIndex(path)
+    monkeypatch.setattr(dedup, "pending_wait_seconds", lambda: 0.3)
+
+    async def main():
+        assert await first_worker.claim(KEYS) is None  # Its save never finishes
+        await second_worker.claim(KEYS)
+
+    try:
+        with pytest.raises(dedup.RegistrationPendingError) as error:
+            asyncio.run(asyncio.wait_for(main(), 5))
+        assert error.value.retry_after >= 1
+    finally:
+        first_worker.close()
+        second_worker.close()
+
+
+def test_duplicate_stops_waiting_for_a_stuck_save_on_the_same_worker(index, monkeypatch):
+    monkeypatch.setattr(dedup, "pending_wait_seconds", lambda: 0.1)
+
+    async def main():
+        assert await index.claim(KEYS) is None
+        with pytest.raises(dedup.RegistrationPendingError):
+            await index.claim(KEYS)
+        index.complete(KEYS, RESPONSE)  # The original still completes normally
+        return await index.claim(KEYS)
+
+    assert asyncio.run(asyncio.wait_for(main(), 5)) == RESPONSE
@@ -0,0 +1,67 @@
+"""Streaming registrations export and its resumable cursor."""
+
+import json
+
+import pytest
+
+from app.config import settings
+from app.export import InvalidCursorError, decode_cursor, encode_cursor
+from app.google_sheets import sheets_service
+
+from .conftest import ADMIN_HEADERS
+
+NAMES = [f"Exported Attendee {i}" for i in range(7)]
+
+
+@pytest.fixture
+def saved(sheets):
+    rows = [sheets_service.build_row({'full_name': name, 'church': "COP", 'city': "Accra"}) for name in NAMES]
+    sheets_service.append_rows(rows)
+    return sheets
+
+
+def export(client, **params) -> list[dict]:
+    response = client.get("/api/registrations/export", params={"format": "ndjson", **params}, headers=ADMIN_HEADERS)
+    assert response.status_code == 200
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor(42)) == (0, 42)
+    assert decode_cursor(encode_cursor(2, shard=3)) == (3, 2)
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(encode_cursor(1))  # The header row
+
+
+def test_resumed_export_continues_after_the_cursor(client, saved, monkeypatch):
+    monkeypatch.setattr(settings, "export_chunk_size", 3)  # Resume in the middle of a chunk
+
+    first = export(client, limit=4)
+    rest = export(client, cursor=first[-1]["cursor"])
+
+    assert [row["full_name"] for row in first + rest] == NAMES
+    assert len({row["cursor"] for row in first + rest}) == len(NAMES)
+
+
+def test_export_of_a_sharded_sheet_resumes_in_the_next_shard(client, sheets, monkeypatch):
+    monkeypatch.setattr(settings, "sheets_shard_policy", "rows")
+    monkeypatch.setattr(settings, "sheets_shard_rows", 3)
+    monkeypatch.setattr(settings, "export_chunk_size", 2)
+    sheets_service.invalidate()
+    for name in NAMES:
+        sheets_service.append_rows([sheets_service.build_row({'full_name': name, 'church': "COP", 'city': "Accra"})])
+    # The original worksheet stays first in the manifest
+    assert sheets_service.list_shards() == ["Sheet1", "Registrations 001", "Registrations 002", "Registrations 003"]
+
+    first = export(client, limit=3)  # Ends on the last row of the first shard
+    rest = export(client, cursor=first[-1]["cursor"])
+
+    assert [row["full_name"] for row in first + rest] == NAMES
+    assert decode_cursor(rest[0]["cursor"])[0] == 2
+
+
+def test_invalid_cursor_is_rejected(client):
+    response = client.get("/api/registrations/export", params={"cursor": "not-a-cursor"}, headers=ADMIN_HEADERS)
+
+    assert response.status_code == 400
+    assert response.json()["detail"]["error"] == "invalid_cursor"
@@ -0,0 +1,20 @@
+"""Health and readiness snapshots."""
+
+import asyncio
+
+from app.config import settings
+from app.health import health_prober
+from app.journal import registration_journal
+
+
+def test_queue_depths_use_the_last_journal_count(monkeypatch):
+    monkeypatch.setattr(settings, "journal_enabled", True)
+    monkeypatch.setattr(health_prober, "journal_backlog", 0)
+    monkeypatch.setattr(registration_journal, "backlog", lambda: 7)
+
+    # Reading the depths (every /api/ready and /metrics) never touches SQLite
+    assert health_prober.queue_depths()["journal_backlog"]["depth"] == 0
+
+    asyncio.run(health_prober.refresh_journal_backlog())
+
+    assert health_prober.queue_depths()["journal_backlog"]["depth"] == 7
@@ -0,0 +1,82 @@
+"""Registration journal: sync cursor, restarts and the sync lease."""
+
+import pytest
+
+from app.google_sheets import sheets_service
+from app.journal import RegistrationJournal
+
+
+def registrations(*names: str) -> list[dict]:
+    return [{'full_name': name, 'church': "COP", 'city': "Accra"} for name in names]
+
+
+def saved_names(sheets) -> list[str]:
+    return [row[1] for row in sheets.all_rows() if row and row[0] != "Timestamp"]
+
+
+@pytest.fixture
+def path(tmp_path) -> str:
+    return str(tmp_path / "registrations.db")
+
+
+def cursor(journal: RegistrationJournal) -> int:
+    return journal._connection().execute("SELECT last_id FROM sync_state").fetchone()[0]
+
+
+def test_sync_advances_the_cursor(sheets, path):
+    journal = RegistrationJournal(path)
+    journal.append_many(registrations("Ama Mensah", "Kofi Boateng"))
+    assert journal.backlog() == 2
+
+    assert journal.sync_once() == 2
+    assert journal.sync_once() == 0  # Nothing left to send
+
+    assert journal.backlog() == 0
+    assert cursor(journal) == 2
+    assert saved_names(sheets) == ["Ama Mensah", "Kofi Boateng"]
+
+
+def test_restart_continues_after_the_cursor(sheets, path):
+    journal = RegistrationJournal(path)
+    journal.append_many(registrations("Ama Mensah"))
+    journal.sync_once()
+    journal.append_many(registrations("Kofi Boateng"))
+    journal.stop()
+
+    restarted = RegistrationJournal(path)
+    assert restarted.unsynced_registrations() == registrations("Kofi Boateng")
+    assert restarted.sync_once() == 1
+
+    assert saved_names(sheets) == ["Ama Mensah", "Kofi Boateng"]
+
+
+def test_only_the_lease_holder_syncs(sheets, path):
+    first, second = RegistrationJournal(path), RegistrationJournal(path)
+    first.append_many(registrations("Ama Mensah"))
+    assert first.sync_once() == 1
+
+    second.append_many(registrations("Kofi Boateng"))
+    assert second.sync_once() == 0  # first still holds the lease
+
+    first.stop()  # Releases the lease
+    assert second.sync_once() == 1
+    assert saved_names(sheets) == ["Ama Mensah", "Kofi Boateng"]
+
+
+def test_lease_lost_during_the_append_leaves_the_cursor_to_the_new_owner(sheets, path, monkeypatch):
+    first, second = RegistrationJournal(path), RegistrationJournal(path)
+    first.append_many(registrations("Ama Mensah"))
+    append_rows = sheets_service.append_rows
+
+    def stalled_append(rows, mark_failed=True):
+        # The append outlives the lease and the other worker takes the sync over
+        first._connection().execute("UPDATE sync_state SET lease_until = 0")
+        assert second._acquire_lease(second._connection()) == 0
+        return append_rows(rows, mark_failed=mark_failed)
+
+    monkeypatch.setattr(sheets_service, "append_rows", stalled_append)
+    assert first.sync_once() == 0  # Not reported as synced
+
+    assert cursor(first) == 0
+    owner = first._connection().execute("SELECT owner FROM sync_state").fetchone()[0]
+    assert owner == second.owner
@@ -0,0 +1,125 @@
+"""Logging pipeline: correlation IDs, the bounded queue and JSON lines."""
+
+import json
+import logging
+import queue
+import sys
+
+import pytest
+
+from app.logging_setup import (
+    CorrelationFilter,
+    JsonFormatter,
+    NonBlockingQueueHandler,
+    SamplingFilter,
+    correlation_id,
+    new_correlation_id,
+)
+
+from .conftest import registration
+
+
+def record(message: str = "hello", level: int = logging.INFO, name: str = "app.test") -> logging.LogRecord:
+    return logging.LogRecord(name, level, __file__, 1, message, None, None)
+
+
+@pytest.fixture
+def route_records(caplog):
+    """Records logged by app.routes, stamped the way the pipeline's handler stamps them."""
+    log_queue = queue.Queue()
+    handler = NonBlockingQueueHandler(log_queue)
+    handler.addFilter(CorrelationFilter())
+    caplog.set_level(logging.INFO, logger="app.routes")
+    routes_logger = logging.getLogger("app.routes")
+    routes_logger.addHandler(handler)
+    yield log_queue
+    routes_logger.removeHandler(handler)
+
+
+def drain(log_queue: queue.Queue) -> list[logging.LogRecord]:
+    records = []
+    while not log_queue.empty():
+        records.append(log_queue.get_nowait())
+    return records
+
+
+def test_well_formed_request_ids_are_reused():
+    assert new_correlation_id("checkout-42.a_b") == "checkout-42.a_b"
+    for header in (None, "", "has spaces", "x" * 65, "line\nbreak"):
+        generated = new_correlation_id(header)
+        assert generated != header and len(generated) == 16
+
+
+def test_request_id_reaches_the_log_lines_and_the_response(client, route_records):
+    response = client.post("/api/register", json=registration("Logged Attendee"), headers={"X-Request-ID": "req-abc-123"})
+
+    assert response.status_code == 200
+    assert response.headers["X-Request-ID"] == "req-abc-123"
+    logged = [entry for entry in drain(route_records) if entry.getMessage() == "Processing new registration"]
+    assert [entry.correlation_id for entry in logged] == ["req-abc-123"]
+    assert correlation_id.get() == "-"  # Reset once the request is done
+
+
+def test_requests_without_an_id_get_a_fresh_one(client, route_records):
+    first = client.post("/api/register", json=registration("First Unnamed Request"))
+    second = client.post("/api/register", json=registration("Second Unnamed Request"), headers={"X-Request-ID": "bad id!"})
+
+    ids = [first.headers["X-Request-ID"], second.headers["X-Request-ID"]]
+    assert len(set(ids)) == 2 and "bad id!" not in ids
+    stamped = {entry.correlation_id for entry in drain(route_records) if entry.getMessage() == "Processing new registration"}
+    assert stamped == set(ids)
+
+
+def test_full_queue_drops_and_counts_instead_of_blocking():
+    handler = NonBlockingQueueHandler(queue.Queue(maxsize=1))
+
+    for i in range(3):
+        handler.handle(record(f"line {i}"))
+
+    assert handler.dropped == 2
+    assert handler.queue.get_nowait().getMessage() == "line 0"
+
+
+def test_records_are_queued_unformatted_with_the_traceback_rendered():
+    handler = NonBlockingQueueHandler(queue.Queue())
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        failed = logging.LogRecord("app.test", logging.ERROR, __file__, 1, "failed for %s", ("Ama",), sys.exc_info())
+
+    handler.handle(failed)
+
+    queued = handler.queue.get_nowait()
+    assert queued.msg == "failed for %s" and queued.args == ("Ama",)
+    assert queued.exc_info is None and "ValueError: boom" in queued.exc_text
+
+
+def test_json_lines_carry_the_correlation_id():
+    token = correlation_id.set("req-json")
+    try:
+        entry = record("saved %s")
+        entry.args = ("row",)
+        CorrelationFilter().filter(entry)
+    finally:
+        correlation_id.reset(token)
+
+    line = json.loads(JsonFormatter().format(entry))
+
+    assert line["message"] == "saved row"
+    assert line["correlation_id"] == "req-json"
+    assert line["level"] == "INFO" and line["logger"] == "app.test"
+
+
+def test_sampling_keeps_or_drops_a_whole_request():
+    sampler = SamplingFilter({"app": 0.5, "app.routes": 1.0})
+
+    assert sampler.rate_for("app.sms_service") == 0.5
+    assert sampler.rate_for("app.routes") == 1.0
+    assert sampler.filter(record(level=logging.WARNING))
+    for request_id in (f"req-{i}" for i in range(20)):
+        decisions = set()
+        for message in ("one", "two", "three"):
+            entry = record(message)
+            entry.correlation_id = request_id
+            decisions.add(sampler.filter(entry))
+        assert len(decisions) == 1
@@ -0,0 +1,42 @@
+"""What /metrics counts."""
+
+from app.config import settings
+from app.metrics import REGISTRATION_OUTCOMES
+
+from .conftest import ADMIN_HEADERS, registration
+
+
+def rate_limited() -> float:
+    return REGISTRATION_OUTCOMES.labels("rate_limited")._value.get()
+
+
+def test_only_rate_limited_registrations_are_counted(client, monkeypatch):
+    monkeypatch.setattr(settings, "suggest_rate_limit", "1/minute")
+    monkeypatch.setattr(settings, "register_rate_limit", "1/minute")
+    before = rate_limited()
+
+    suggestions = [client.get("/api/suggest", params={"field": "church", "q": "co"}) for _ in range(3)]
+    assert suggestions[-1].status_code == 429
+    assert rate_limited() == before
+
+    registrations = [client.post("/api/register", json=registration(f"Limited {i}", f"02422200{i:02d}")) for i in range(3)]
+    assert registrations[-1].status_code == 429
+    assert rate_limited() == before + 2
+
+
+def test_metrics_require_a_token(app_client, monkeypatch):
+    monkeypatch.setattr(settings, "metrics_token", "scrape-token")
+
+    assert app_client.get("/metrics").status_code == 401
+    assert app_client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
+    scraped = app_client.get("/metrics", headers={"Authorization": "Bearer scrape-token"})
+    assert scraped.status_code == 200
+    assert "iyc_registration_outcomes_total" in scraped.text
+    assert app_client.get("/metrics", headers=ADMIN_HEADERS).status_code == 200
+
+
+def test_metrics_are_disabled_without_tokens(app_client, monkeypatch):
+    monkeypatch.setattr(settings, "metrics_token", None)
+    monkeypatch.setattr(settings, "admin_token", None)
+
+    assert app_client.get("/metrics").status_code == 503
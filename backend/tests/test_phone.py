@@ -0,0 +1,54 @@
+"""Ghana phone number parsing and validation."""
+
+import pytest
+from pydantic import ValidationError
+
+from app.models import RegistrationRequest
+from app.phone import InvalidPhoneNumber, normalize_phone, parse_phone
+
+from .conftest import registration
+
+
+@pytest.mark.parametrize("value", [
+    "0241234567",
+    "+233241234567",
+    "233241234567",
+    "00233241234567",
+    "+2330241234567",
+    "+233 24 123 4567",
+    "00233 24 123 4567",
+    "024-123-4567",
+    "(024) 123.4567",
+])
+def test_common_formats_parse_to_the_same_number(value):
+    phone = parse_phone(value)
+
+    assert phone is not None
+    assert phone.e164 == "+233241234567"
+    assert phone.local == "0241234567"
+    assert phone.network == "MTN"
+
+
+@pytest.mark.parametrize("value", ["", "024123456", "02412345678", "+44 20 7946 0958", "0241234567x", "phone"])
+def test_other_values_are_rejected(value):
+    assert parse_phone(value) is None
+    with pytest.raises(InvalidPhoneNumber):
+        normalize_phone(value)
+
+
+def test_unknown_network_is_only_rejected_when_checked():
+    assert normalize_phone("0301234567", check_network=False).network is None
+    with pytest.raises(InvalidPhoneNumber):
+        normalize_phone("0301234567", check_network=True)
+
+
+@pytest.mark.parametrize("value", ["+233 24 123 4567", "00233 24 123 4567", "00233241234567"])
+def test_registration_accepts_spaced_and_00233_numbers(value):
+    request = RegistrationRequest(**registration(phone=value))
+
+    assert request.phone == "+233241234567"
+
+
+def test_registration_rejects_invalid_number():
+    with pytest.raises(ValidationError):
+        RegistrationRequest(**registration(phone="12345"))
@@ -0,0 +1,75 @@
+"""Rate-limit counters shared by workers through a SQLite file."""
+
+import time
+
+import pytest
+from limits import parse
+from limits.strategies import FixedWindowRateLimiter
+
+from app.config import settings
+from app.rate_limit import SQLiteStorage
+
+from .conftest import registration
+
+
+@pytest.fixture
+def uri(tmp_path) -> str:
+    return f"sqlite:///{tmp_path / 'rate-limits.db'}"
+
+
+def test_counter_starts_over_when_the_window_expires(uri):
+    storage = SQLiteStorage(uri)
+
+    assert storage.incr("ip", 0.2) == 1
+    assert storage.incr("ip", 0.2) == 2
+    assert storage.get("ip") == 2
+    time.sleep(0.25)
+
+    assert storage.get("ip") == 0
+    assert storage.incr("ip", 0.2) == 1
+    assert storage.get_expiry("ip") > time.time()
+
+
+def test_workers_share_one_counter(uri):
+    first_worker, second_worker = SQLiteStorage(uri), SQLiteStorage(uri)
+    limit = parse("3/minute")
+    limiters = [FixedWindowRateLimiter(first_worker), FixedWindowRateLimiter(second_worker)]
+
+    allowed = [limiters[i % 2].hit(limit, "register", "203.0.113.7") for i in range(4)]
+
+    assert allowed == [True, True, True, False]
+    assert not limiters[0].test(limit, "register", "203.0.113.7")
+
+
+def test_compact_removes_only_expired_counters(uri):
+    storage = SQLiteStorage(uri, compaction_interval=3600)
+    storage.incr("expired", 0.01)
+    storage.incr("current", 60)
+    time.sleep(0.05)
+
+    assert storage.compact() == 1
+    assert storage.get("current") == 1
+    count = storage._connection().execute("SELECT COUNT(*) FROM counters").fetchone()[0]
+    assert count == 1
+
+
+def test_expired_counters_are_compacted_on_a_later_hit(uri):
+    storage = SQLiteStorage(uri, compaction_interval=0)
+    storage.incr("expired", 0.01)
+    time.sleep(0.05)
+
+    storage.incr("current", 60)
+
+    keys = [key for (key,) in storage._connection().execute("SELECT key FROM counters")]
+    assert keys == ["current"]
+
+
+def test_register_answers_429_over_the_limit(client, monkeypatch):
+    monkeypatch.setattr(settings, "register_rate_limit", "2/minute")
+
+    statuses = [
+        client.post("/api/register", json=registration(f"Rate Limited {i}", f"02011100{i:02d}")).status_code
+        for i in range(3)
+    ]
+
+    assert statuses == [200, 200, 429]
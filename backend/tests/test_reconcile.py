@@ -0,0 +1,121 @@
+"""Sheet reconciliation: every finding, dry runs and --apply."""
+
+import json
+import sys
+
+from app import reconcile as reconcile_module
+from app.google_sheets import STATUS_COLUMN, sheets_service
+from app.reconcile import reconcile
+
+
+def person(name: str, **fields) -> dict:
+    return {'full_name': name, 'phone': "0241234567", 'church': "COP", 'city': "Accra", **fields}
+
+
+def save(*rows: tuple[dict, str]):
+    """Append (registration, status) rows; the first lands on sheet row 2."""
+    sheets_service.append_rows([sheets_service.build_row(data, status) for data, status in rows])
+
+
+def check_in(*tickets: str):
+    sheets_service.append_checkins([["2026-01-01 09:00:00", ticket, "", "door"] for ticket in tickets])
+
+
+def statuses() -> list[str]:
+    return [row[STATUS_COLUMN] for row in sheets_service.read_rows(2, 100)]
+
+
+def counts(report: dict) -> dict:
+    return {name: finding["count"] for name, finding in report["findings"].items() if finding["count"]}
+
+
+def test_each_kind_of_problem_is_found(sheets):
+    save(
+        (person("Ama Mensah"), 'Success'),
+        (person("AMA  mensah", phone="+233 24 123 4567"), 'Success'),  # Same person, other spelling
+        (person("Kofi Boateng"), 'Failed'),
+        (person("Kofi Boateng"), 'Success'),  # Registered again after the failure
+        (person("Esi Owusu", ticket="T-ESI"), 'Failed'),  # Checked in at the door
+        (person("Yaw Asante"), 'Failed'),
+        (person("No Church", church=""), 'Success'),
+    )
+    check_in("T-ESI")
+
+    report = reconcile()
+
+    findings = report["findings"]
+    assert report["rows_scanned"] == 7
+    assert findings["duplicate"]["sample_rows"] == ["Sheet1!3"]
+    assert findings["redundant_failed"]["sample_rows"] == ["Sheet1!4"]
+    assert findings["delivered_failed"]["sample_rows"] == ["Sheet1!6"]
+    assert findings["orphaned_failed"] == {"count": 1, "fix": None, "sample_rows": ["Sheet1!7"]}
+    assert findings["incomplete"]["sample_rows"] == ["Sheet1!8"]
+    assert report["rows_to_update"] == 4
+
+
+def test_dry_run_leaves_the_sheet_alone_and_apply_repairs_it(sheets):
+    save((person("Ama Mensah"), 'Success'), (person("Ama Mensah"), 'Success'), (person("Yaw Asante"), 'Failed'))
+
+    dry_run = reconcile()
+    assert dry_run["applied"] is False
+    assert statuses() == ['Success', 'Success', 'Failed']
+
+    applied = reconcile(apply=True)
+    assert applied["applied"] is True
+    assert counts(applied) == counts(dry_run) == {"duplicate": 1, "orphaned_failed": 1}
+    assert statuses() == ['Success', 'Duplicate', 'Failed']  # Orphaned failures are only reported
+
+    assert reconcile()["rows_to_update"] == 0
+
+
+def test_checked_in_failure_before_a_later_success_keeps_its_ticket(sheets):
+    save((person("Esi Owusu", ticket="T-1"), 'Failed'), (person("Esi Owusu", ticket="T-2"), 'Success'))
+    check_in("T-1")
+
+    report = reconcile(apply=True)
+
+    assert counts(report) == {"delivered_failed": 1, "duplicate": 1}
+    assert statuses() == ['Success', 'Duplicate']
+    assert reconcile()["rows_to_update"] == 0  # Nothing left for a second run
+
+
+def test_checked_in_failure_after_a_success_is_redundant(sheets):
+    save((person("Esi Owusu", ticket="T-1"), 'Success'), (person("Esi Owusu", ticket="T-2"), 'Failed'))
+    check_in("T-2")
+
+    report = reconcile(apply=True)
+
+    assert counts(report) == {"redundant_failed": 1}
+    assert statuses() == ['Success', 'Duplicate']
+    assert reconcile()["rows_to_update"] == 0
+
+
+def test_rows_are_read_in_chunks_across_shards(sheets, monkeypatch):
+    from app.config import settings
+
+    monkeypatch.setattr(settings, "sheets_shard_policy", "rows")
+    monkeypatch.setattr(settings, "sheets_shard_rows", 3)
+    sheets_service.invalidate()
+    for i in range(4):
+        save((person(f"Attendee {i}"), 'Success'))
+    save((person("Attendee 0"), 'Success'))  # Duplicate of a row in an earlier shard
+
+    report = reconcile(apply=True, chunk_size=2)
+
+    assert report["rows_scanned"] == 5
+    assert report["findings"]["duplicate"]["sample_rows"] == ["Registrations 002!3"]
+    assert sheets_service.read_rows(3, 1, "Registrations 002")[0][STATUS_COLUMN] == 'Duplicate'
+
+
+def test_command_line_is_a_dry_run_unless_asked_to_apply(sheets, monkeypatch, capsys):
+    save((person("Ama Mensah"), 'Success'), (person("Ama Mensah"), 'Success'))
+
+    monkeypatch.setattr(sys, "argv", ["reconcile"])
+    reconcile_module.main()
+    assert "re-run with --apply to update 1 row(s)" in capsys.readouterr().out
+    assert statuses() == ['Success', 'Success']
+
+    monkeypatch.setattr(sys, "argv", ["reconcile", "--apply", "--json"])
+    reconcile_module.main()
+    assert json.loads(capsys.readouterr().out)["applied"] is True
+    assert statuses() == ['Success', 'Duplicate']
@@ -0,0 +1,104 @@
+"""/api/register against the fake Sheets and mNotify backends."""
+
+from app.sms_dispatcher import sms_dispatcher
+from benchmarks.fakes import Profile
+
+from .conftest import registration, wait_for
+
+
+def saved_rows(sheets) -> list[list]:
+    return [row for row in sheets.all_rows() if row and row[0] != "Timestamp"]
+
+
+def test_registration_is_saved_and_confirmed(client, sheets, mnotify):
+    response = client.post("/api/register", json=registration("Kofi Boateng", "0241110001"))
+
+    assert response.status_code == 200
+    assert response.json()["data"]["ticket"]
+    assert len(saved_rows(sheets)) == 1
+    assert wait_for(lambda: mnotify.delivered == ["0241110001"])
+
+
+def test_failed_save_sends_no_sms(client, sheets, mnotify):
+    sheets.gate.profile = Profile(error_rate=1.0)
+
+    responses = [client.post("/api/register", json=registration(f"Yaw Owusu {i}", f"024111100{i}")) for i in range(3)]
+
+    assert all(response.status_code in (500, 503) for response in responses)
+    assert saved_rows(sheets) == []
+    sms_dispatcher._queue.join()
+    assert mnotify.delivered == []
+
+
+def test_retry_after_a_failed_save_sends_one_sms(client, sheets, mnotify):
+    payload = registration("Abena Addo", "0241110009")
+    headers = {"Idempotency-Key": "retry-test"}
+    sheets.gate.profile = Profile(error_rate=1.0)
+    assert client.post("/api/register", json=payload, headers=headers).status_code in (500, 503)
+
+    sheets.gate.profile = Profile()
+    response = client.post("/api/register", json=payload, headers=headers)
+
+    assert response.status_code == 200
+    assert len(saved_rows(sheets)) == 1
+    assert wait_for(lambda: mnotify.delivered == ["0241110009"])
+
+
+def test_retry_after_a_cancelled_save_gets_the_same_registration(client, sheets, monkeypatch):
+    import asyncio
+
+    from fastapi import Request, Response
+
+    from app import routes
+    from app.models import RegistrationRequest
+
+    saves, confirmations = [], []
+
+    async def slow_save(sanitized_data):
+        await asyncio.sleep(0.2)  # Still writing when the client gives up
+        saves.append(sanitized_data['full_name'])
+
+    async def confirm(sanitized_data):
+        confirmations.append(sanitized_data['phone'])
+        return False, "Confirmation SMS queued"
+
+    monkeypatch.setattr(routes, "save_registration", slow_save)
+    monkeypatch.setattr(routes, "send_confirmation", confirm)
+    register = routes.register_attendee.__wrapped__  # Without the rate limiter
+    payload = RegistrationRequest(**registration("Esi Quaye", "0241110010"))
+
+    def call():
+        request = Request({"type": "http", "method": "POST", "path": "/api/register", "headers": []})
+        response = Response()
+        return register(request, response, payload), response
+
+    async def main():
+        first, _ = call()
+        request = asyncio.create_task(first)
+        await asyncio.sleep(0.05)
+        request.cancel()  # Client disconnects mid-save
+        await asyncio.gather(request, return_exceptions=True)
+        retry, response = call()
+        result = await asyncio.wait_for(retry, 5)
+        return result, response
+
+    result, response = asyncio.run(main())
+
+    assert saves == ["Esi Quaye"]
+    assert len(confirmations) == 1
+    assert response.headers["Idempotent-Replayed"] == "true"
+    assert result.data["ticket"]
+
+
+def test_duplicate_of_a_registration_still_being_saved_is_told_to_retry(client, monkeypatch):
+    from app.dedup import RegistrationPendingError, registration_index
+
+    async def claim(keys):
+        raise RegistrationPendingError(5)
+
+    monkeypatch.setattr(registration_index, "claim", claim)
+    response = client.post("/api/register", json=registration("Kwame Asante", "0241110011"))
+
+    assert response.status_code == 409
+    assert response.headers["Retry-After"] == "5"
+    assert response.json()["detail"]["error"] == "registration_pending"
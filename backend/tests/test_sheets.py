@@ -0,0 +1,54 @@
+"""Worksheet sharding against the fake Google Sheets client."""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.fakes import FakeSheetsClient, Profile
+
+from app.config import settings
+from app.google_sheets import HEADERS, MANIFEST_WORKSHEET, SCHEMA_VERSION, GoogleSheetsService
+
+from .conftest import wait_for
+
+
+def test_prepared_shard_is_created_and_listed_once(monkeypatch):
+    monkeypatch.setattr(settings, "sheets_shard_policy", "rows")
+    fake = FakeSheetsClient(Profile(latency_ms=20))
+    service = GoogleSheetsService()
+    service.client = fake
+    service.ensure_connected()
+
+    # The background preparation and the rotation race for the same shard
+    service._prepare_shard("Registrations 002")
+    time.sleep(0.03)  # Preparation has created the worksheet but not written its header yet
+    service.shard_rows = settings.sheets_shard_rows + 1
+    service.rotate_shard(1)
+    assert wait_for(lambda: not service._preparing)
+
+    # The rotation waited for the preparation and knows the header row is already there
+    assert service.headers_version == SCHEMA_VERSION
+    assert service.shard_rows == 1
+
+    titles = [worksheet.title for worksheet in fake.spreadsheet.worksheets()]
+    manifest = fake.spreadsheet.worksheet(MANIFEST_WORKSHEET).get_all_values()
+    assert titles.count("Registrations 002") == 1
+    assert [row[0] for row in manifest].count("Registrations 002") == 1
+    assert service.shard_title == "Registrations 002"
+    assert fake.spreadsheet.worksheet("Registrations 002").rows == [HEADERS]
+
+
+def test_concurrent_first_appends_write_the_header_row_once():
+    fake = FakeSheetsClient(Profile(latency_ms=20))
+    service = GoogleSheetsService()
+    service.client = fake
+    rows = [service.build_row(registration) for registration in (
+        {'full_name': f"Attendee {i}", 'church': "COP", 'city': "Accra"} for i in range(4)
+    )]
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        assert all(result == [True] for result in pool.map(lambda row: service.append_rows([row]), rows))
+
+    values = fake.all_rows()
+    assert values.count(HEADERS) == 1
+    assert values[0] == HEADERS
+    assert len(values) == 5
@@ -0,0 +1,97 @@
+"""Google Sheets circuit breaker state transitions."""
+
+import time
+
+from app.sheets_quota import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+RESET_SECONDS = 0.05
+
+
+def open_breaker() -> CircuitBreaker:
+    breaker = CircuitBreaker(threshold=3, reset_seconds=RESET_SECONDS)
+    for _ in range(3):
+        breaker.record_failure(overload=True)
+    return breaker
+
+
+def test_opens_after_threshold_consecutive_overloads():
+    breaker = CircuitBreaker(threshold=3, reset_seconds=RESET_SECONDS)
+
+    breaker.record_failure(overload=True)
+    breaker.record_failure(overload=True)
+    assert breaker.state == CLOSED
+    assert breaker.allow()
+
+    breaker.record_failure(overload=True)
+    assert breaker.state == OPEN
+    assert breaker.trips == 1
+    assert not breaker.allow()
+    assert 0 < breaker.retry_after() <= RESET_SECONDS
+
+
+def test_success_or_other_errors_reset_the_count():
+    breaker = CircuitBreaker(threshold=3, reset_seconds=RESET_SECONDS)
+
+    breaker.record_failure(overload=True)
+    breaker.record_failure(overload=True)
+    breaker.record_success()
+    breaker.record_failure(overload=True)
+    breaker.record_failure(overload=False)  # e.g. a 404: Google answered
+    breaker.record_failure(overload=True)
+
+    assert breaker.state == CLOSED
+    assert breaker.failures == 1
+
+
+def test_one_trial_call_after_the_reset_time():
+    breaker = open_breaker()
+    time.sleep(RESET_SECONDS)
+
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow()  # Only one trial at a time
+
+
+def test_successful_trial_closes():
+    breaker = open_breaker()
+    time.sleep(RESET_SECONDS)
+    breaker.allow()
+
+    breaker.record_success()
+
+    assert breaker.state == CLOSED
+    assert breaker.failures == 0
+    assert breaker.allow()
+
+
+def test_overloaded_trial_reopens():
+    breaker = open_breaker()
+    time.sleep(RESET_SECONDS)
+    breaker.allow()
+
+    breaker.record_failure(overload=True)
+
+    assert breaker.state == OPEN
+    assert breaker.trips == 2
+    assert not breaker.allow()
+
+
+def test_trial_that_reached_google_closes():
+    breaker = open_breaker()
+    time.sleep(RESET_SECONDS)
+    breaker.allow()
+
+    breaker.record_failure(overload=False)
+
+    assert breaker.state == CLOSED
+
+
+def test_unused_trial_is_given_back():
+    breaker = open_breaker()
+    time.sleep(RESET_SECONDS)
+    breaker.allow()
+
+    breaker.release_trial()  # Quota refused the call before it went out
+
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
@@ -0,0 +1,78 @@
+"""SMS dispatcher: coalescing and its configuration checks."""
+
+import logging
+
+import pytest
+
+from app.config import settings
+from app.sms_dispatcher import SMSDispatcher
+from app.sms_service import sms_service
+
+
+@pytest.fixture
+def posts(monkeypatch):
+    """mNotify calls made by a single-worker dispatcher, as (numbers, message)."""
+    calls = []
+
+    def post_sms(numbers, message):
+        calls.append((numbers, message))
+        return {"code": "2000"}
+
+    monkeypatch.setattr(sms_service, "post_sms", post_sms)
+    monkeypatch.setattr(settings, "sms_dispatch_workers", 1)
+    monkeypatch.setattr(settings, "sms_coalesce_enabled", True)
+    monkeypatch.setattr(settings, "sms_coalesce_window_ms", 300)
+    return calls
+
+
+def enqueue_three(dispatcher: SMSDispatcher):
+    dispatcher.enqueue("0241234567", "Ama Mensah", "T1")
+    dispatcher.enqueue("0201234567", "Kofi Boateng", "T2")
+    dispatcher.enqueue("0541234567", "Yaw Owusu", "T3")
+    dispatcher._queue.join()
+    dispatcher.stop()
+
+
+def test_identical_confirmations_are_merged_into_one_call(posts, monkeypatch):
+    monkeypatch.setattr(settings, "sms_personalize_confirmation", False)
+    monkeypatch.setattr(settings, "sms_include_ticket", False)
+    dispatcher = SMSDispatcher()
+
+    enqueue_three(dispatcher)
+
+    assert len(posts) == 1
+    assert posts[0][0] == ["0241234567", "0201234567", "0541234567"]
+    assert dispatcher.sent == 3
+
+
+def test_unique_confirmations_are_sent_without_waiting(posts, monkeypatch):
+    monkeypatch.setattr(settings, "sms_personalize_confirmation", True)
+    monkeypatch.setattr(settings, "sms_include_ticket", True)
+    monkeypatch.setattr(settings, "sms_coalesce_window_ms", 60_000)
+    dispatcher = SMSDispatcher()
+
+    enqueue_three(dispatcher)  # Would take a minute if the window applied
+
+    assert [numbers for numbers, _ in posts] == [["0241234567"], ["0201234567"], ["0541234567"]]
+
+
+def test_coalescing_with_unique_messages_warns_at_start(monkeypatch, caplog):
+    monkeypatch.setattr(settings, "sms_coalesce_enabled", True)
+    monkeypatch.setattr(settings, "sms_personalize_confirmation", True)
+    monkeypatch.setattr(settings, "sms_include_ticket", True)
+    dispatcher = SMSDispatcher()
+
+    with caplog.at_level(logging.WARNING, logger="app.sms_dispatcher"):
+        dispatcher.start()
+    dispatcher.stop()
+
+    assert "SMS_PERSONALIZE_CONFIRMATION and SMS_INCLUDE_TICKET" in caplog.text
+
+
+def test_coalescing_blockers(monkeypatch):
+    monkeypatch.setattr(settings, "sms_personalize_confirmation", False)
+    monkeypatch.setattr(settings, "sms_include_ticket", False)
+    assert SMSDispatcher.coalescing_blockers() == []
+
+    monkeypatch.setattr(settings, "sms_include_ticket", True)
+    assert SMSDispatcher.coalescing_blockers() == ["SMS_INCLUDE_TICKET"]
@@ -0,0 +1,103 @@
+"""Registration statistics shared between workers."""
+
+import asyncio
+
+from app import stats as stats_module
+from app.stats import RegistrationStats
+
+from .conftest import ADMIN_HEADERS, registration
+
+
+def test_workers_report_the_same_counts(tmp_path):
+    path = str(tmp_path / "stats.db")
+    first_worker, second_worker = RegistrationStats(path), RegistrationStats(path)
+
+    async def main():
+        await first_worker.add_many([
+            {"church": "COP", "city": "Accra"},
+            {"church": " cop ", "city": "Kumasi"},
+        ])
+        await second_worker.add_many([{"church": "ICGC", "city": "Accra"}])
+        return await first_worker.snapshot(), await second_worker.snapshot()
+
+    (first, first_etag), (second, second_etag) = asyncio.run(main())
+
+    assert first == second
+    assert first_etag == second_etag
+    assert first["total"] == 3
+    assert first["by_church"] == {"COP": 2, "ICGC": 1}
+    assert first["by_city"] == {"Accra": 2, "Kumasi": 1}
+
+
+def test_rebuild_replaces_the_counts_and_changes_the_etag(tmp_path):
+    stats = RegistrationStats(str(tmp_path / "stats.db"))
+    counted = [{"church": "COP", "ticket": f"T{i}"} for i in range(3)]
+
+    async def main():
+        await stats.add_many(counted)
+        _, before = await stats.snapshot()
+        # The sheet has them under a corrected church, plus one whose update was missed
+        stats.rebuild([{**registration, "church": "ICGC"} for registration in counted] + [{"church": "ICGC"}])
+        return before, await stats.snapshot()
+
+    before, (body, after) = asyncio.run(main())
+
+    assert before != after
+    assert body["total"] == 4
+    assert body["by_church"] == {"ICGC": 4}
+    assert body["reconciled_at"] is not None
+
+
+def test_registration_counted_during_a_rebuild_is_kept(tmp_path):
+    stats = RegistrationStats(str(tmp_path / "stats.db"))
+
+    async def main():
+        await stats.add_many([{"church": "COP", "ticket": "T1"}])
+        sheet = [{"church": "COP", "ticket": "T1"}]  # Read before the next one was saved
+        await stats.add_many([{"church": "ICGC", "ticket": "T2"}])
+        stats.rebuild(sheet)
+        first, _ = await stats.snapshot()
+        stats.rebuild(sheet + [{"church": "ICGC", "ticket": "T2"}])  # Next read has it
+        second, _ = await stats.snapshot()
+        return first, second
+
+    first, second = asyncio.run(main())
+
+    assert first["total"] == second["total"] == 2
+    assert first["by_church"] == second["by_church"] == {"COP": 1, "ICGC": 1}
+
+
+def test_removed_registration_drops_out_after_the_grace_period(tmp_path, monkeypatch):
+    stats = RegistrationStats(str(tmp_path / "stats.db"))
+    monkeypatch.setattr(stats_module, "PENDING_GRACE_SECONDS", 0.0)
+
+    async def main():
+        await stats.add_many([{"church": "COP", "ticket": "T1"}])
+        stats.rebuild([])  # Marked as a duplicate and no longer counted by the sheet
+        return await stats.snapshot()
+
+    body, _ = asyncio.run(main())
+
+    assert body["total"] == 0
+
+
+def test_one_worker_at_a_time_rebuilds(tmp_path):
+    path = str(tmp_path / "stats.db")
+    first_worker, second_worker = RegistrationStats(path), RegistrationStats(path)
+
+    assert first_worker._acquire_lease()
+    assert first_worker._acquire_lease()  # Renewed by its holder
+    assert not second_worker._acquire_lease()
+
+    first_worker._release_lease()  # Shutdown
+    assert second_worker._acquire_lease()
+
+
+def test_stats_endpoint_counts_new_registrations(client):
+    before = client.get("/api/stats", headers=ADMIN_HEADERS)
+    client.post("/api/register", json=registration("Stats Counted", "0241110001", church="Stats Church"))
+    after = client.get("/api/stats", headers={**ADMIN_HEADERS, "If-None-Match": before.headers["ETag"]})
+
+    assert after.status_code == 200
+    assert after.json()["total"] == before.json()["total"] + 1
+    assert after.json()["by_church"]["Stats Church"] == 1
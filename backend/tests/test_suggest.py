@@ -0,0 +1,76 @@
+"""Typeahead suggestions: word-start matching, ranking and SUGGEST_MIN_COUNT."""
+
+from app.config import settings
+from app.suggest import FieldIndex, SuggestionIndex
+
+
+def index_with(values: list[str]) -> FieldIndex:
+    index = FieldIndex()
+    for value in values:
+        index.add(value)
+    return index
+
+
+def test_most_used_values_come_first(monkeypatch):
+    monkeypatch.setattr(settings, "suggest_min_count", 1)
+    index = index_with(["Pentecost University"] + ["The Church of Pentecost"] * 3 + ["Pent House"] * 2)
+
+    assert index.search("pent", 10) == ["The Church of Pentecost", "Pent House", "Pentecost University"]
+    assert index.search("pent", 2) == ["The Church of Pentecost", "Pent House"]
+
+
+def test_any_word_matches_whatever_the_case_and_spacing(monkeypatch):
+    monkeypatch.setattr(settings, "suggest_min_count", 1)
+    index = index_with(["Calvary  Charismatic Centre", "calvary charismatic centre"])
+
+    assert index.search("CHARIS", 5) == ["Calvary Charismatic Centre"]
+    assert index.counts["calvary charismatic centre"] == 2
+    assert index.search("centre x", 5) == []
+
+
+def test_typed_values_need_the_minimum_count(monkeypatch):
+    monkeypatch.setattr(settings, "suggest_min_count", 2)
+    index = index_with(["Bethel Revival Church"])
+
+    assert index.search("beth", 5) == []  # Typed once: could be a typo
+
+    index.add("bethel revival church")
+    assert index.search("beth", 5) == ["Bethel Revival Church"]
+
+
+def test_curated_values_are_suggested_before_anyone_uses_them(monkeypatch):
+    monkeypatch.setattr(settings, "suggest_min_count", 5)
+    index = FieldIndex()
+    index.add("Ashesi University", curated=True)
+    index.add("ashesi  university")
+
+    assert index.search("ash", 5) == ["Ashesi University"]
+
+
+def test_cached_answer_changes_when_a_value_is_added(monkeypatch):
+    monkeypatch.setattr(settings, "suggest_min_count", 1)
+    index = index_with(["Kasoa"])
+    assert index.search("ka", 5) == ["Kasoa"]
+
+    index.add("Kaneshie")
+    index.add("Kaneshie")
+
+    assert index.search("ka", 5) == ["Kaneshie", "Kasoa"]
+
+
+def test_rebuild_counts_saved_registrations(monkeypatch):
+    monkeypatch.setattr(settings, "suggest_min_count", 2)
+    suggestions = SuggestionIndex()
+
+    suggestions.rebuild([{'city': "Nsawam"}, {'city': "Nsawam"}, {'city': "Nsuta"}])
+
+    assert suggestions.suggest("city", "ns") == ["Nsawam"]
+    assert suggestions.suggest("city", "tama")[0] == "Tamale"  # Curated list kept
+
+
+def test_suggest_endpoint(client):
+    response = client.get("/api/suggest", params={"field": "church", "q": "pentecost"})
+
+    assert response.status_code == 200
+    assert "The Church of Pentecost" in response.json()["suggestions"]
+    assert response.headers["Cache-Control"] == f"public, max-age={settings.suggest_cache_seconds}"
@@ -0,0 +1,56 @@
+"""Signed tickets and the shared check-in store."""
+
+from app.tickets import TicketIndex, format_ticket, issue_ticket, verify_ticket
+
+from .conftest import ADMIN_HEADERS, registration
+
+
+def test_issued_ticket_verifies():
+    ticket = issue_ticket()
+
+    assert len(ticket) == 16
+    assert verify_ticket(ticket) == ticket
+
+
+def test_verify_ignores_case_and_dashes():
+    ticket = issue_ticket()
+
+    assert verify_ticket(format_ticket(ticket).lower()) == ticket
+
+
+def test_tampered_ticket_is_rejected():
+    ticket = issue_ticket()
+    tampered = ("A" if ticket[0] != "A" else "B") + ticket[1:]
+
+    assert verify_ticket(tampered) is None
+
+
+def test_malformed_tickets_are_rejected():
+    assert verify_ticket("") is None
+    assert verify_ticket("not a ticket!") is None
+    assert verify_ticket(issue_ticket()[:8]) is None
+
+
+def test_check_in_is_shared_between_workers(tmp_path):
+    path = str(tmp_path / "checkins.db")
+    first_worker, second_worker = TicketIndex(path), TicketIndex(path)
+    ticket = issue_ticket()
+    first_worker.add({"ticket": ticket, "full_name": "Esi Quaye", "church": "COP"})
+
+    first, checked_in_at = second_worker.check_in(ticket)
+    again, again_at = first_worker.check_in(ticket)
+
+    assert first and not again
+    assert again_at == checked_in_at
+    assert second_worker.holder(ticket) == {"name": "Esi Quaye", "church": "COP"}
+
+
+def test_checkin_endpoint(client):
+    ticket = client.post("/api/register", json=registration("Kojo Darko", "0241120001")).json()["data"]["ticket"]
+
+    first = client.post(f"/api/checkin/{format_ticket(ticket)}", headers=ADMIN_HEADERS).json()
+    second = client.post(f"/api/checkin/{ticket}", headers=ADMIN_HEADERS).json()
+
+    assert first["name"] == "Kojo Darko" and not first["already_checked_in"]
+    assert second["already_checked_in"] and second["checked_in_at"] == first["checked_in_at"]
+    assert client.post("/api/checkin/AAAAAAAAAAAAAAAA", headers=ADMIN_HEADERS).status_code == 400
@@ -0,0 +1,257 @@
+"""
+Responsive image build for the static frontend.
+
+Resizes the slideshow photos and the logo into AVIF and WebP variants at
+several widths (never upscaled), plus a JPEG/PNG fallback and a tiny
+blurred placeholder inlined as a data URI. Output files are named after a
+hash of their content, so they can be cached forever, and identical source
+files (e.g. the two copies of the logo) are encoded only once.
+
+The result is written to frontend/assets/dist/manifest.json, and every
+`<picture data-asset="...">` element in the HTML pages is regenerated from
+it (srcset, sizes, dimensions and lazy loading). Variants no longer in the
+manifest are deleted.
+
+Usage (from the backend directory):
+    pip install -r tools/requirements.txt
+    python -m tools.build_images
+    python -m tools.build_images --check   # fail if the committed output is stale
+"""
+
+import argparse
+import base64
+import hashlib
+import html
+import io
+import json
+import re
+import sys
+from pathlib import Path
+
+from PIL import Image, ImageFilter
+
+FRONTEND_DIR = Path(__file__).resolve().parent.parent.parent / "frontend"
+
+# Generated files, relative to the frontend directory
+OUTPUT_DIR = "assets/dist"
+MANIFEST = f"{OUTPUT_DIR}/manifest.json"
+
+HTML_PAGES = ("index.html", "thank-you.html")
+
+# Source images (globs relative to the frontend directory): (widths generated,
+# width of the JPEG/PNG fallback for browsers without AVIF/WebP)
+IMAGE_SETS = {
+    "assets/images/slideshow/*.jpg": ((480, 800, 1080, 1280), 800),
+    "assets/images/logo.png": ((80, 160, 240), 160),
+    "assets/logo/*.png": ((80, 160, 240), 160),
+}
+
+# Modern formats, best first (the order of the <source> elements)
+FORMATS = {
+    "avif": {"quality": 50},
+    "webp": {"quality": 72, "method": 6},
+}
+
+JPEG_OPTIONS = {"quality": 78, "optimize": True, "progressive": True}
+
+PLACEHOLDER_WIDTH = 24
+
+_PICTURE = re.compile(r'(?P<indent>[ \t]*)<picture\b(?P<attrs>[^>]*)>(?P<body>.*?)</picture>', re.DOTALL)
+_ATTRIBUTE = re.compile(r'([\w-]+)(?:="([^"]*)")?')
+_IMG = re.compile(r"<img\b([^>]*)>", re.DOTALL)
+
+# <img> attributes the build regenerates; everything else (alt, class, id, ...) is kept
+_GENERATED = {"src", "srcset", "sizes", "width", "height", "loading", "decoding", "fetchpriority", "data-src", "data-srcset"}
+
+
+def content_name(stem: str, width: int, data: bytes, ext: str) -> str:
+    digest = hashlib.sha256(data).hexdigest()[:10]
+    return f"{OUTPUT_DIR}/{stem}-{width}.{digest}.{ext}"
+
+
+def encode(image: Image.Image, ext: str) -> bytes:
+    buffer = io.BytesIO()
+    if ext == "jpg":
+        image.convert("RGB").save(buffer, "JPEG", **JPEG_OPTIONS)
+    elif ext == "png":
+        image.save(buffer, "PNG", optimize=True)
+    else:
+        image.save(buffer, ext.upper(), **FORMATS[ext])
+    return buffer.getvalue()
+
+
+def resize(image: Image.Image, width: int) -> Image.Image:
+    if width >= image.width:
+        return image
+    height = round(image.height * width / image.width)
+    return image.resize((width, height), Image.LANCZOS)
+
+
+def placeholder(image: Image.Image) -> str:
+    """Tiny blurred WebP as a data URI (a few hundred bytes, shown until the real image loads)."""
+    small = resize(image, PLACEHOLDER_WIDTH).filter(ImageFilter.GaussianBlur(1))
+    data = encode(small, "webp")
+    return "data:image/webp;base64," + base64.b64encode(data).decode()
+
+
+def build_asset(path: Path, widths: tuple, fallback_width: int, outputs: dict[str, bytes]) -> dict:
+    """
+    Encode every variant of one source image.
+
+    Args:
+        path: Source image
+        widths: Target widths (capped at the source width)
+        fallback_width: Width of the JPEG/PNG fallback
+        outputs: Collects {relative output path: bytes}
+
+    Returns:
+        dict: Manifest entry
+    """
+    image = Image.open(path)
+    image.load()
+    has_alpha = image.mode in ("RGBA", "LA") or "transparency" in image.info
+    image = image.convert("RGBA" if has_alpha else "RGB")
+    widths = sorted({min(width, image.width) for width in widths})
+
+    def write(width: int, ext: str) -> dict:
+        variant = resize(image, width)
+        data = encode(variant, ext)
+        name = content_name(path.stem, variant.width, data, ext)
+        outputs[name] = data
+        return {"src": name, "width": variant.width, "height": variant.height, "bytes": len(data)}
+
+    return {
+        "width": image.width,
+        "height": image.height,
+        "sources": {ext: [write(width, ext) for width in widths] for ext in FORMATS},
+        "fallback": write(min(fallback_width, image.width), "png" if has_alpha else "jpg"),
+        "placeholder": placeholder(image),
+    }
+
+
+def build_manifest() -> tuple[dict, dict[str, bytes]]:
+    """
+    Returns:
+        tuple: (manifest, {relative output path: bytes})
+    """
+    assets, aliases, outputs = {}, {}, {}
+    by_digest: dict[str, str] = {}
+    for pattern, (widths, fallback_width) in IMAGE_SETS.items():
+        for path in sorted(FRONTEND_DIR.glob(pattern)):
+            name = path.relative_to(FRONTEND_DIR).as_posix()
+            digest = hashlib.sha256(path.read_bytes()).hexdigest()
+            if digest in by_digest:
+                aliases[name] = by_digest[digest]
+                print(f"  {name}: identical to {by_digest[digest]}, not encoded again")
+                continue
+            by_digest[digest] = name
+            assets[name] = build_asset(path, widths, fallback_width, outputs)
+            total = sum(variant["bytes"] for variant in assets[name]["sources"]["webp"])
+            print(f"  {name}: {path.stat().st_size / 1024:.0f} KB -> {len(assets[name]['sources']['webp'])} widths ({total / 1024:.0f} KB of WebP)")
+    return {"version": 1, "assets": assets, "aliases": aliases}, outputs
+
+
+def srcset(variants: list[dict]) -> str:
+    return ", ".join(f"{variant['src']} {variant['width']}w" for variant in variants)
+
+
+def render_picture(match: re.Match, manifest: dict) -> str:
+    """Regenerate one <picture data-asset="..."> element from the manifest."""
+    attrs = dict(_ATTRIBUTE.findall(match.group("attrs")))
+    name = manifest["aliases"].get(attrs["data-asset"], attrs["data-asset"])
+    entry = manifest["assets"].get(name)
+    if entry is None:
+        raise SystemExit(f"<picture data-asset=\"{attrs['data-asset']}\"> has no entry in the manifest")
+    sizes = attrs.get("data-sizes", "100vw")
+    loading = attrs.get("data-loading", "lazy")  # eager, lazy or deferred (swapped in by app.js)
+    deferred = loading == "deferred"
+
+    img = _IMG.search(match.group("body"))
+    kept = [(key, value) for key, value in _ATTRIBUTE.findall(img.group(1) if img else "") if key not in _GENERATED]
+    fallback = entry["fallback"]
+    img_attrs = [("src", entry["placeholder"] if deferred else fallback["src"])]
+    if deferred:
+        img_attrs.append(("data-src", fallback["src"]))
+    img_attrs += [("width", str(entry["width"])), ("height", str(entry["height"]))]
+    img_attrs += kept
+    if deferred:
+        # Blurred until app.js swaps in the real image
+        classes = dict(img_attrs).get("class", "").split()
+        if "is-placeholder" not in classes:
+            img_attrs = [item for item in img_attrs if item[0] != "class"]
+            img_attrs.append(("class", " ".join(classes + ["is-placeholder"])))
+    if loading != "eager":
+        img_attrs.append(("loading", "lazy"))
+    elif "data-priority" in attrs:
+        img_attrs.append(("fetchpriority", attrs["data-priority"]))
+    img_attrs.append(("decoding", "async"))
+
+    indent = match.group("indent")
+    inner = indent + "    "
+    srcset_attr = "data-srcset" if deferred else "srcset"
+    lines = [f"{indent}<picture{match.group('attrs')}>"]
+    for ext, variants in entry["sources"].items():
+        lines.append(f'{inner}<source type="image/{ext}" {srcset_attr}="{srcset(variants)}" sizes="{sizes}">')
+    rendered = " ".join(f'{key}="{html.escape(value)}"' if value or key == "alt" else key for key, value in img_attrs)
+    lines.append(f"{inner}<img {rendered}>")
+    lines.append(f"{indent}</picture>")
+    return "\n".join(lines)
+
+
+def render_pages(manifest: dict) -> dict[str, str]:
+    """
+    Returns:
+        dict: {page: new HTML} for every page whose <picture> elements changed
+    """
+    changed = {}
+    for page in HTML_PAGES:
+        path = FRONTEND_DIR / page
+        text = path.read_text(encoding="utf-8")
+        rendered = _PICTURE.sub(lambda match: render_picture(match, manifest), text)
+        if rendered != text:
+            changed[page] = rendered
+    return changed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build responsive, content-hashed frontend images")
+    parser.add_argument("--check", action="store_true", help="Only verify the committed output is up to date")
+    args = parser.parse_args()
+
+    print(f"Building images in {FRONTEND_DIR}")
+    manifest, outputs = build_manifest()
+    manifest_text = json.dumps(manifest, indent=2) + "\n"
+    pages = render_pages(manifest)
+
+    output_dir = FRONTEND_DIR / OUTPUT_DIR
+    existing = {path.relative_to(FRONTEND_DIR).as_posix() for path in output_dir.glob("*") if path.name != "manifest.json"}
+    missing = sorted(set(outputs) - existing)
+    stale = sorted(existing - set(outputs))
+    manifest_path = FRONTEND_DIR / MANIFEST
+    manifest_changed = not manifest_path.exists() or manifest_path.read_text(encoding="utf-8") != manifest_text
+
+    if args.check:
+        problems = [f"missing {name}" for name in missing] + [f"stale {name}" for name in stale]
+        problems += [f"{page} is out of date" for page in pages]
+        if manifest_changed:
+            problems.append(f"{MANIFEST} is out of date")
+        if problems:
+            print("\nFAILED: " + "; ".join(problems) + "\nRun python -m tools.build_images")
+            sys.exit(1)
+        print("\nImages are up to date")
+        return
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    for name in missing:
+        (FRONTEND_DIR / name).write_bytes(outputs[name])
+    for name in stale:
+        (FRONTEND_DIR / name).unlink()
+    if manifest_changed:
+        manifest_path.write_text(manifest_text, encoding="utf-8")
+    for page, text in pages.items():
+        (FRONTEND_DIR / page).write_text(text, encoding="utf-8")
+    print(f"\nWrote {len(missing)} file(s), removed {len(stale)}, updated {len(pages)} page(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,6 +11,9 @@ const CONFIG = {
         ? 'http://localhost:8000/api'
         : 'https://iyc-registration-form.onrender.com/api',  // Render backend URL
     slideInterval: 5000, // 5 seconds
+    suggestDelay: 250, // Wait this long after the last keystroke before asking for suggestions
+    busyRetries: 3, // Resubmit this many times when the server answers 503 (or 409) with Retry-After
+    maxRetryDelay: 60, // Never wait longer than this (seconds) between attempts
 };
 
 // ============================================
@@ -37,6 +40,13 @@ class Slideshow {
         // Start autoplay
         this.startAutoPlay();
 
+        // Fetch the next slide once the page itself has finished loading
+        if (document.readyState === 'complete') {
+            this.loadSlide(1);
+        } else {
+            window.addEventListener('load', () => this.loadSlide(1), { once: true });
+        }
+
         // Pause on hover
         const slideshow = document.getElementById('slideshow');
         slideshow.addEventListener('mouseenter', () => this.stopAutoPlay());
@@ -53,7 +63,27 @@ class Slideshow {
         }
     }
 
+    loadSlide(index) {
+        // Slides other than the first ship a blurred placeholder; swap in the
+        // real image (srcset from the image build) before the slide is shown
+        const slide = this.slides[index];
+        if (!slide) return;
+        slide.querySelectorAll('source[data-srcset]').forEach(source => {
+            source.srcset = source.dataset.srcset;
+            source.removeAttribute('data-srcset');
+        });
+        slide.querySelectorAll('img[data-src]').forEach(img => {
+            img.addEventListener('load', () => img.classList.remove('is-placeholder'), { once: true });
+            img.src = img.dataset.src;
+            img.removeAttribute('data-src');
+        });
+    }
+
     showSlide(index) {
+        // Load this slide and the one after it
+        this.loadSlide(index);
+        this.loadSlide((index + 1) % this.totalSlides);
+
         // Remove active class from all slides and dots
         this.slides.forEach(slide => slide.classList.remove('active'));
         document.querySelectorAll('.dot').forEach(dot => dot.classList.remove('active'));
@@ -93,6 +123,68 @@ class Slideshow {
     }
 }
 
+// ============================================
+// TYPEAHEAD SUGGESTIONS
+// ============================================
+
+class Typeahead {
+    constructor(fieldId) {
+        this.input = document.getElementById(fieldId);
+        this.list = document.getElementById(`${fieldId}Suggestions`);
+        this.field = fieldId;
+        this.timer = null;
+        this.cache = new Map();
+        this.controller = null;
+        if (this.input && this.list) {
+            this.input.addEventListener('input', () => this.schedule());
+        }
+    }
+
+    schedule() {
+        // Debounce: only the last keystroke in a burst triggers a request
+        clearTimeout(this.timer);
+        this.timer = setTimeout(() => this.update(), CONFIG.suggestDelay);
+    }
+
+    async update() {
+        const query = this.input.value.trim().toLowerCase();
+        if (query.length < 2) {
+            this.render([]);
+            return;
+        }
+        if (this.cache.has(query)) {
+            this.render(this.cache.get(query));
+            return;
+        }
+
+        // Drop the answer to a query the user has already typed past
+        if (this.controller) {
+            this.controller.abort();
+        }
+        this.controller = new AbortController();
+        try {
+            const params = new URLSearchParams({ field: this.field, q: query });
+            const response = await fetch(`${CONFIG.apiUrl}/suggest?${params}`, { signal: this.controller.signal });
+            if (!response.ok) {
+                return;
+            }
+            const { suggestions } = await response.json();
+            this.cache.set(query, suggestions);
+            this.render(suggestions);
+        } catch (error) {
+            // Suggestions are optional - typing still works without them
+        }
+    }
+
+    render(suggestions) {
+        this.list.replaceChildren(...suggestions.map((value) => {
+            const option = document.createElement('option');
+            option.value = value;
+            return option;
+        }));
+    }
+}
+
 // ============================================
 // FORM VALIDATION
 // ============================================
@@ -150,10 +242,10 @@ class FormValidator {
         return this.validateField(
             fieldId,
             value => {
-                // Remove spaces and dashes
-                const cleaned = value.replace(/[\s\-]/g, '');
-                // Check Ghana phone formats
-                return /^(0\d{9}|\+233\d{9}|233\d{9})$/.test(cleaned);
+                // Remove spaces, dashes, dots and brackets
+                const cleaned = value.replace(/[\s\-.()]/g, '');
+                // Check Ghana phone formats (same rule as backend/app/phone.py)
+                return /^(?:(?:\+|00)?2330?|0)\d{9}$/.test(cleaned);
             },
             'Please enter a valid Ghana phone number (e.g., 0241234567 or +233241234567)'
         );
@@ -218,6 +310,9 @@ class RegistrationForm {
         this.form = document.getElementById('registrationForm');
         this.validator = new FormValidator('registrationForm');
         this.submitBtn = document.getElementById('submitBtn');
+        // Reused while the same details are resubmitted, so retries aren't saved twice
+        this.idempotencyKey = null;
+        this.lastPayload = null;
         this.init();
     }
 
@@ -226,6 +321,9 @@ class RegistrationForm {
 
         // Add real-time validation
         this.addRealtimeValidation();
+
+        // Suggest common spellings for free-text fields
+        ['church', 'institution', 'city'].forEach((fieldId) => new Typeahead(fieldId));
     }
 
     addRealtimeValidation() {
@@ -278,7 +376,9 @@ class RegistrationForm {
 
                 // Redirect to thank you page
                 const encodedName = encodeURIComponent(formData.full_name);
-                window.location.href = `thank-you.html?name=${encodedName}`;
+                const ticket = response.data && response.data.ticket;
+                const ticketParam = ticket ? `&ticket=${encodeURIComponent(ticket)}` : '';
+                window.location.href = `thank-you.html?name=${encodedName}${ticketParam}`;
             } else {
                 this.showAlert(response.message || 'Registration failed. Please try again.', 'error');
                 this.setLoadingState(false);
@@ -311,14 +411,51 @@ class RegistrationForm {
         return formData;
     }
 
+    getIdempotencyKey(payload) {
+        if (payload !== this.lastPayload || !this.idempotencyKey) {
+            this.lastPayload = payload;
+            this.idempotencyKey = window.crypto?.randomUUID
+                ? window.crypto.randomUUID()
+                : `${Date.now()}-${Math.random().toString(36).slice(2)}`;
+        }
+        return this.idempotencyKey;
+    }
+
+    retryDelay(response) {
+        // Seconds to wait before resubmitting, or null if the response isn't a "busy, retry later"
+        // (503, or 409 while the first submission of this registration is still being saved)
+        const retryAfter = parseInt(response.headers.get('Retry-After'), 10);
+        if ((response.status !== 503 && response.status !== 409) || !(retryAfter >= 0)) {
+            return null;
+        }
+        // Jitter (1x-2x) so everyone turned away at once doesn't come back at once
+        return Math.min(retryAfter * (1 + Math.random()), CONFIG.maxRetryDelay);
+    }
+
     async submitRegistration(formData) {
-        const response = await fetch(`${CONFIG.apiUrl}/register`, {
-            method: 'POST',
-            headers: {
-                'Content-Type': 'application/json',
-            },
-            body: JSON.stringify(formData),
-        });
+        const payload = JSON.stringify(formData);
+        // Same payload, same Idempotency-Key: a retry can never register twice
+        const idempotencyKey = this.getIdempotencyKey(payload);
+        let response;
+        for (let attempt = 0; ; attempt++) {
+            response = await fetch(`${CONFIG.apiUrl}/register`, {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json',
+                    'Idempotency-Key': idempotencyKey,
+                },
+                body: payload,
+            });
+            const delay = this.retryDelay(response);
+            if (delay === null || attempt >= CONFIG.busyRetries) {
+                break;
+            }
+            this.showAlert(
+                `We are receiving a lot of registrations right now. Retrying in ${Math.ceil(delay)} seconds...`,
+                'info'
+            );
+            await new Promise((resolve) => setTimeout(resolve, delay * 1000));
+        }
 
         if (!response.ok) {
             if (response.status === 429) {
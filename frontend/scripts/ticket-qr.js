@@ -0,0 +1,282 @@
+/**
+ * Ticket QR codes - a minimal QR encoder so the ticket page loads no third-party script.
+ *
+ * Encodes up to 20 characters of the QR alphanumeric set (the 16-character
+ * base32 tickets) as a version 1 symbol (21x21) with medium error
+ * correction, following ISO/IEC 18004, and draws it on a canvas.
+ */
+
+const TicketQR = (() => {
+    const ALPHANUMERIC = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ $%*+-./:';
+    const SIZE = 21;
+    const DATA_CODEWORDS = 16; // Version 1-M
+    const EC_CODEWORDS = 10;
+    const QUIET_ZONE = 4;
+
+    // GF(256) arithmetic for Reed-Solomon (polynomial 0x11D)
+    function multiply(x, y) {
+        let z = 0;
+        for (let i = 7; i >= 0; i--) {
+            z = (z << 1) ^ ((z >>> 7) * 0x11d);
+            z ^= ((y >>> i) & 1) * x;
+        }
+        return z;
+    }
+
+    function errorCorrection(data) {
+        const divisor = new Array(EC_CODEWORDS).fill(0);
+        divisor[EC_CODEWORDS - 1] = 1;
+        let root = 1;
+        for (let i = 0; i < EC_CODEWORDS; i++) {
+            for (let j = 0; j < divisor.length; j++) {
+                divisor[j] = multiply(divisor[j], root);
+                if (j + 1 < divisor.length) {
+                    divisor[j] ^= divisor[j + 1];
+                }
+            }
+            root = multiply(root, 0x02);
+        }
+        const remainder = new Array(EC_CODEWORDS).fill(0);
+        for (const byte of data) {
+            const factor = byte ^ remainder.shift();
+            remainder.push(0);
+            divisor.forEach((coefficient, i) => { remainder[i] ^= multiply(coefficient, factor); });
+        }
+        return remainder;
+    }
+
+    function encodeData(text) {
+        const bits = [];
+        const append = (value, length) => {
+            for (let i = length - 1; i >= 0; i--) {
+                bits.push((value >>> i) & 1);
+            }
+        };
+        append(0b0010, 4); // Alphanumeric mode
+        append(text.length, 9);
+        for (let i = 0; i < text.length; i += 2) {
+            const first = ALPHANUMERIC.indexOf(text[i]);
+            if (i + 1 < text.length) {
+                append(first * 45 + ALPHANUMERIC.indexOf(text[i + 1]), 11);
+            } else {
+                append(first, 6);
+            }
+        }
+        const capacity = DATA_CODEWORDS * 8;
+        append(0, Math.min(4, capacity - bits.length)); // Terminator
+        append(0, (8 - (bits.length % 8)) % 8);
+        const bytes = [];
+        for (let i = 0; i < bits.length; i += 8) {
+            bytes.push(parseInt(bits.slice(i, i + 8).join(''), 2));
+        }
+        for (let pad = 0xec; bytes.length < DATA_CODEWORDS; pad ^= 0xec ^ 0x11) {
+            bytes.push(pad);
+        }
+        return bytes.concat(errorCorrection(bytes));
+    }
+
+    const MASKS = [
+        (x, y) => (x + y) % 2 === 0,
+        (x, y) => y % 2 === 0,
+        (x, y) => x % 3 === 0,
+        (x, y) => (x + y) % 3 === 0,
+        (x, y) => (Math.floor(x / 3) + Math.floor(y / 2)) % 2 === 0,
+        (x, y) => ((x * y) % 2) + ((x * y) % 3) === 0,
+        (x, y) => (((x * y) % 2) + ((x * y) % 3)) % 2 === 0,
+        (x, y) => (((x + y) % 2) + ((x * y) % 3)) % 2 === 0,
+    ];
+
+    function emptyGrid() {
+        return Array.from({ length: SIZE }, () => new Array(SIZE).fill(false));
+    }
+
+    // Finder patterns, separators, timing patterns and the dark module
+    function drawFunctionPatterns(modules, reserved) {
+        const set = (x, y, dark) => {
+            modules[y][x] = dark;
+            reserved[y][x] = true;
+        };
+        for (let i = 0; i < SIZE; i++) {
+            set(6, i, i % 2 === 0);
+            set(i, 6, i % 2 === 0);
+        }
+        for (const [cx, cy] of [[3, 3], [SIZE - 4, 3], [3, SIZE - 4]]) {
+            for (let dy = -4; dy <= 4; dy++) {
+                for (let dx = -4; dx <= 4; dx++) {
+                    const x = cx + dx;
+                    const y = cy + dy;
+                    if (x >= 0 && x < SIZE && y >= 0 && y < SIZE) {
+                        const distance = Math.max(Math.abs(dx), Math.abs(dy));
+                        set(x, y, distance !== 2 && distance !== 4);
+                    }
+                }
+            }
+        }
+        drawFormatBits(modules, reserved, 0);
+    }
+
+    function drawFormatBits(modules, reserved, mask) {
+        const data = (0b00 << 3) | mask; // Error correction level M
+        let remainder = data;
+        for (let i = 0; i < 10; i++) {
+            remainder = (remainder << 1) ^ ((remainder >>> 9) * 0x537);
+        }
+        const bits = ((data << 10) | remainder) ^ 0x5412;
+        const bit = (i) => ((bits >>> i) & 1) === 1;
+        const set = (x, y, dark) => {
+            modules[y][x] = dark;
+            reserved[y][x] = true;
+        };
+        for (let i = 0; i <= 5; i++) {
+            set(8, i, bit(i));
+        }
+        set(8, 7, bit(6));
+        set(8, 8, bit(7));
+        set(7, 8, bit(8));
+        for (let i = 9; i < 15; i++) {
+            set(14 - i, 8, bit(i));
+        }
+        for (let i = 0; i < 8; i++) {
+            set(SIZE - 1 - i, 8, bit(i));
+        }
+        for (let i = 8; i < 15; i++) {
+            set(8, SIZE - 15 + i, bit(i));
+        }
+        set(8, SIZE - 8, true); // Dark module
+    }
+
+    function drawCodewords(modules, reserved, codewords) {
+        let i = 0;
+        for (let right = SIZE - 1; right >= 1; right -= 2) {
+            if (right === 6) {
+                right = 5;
+            }
+            for (let vertical = 0; vertical < SIZE; vertical++) {
+                for (let j = 0; j < 2; j++) {
+                    const x = right - j;
+                    const upward = ((right + 1) & 2) === 0;
+                    const y = upward ? SIZE - 1 - vertical : vertical;
+                    if (!reserved[y][x] && i < codewords.length * 8) {
+                        modules[y][x] = ((codewords[i >>> 3] >>> (7 - (i & 7))) & 1) === 1;
+                        i++;
+                    }
+                }
+            }
+        }
+    }
+
+    function applyMask(modules, reserved, mask) {
+        for (let y = 0; y < SIZE; y++) {
+            for (let x = 0; x < SIZE; x++) {
+                if (!reserved[y][x] && MASKS[mask](x, y)) {
+                    modules[y][x] = !modules[y][x];
+                }
+            }
+        }
+    }
+
+    // Penalty rules of ISO/IEC 18004 section 7.8.3; the lowest-scoring mask is used
+    function penalty(modules) {
+        let score = 0;
+        const lines = [];
+        for (let i = 0; i < SIZE; i++) {
+            lines.push(modules[i]);
+            lines.push(modules.map((row) => row[i]));
+        }
+        for (const line of lines) {
+            let run = 1;
+            for (let i = 1; i <= SIZE; i++) {
+                if (i < SIZE && line[i] === line[i - 1]) {
+                    run++;
+                } else {
+                    if (run >= 5) {
+                        score += run - 2;
+                    }
+                    run = 1;
+                }
+            }
+            // Finder-like 1:1:3:1:1 with four light modules (or the edge) on either side
+            const pattern = line.map((dark) => (dark ? '1' : '0')).join('');
+            for (let at = pattern.indexOf('1011101'); at !== -1; at = pattern.indexOf('1011101', at + 1)) {
+                const before = pattern.slice(Math.max(at - 4, 0), at);
+                const after = pattern.slice(at + 7, at + 11);
+                if (!before.includes('1') || !after.includes('1')) {
+                    score += 40;
+                }
+            }
+        }
+        let dark = 0;
+        for (let y = 0; y < SIZE; y++) {
+            for (let x = 0; x < SIZE; x++) {
+                dark += modules[y][x] ? 1 : 0;
+                if (x < SIZE - 1 && y < SIZE - 1) {
+                    const color = modules[y][x];
+                    if (color === modules[y][x + 1] && color === modules[y + 1][x] && color === modules[y + 1][x + 1]) {
+                        score += 3;
+                    }
+                }
+            }
+        }
+        const total = SIZE * SIZE;
+        score += Math.floor(Math.abs(dark * 20 - total * 10) / total) * 10;
+        return score;
+    }
+
+    /**
+     * Module matrix for a short alphanumeric text (rows of booleans, true = dark).
+     * @param {string} text - Up to 20 characters of 0-9, A-Z, space and $%*+-./:
+     * @param {number} [forcedMask] - Use this mask (0-7) instead of the best one
+     */
+    function encode(text, forcedMask) {
+        if (text.length > 20 || [...text].some((char) => !ALPHANUMERIC.includes(char))) {
+            throw new Error('TicketQR only encodes up to 20 QR alphanumeric characters');
+        }
+        const codewords = encodeData(text);
+        let best = null;
+        const masks = forcedMask === undefined ? [0, 1, 2, 3, 4, 5, 6, 7] : [forcedMask];
+        for (const mask of masks) {
+            const modules = emptyGrid();
+            const reserved = emptyGrid();
+            drawFunctionPatterns(modules, reserved);
+            drawCodewords(modules, reserved, codewords);
+            applyMask(modules, reserved, mask);
+            drawFormatBits(modules, reserved, mask);
+            const score = penalty(modules);
+            if (best === null || score < best.score) {
+                best = { modules, score };
+            }
+        }
+        return best.modules;
+    }
+
+    /**
+     * Draw a QR code for the text into a container element.
+     * @param {HTMLElement} container - Receives a <canvas>
+     * @param {string} text - Ticket to encode
+     * @param {number} size - Width and height in CSS pixels
+     */
+    function draw(container, text, size) {
+        const modules = encode(text);
+        const scale = Math.floor(size / (SIZE + QUIET_ZONE * 2));
+        const canvas = document.createElement('canvas');
+        canvas.width = canvas.height = scale * (SIZE + QUIET_ZONE * 2);
+        canvas.setAttribute('role', 'img');
+        canvas.setAttribute('aria-label', `QR code for ticket ${text}`);
+        const context = canvas.getContext('2d');
+        context.fillStyle = '#ffffff';
+        context.fillRect(0, 0, canvas.width, canvas.height);
+        context.fillStyle = '#000000';
+        modules.forEach((row, y) => row.forEach((dark, x) => {
+            if (dark) {
+                context.fillRect((x + QUIET_ZONE) * scale, (y + QUIET_ZONE) * scale, scale, scale);
+            }
+        }));
+        container.replaceChildren(canvas);
+    }
+
+    return { encode, draw };
+})();
+
+if (typeof module !== 'undefined') {
+    module.exports = TicketQR;
+}
@@ -43,10 +43,18 @@ echo "📍 Application will be available at:"
 echo "   Frontend: http://localhost:8000"
 echo "   API Docs: http://localhost:8000/docs"
 echo "   Health:   http://localhost:8000/api/health"
+echo "   Metrics:  http://localhost:8000/metrics"
 echo ""
 echo "Press Ctrl+C to stop the server"
 echo "=================================="
 echo ""
 
-# Use more workers in production for better performance
-uvicorn app.main:app --host 0.0.0.0 --port 8000 --workers 4
+# Metrics from all workers are aggregated through this directory (must start empty)
+export PROMETHEUS_MULTIPROC_DIR="${PROMETHEUS_MULTIPROC_DIR:-/tmp/iyc-prometheus}"
+rm -rf "$PROMETHEUS_MULTIPROC_DIR"
+mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+
+# Use more workers in production for better performance (the Google Sheets
+# quota is split between them, so the count is exported for the app too)
+export WEB_CONCURRENCY="${WEB_CONCURRENCY:-4}"
+uvicorn app.main:app --host 0.0.0.0 --port 8000 --workers "$WEB_CONCURRENCY"